@@ -0,0 +1,28 @@
+"""Added composite index on task (status_id, id)
+
+Revision ID: 5d2e7c1a9b34
+Revises: 399f468a4651
+Create Date: 2026-10-18 12:04:31.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2e7c1a9b34'
+down_revision: Union[str, Sequence[str], None] = '399f468a4651'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_task_status_id_id', 'task', ['status_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_task_status_id_id', table_name='task')
@@ -0,0 +1,54 @@
+"""Added full-text search on task (name, text)
+
+Revision ID: 9b41e6d2f0c7
+Revises: 5d2e7c1a9b34
+Create Date: 2026-10-18 16:22:09.114372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b41e6d2f0c7'
+down_revision: Union[str, Sequence[str], None] = '5d2e7c1a9b34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Копия DDL из db.entities.models на момент миграции
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE task_fts USING fts5("
+    "name, text, content='task', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER task_fts_insert AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts(rowid, name, text) VALUES (new.rowid, new.name, new.text); END",
+    "CREATE TRIGGER task_fts_delete AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, name, text) VALUES ('delete', old.rowid, old.name, old.text); END",
+    "CREATE TRIGGER task_fts_update AFTER UPDATE OF name, text ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, name, text) VALUES ('delete', old.rowid, old.name, old.text); "
+    "INSERT INTO task_fts(rowid, name, text) VALUES (new.rowid, new.name, new.text); END",
+    # Индекс для уже существующих задач
+    "INSERT INTO task_fts(task_fts) VALUES ('rebuild')",
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_context().dialect.name
+    if dialect == 'mysql':
+        op.create_index('ix_task_fulltext', 'task', ['name', 'text'], unique=False, mysql_prefix='FULLTEXT')
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_DDL:
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_context().dialect.name
+    if dialect == 'mysql':
+        op.drop_index('ix_task_fulltext', table_name='task')
+    elif dialect == 'sqlite':
+        for trigger in ('task_fts_insert', 'task_fts_delete', 'task_fts_update'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS task_fts')
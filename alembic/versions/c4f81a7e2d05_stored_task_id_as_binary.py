@@ -0,0 +1,49 @@
+"""Stored task.id as BINARY(16) on MySQL, dropped duplicate ix_task_id
+
+Revision ID: c4f81a7e2d05
+Revises: 9b41e6d2f0c7
+Create Date: 2026-10-18 18:04:51.562310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4f81a7e2d05'
+down_revision: Union[str, Sequence[str], None] = '9b41e6d2f0c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Одним ALTER: ix_task_status_id_id может быть единственным индексом для внешнего ключа
+# на status_id, поэтому MySQL не даст удалить его отдельной командой
+SWAP_ID_COLUMN = (
+    'ALTER TABLE task DROP PRIMARY KEY, DROP INDEX ix_task_status_id_id, DROP COLUMN id, '
+    'CHANGE {column} id {type} NOT NULL FIRST, ADD PRIMARY KEY (id), '
+    'ADD INDEX ix_task_status_id_id (status_id, id)'
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Первичный ключ уже индексирует id
+    op.drop_index('ix_task_id', table_name='task')
+    if op.get_context().dialect.name != 'mysql':
+        return
+
+    op.add_column('task', sa.Column('id_bin', sa.BINARY(16), nullable=True))
+    # id хранится как 32 hex-символа без дефисов, UNHEX дает те же 16 байт, что UUID.bytes
+    op.execute('UPDATE task SET id_bin = UNHEX(id)')
+    op.execute(SWAP_ID_COLUMN.format(column='id_bin', type='BINARY(16)'))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_context().dialect.name == 'mysql':
+        op.add_column('task', sa.Column('id_hex', sa.CHAR(32), nullable=True))
+        op.execute('UPDATE task SET id_hex = LOWER(HEX(id))')
+        op.execute(SWAP_ID_COLUMN.format(column='id_hex', type='CHAR(32)'))
+
+    op.create_index(op.f('ix_task_id'), 'task', ['id'], unique=False)
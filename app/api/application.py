@@ -0,0 +1,168 @@
+"""FastAPI-приложение: middleware, обработчики ошибок, служебные эндпоинты и роутеры.
+
+Модуль импортируется при первом обращении к main.app, поэтому процессы, которые
+приложение не обслуживают (супервизор воркеров, запуск через python main.py до старта
+сервера), не загружают роутеры, сервисы и драйверы БД
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import SQLAlchemyError
+from api.endpoints.tasks import router as tasks_router
+from api.endpoints.statuses import router as status_router
+from api.compression import CompressionMiddleware
+from api.query_metrics import QueryMetricsMiddleware
+from api.metrics import (
+    CONTENT_TYPE as METRICS_CONTENT_TYPE,
+    MetricsMiddleware,
+    read_snapshots,
+    render,
+    request_metrics,
+    route_label,
+    write_snapshot,
+)
+from core.config import settings
+from db.session.db_session import get_database
+from db.session.pool_metrics import get_pool_status
+from db.session.readiness import ReadinessCheck
+from schemas.models import PoolStatusModel, ReadinessModel
+from db.entities.models import Base, create_task_fts
+from services.task_cache import task_cache
+from services.executor import service_executor
+from exceptions.service_exceptions import ServiceOverloaded
+
+logger = logging.getLogger(__name__)
+
+database = get_database()
+
+readiness_check = ReadinessCheck(
+    database.engine,
+    pools={"sync": database.engine.pool, "async": database.async_engine.pool},
+    interval=settings.READINESS_INTERVAL,
+    timeout=settings.READINESS_TIMEOUT,
+    max_age=settings.READINESS_MAX_AGE,
+    max_saturation=settings.READINESS_MAX_POOL_SATURATION,
+    async_engine=database.async_engine,
+)
+
+
+def metrics_snapshot() -> dict:
+    executors = {"service": service_executor.stats()} if settings.SERVICE_EXECUTOR == "threads" else None
+    return request_metrics.snapshot(
+        {"sync": database.engine.pool, "async": database.async_engine.pool},
+        caches={"task": task_cache.stats()},
+        executors=executors,
+    )
+
+
+async def write_metrics_snapshots(directory: str, interval: float):
+    while True:
+        await run_in_threadpool(write_snapshot, directory, metrics_snapshot())
+        await asyncio.sleep(interval)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.DEBUG:
+        # Создаются только недостающие таблицы: данные переживают перезапуск,
+        # а запуск не тратит время на пересоздание схемы. create_all не создает
+        # индекс поиска для уже существующей task, поэтому он создается отдельно
+        async with database.async_engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(create_task_fts)
+
+    snapshot_task = None
+    if settings.METRICS_DIR:
+        snapshot_task = asyncio.create_task(
+            write_metrics_snapshots(settings.METRICS_DIR, settings.METRICS_SNAPSHOT_INTERVAL)
+        )
+
+    readiness_task = asyncio.create_task(readiness_check.run())
+
+    yield
+
+    readiness_task.cancel()
+    if snapshot_task:
+        snapshot_task.cancel()
+        write_snapshot(settings.METRICS_DIR, metrics_snapshot())
+
+    logger.info("Shutting down application...")
+    await run_in_threadpool(service_executor.shutdown)
+    await database.async_engine.dispose()
+    database.engine.dispose()
+    logger.info("Database connections closed.")
+
+
+app = FastAPI(title="TestTask", version="1.0", lifespan=lifespan)
+if settings.COMPRESSION_ENCODINGS:
+    # Добавляется первым, то есть ближе всех к приложению: метрики учитывают и время сжатия
+    app.add_middleware(
+        CompressionMiddleware,
+        encodings=settings.COMPRESSION_ENCODINGS,
+        min_size=settings.COMPRESSION_MIN_SIZE,
+        threadpool_min_size=settings.COMPRESSION_THREADPOOL_MIN_SIZE,
+    )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(QueryMetricsMiddleware)
+
+
+@app.exception_handler(SQLAlchemyError)
+async def database_error_handler(request: Request, exc: SQLAlchemyError):
+    logger.error(f"Database Error: {str(exc)}")
+    request_metrics.record_database_error(request.method, route_label(request.scope))
+
+    return JSONResponse(status_code=500, content={"detail": "Internal Database Error"})
+
+
+@app.exception_handler(ServiceOverloaded)
+async def service_overloaded_handler(request: Request, exc: ServiceOverloaded):
+    # Очередь пула потоков заполнена: быстрый отказ вместо растущей задержки
+    return JSONResponse(
+        status_code=503, content={"detail": "Сервер перегружен, повторите запрос позже"}, headers={"Retry-After": "1"}
+    )
+
+
+@app.get("/health")
+async def healthcheck():
+    return {"health": "ok"}
+
+
+@app.get("/health/live")
+async def liveness():
+    """Процесс жив и event loop отвечает; БД не проверяется"""
+    return {"health": "ok"}
+
+
+@app.get("/health/ready", response_model=ReadinessModel)
+async def readiness():
+    """Готовность принимать трафик: 503, если БД недоступна или пул соединений заполнен"""
+    result = readiness_check.status()
+    return JSONResponse(status_code=200 if result.ready else 503, content=result.model_dump())
+
+
+@app.get("/health/pool")
+async def pool_status() -> Dict[str, PoolStatusModel]:
+    """Заполненность пулов соединений и время ожидания соединения"""
+    return {
+        "sync": get_pool_status(database.engine.pool),
+        "async": get_pool_status(database.async_engine.pool),
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """Метрики в формате Prometheus; при нескольких воркерах - сумма по всем процессам"""
+    snapshot = metrics_snapshot()
+    snapshots = [snapshot]
+    if settings.METRICS_DIR:
+        snapshots = await run_in_threadpool(read_snapshots, settings.METRICS_DIR, snapshot)
+
+    return Response(render(snapshots), media_type=METRICS_CONTENT_TYPE)
+
+
+app.include_router(tasks_router, prefix="/tasks")
+app.include_router(status_router, prefix="/status")
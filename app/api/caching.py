@@ -0,0 +1,31 @@
+"""Условные GET по ETag из services.versions.
+
+Воркеры одного запуска делят версии через VERSIONS_FILE, поэтому 304 после записи
+в любом из них не отдается. Записи других экземпляров приложения не видны: после них
+устаревший 304 возможен не дольше ETAG_TTL секунд
+"""
+from fastapi import Request, Response
+from core.config import settings
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Слабое сравнение, как требует RFC 9110 для If-None-Match"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+
+    etag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def cache_headers(etag: str) -> dict:
+    max_age = settings.HTTP_CACHE_MAX_AGE
+    # no-cache: клиент хранит ответ, но перед использованием проверяет его через If-None-Match
+    cache_control = f"private, max-age={max_age}" if max_age else "private, no-cache"
+    return {"ETag": etag, "Cache-Control": cache_control}
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag))
@@ -0,0 +1,126 @@
+"""Сжатие ответов: zstd и brotli, если установлены (`uv pip install zstandard brotli`), иначе gzip.
+
+Ответ собирается целиком и сжимается, только если он больше min_size. Большие тела
+сжимаются в пуле потоков, чтобы не занимать event loop. Потоковые ответы (выгрузка)
+передаются как есть: их размер заранее неизвестен, а буферизация лишила бы их смысла
+"""
+import gzip
+from functools import partial
+from typing import Callable, Dict, Iterable, List, Optional
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+ENCODERS: Dict[str, Callable[[bytes], bytes]] = {
+    "gzip": partial(gzip.compress, compresslevel=6, mtime=0),
+}
+
+try:
+    import brotli
+
+    ENCODERS["br"] = partial(brotli.compress, quality=4)
+except ImportError:
+    pass
+
+try:
+    import zstandard
+
+    ENCODERS["zstd"] = zstandard.ZstdCompressor(level=3).compress
+except ImportError:
+    pass
+
+# Сжимаются только текстовые форматы; картинки и архивы уже сжаты
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def choose_encoding(accept_encoding: str, preferred: Iterable[str]) -> Optional[str]:
+    """Первое из preferred доступное кодирование, которое клиент принимает с q > 0"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                continue
+        accepted[name.strip().lower()] = quality
+
+    for encoding in preferred:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if encoding in ENCODERS and quality > 0:
+            return encoding
+
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app,
+        encodings: List[str],
+        min_size: int = 1024,
+        threadpool_min_size: int = 256 * 1024,
+    ):
+        self.app = app
+        self.encodings = encodings
+        self.min_size = min_size
+        self.threadpool_min_size = threadpool_min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""), self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start_message["headers"])
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            # Ответ мог бы быть сжат, поэтому кэши должны учитывать Accept-Encoding
+            headers.add_vary_header("Accept-Encoding")
+            if len(body) < self.min_size:
+                await send(start_message)
+                await send(message)
+                return
+
+            if len(body) >= self.threadpool_min_size:
+                body = await run_in_threadpool(ENCODERS[encoding], body)
+            else:
+                body = ENCODERS[encoding](body)
+
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
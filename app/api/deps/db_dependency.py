@@ -1,10 +1,32 @@
-from db.session.db_session import SessionLocal
+from db.session.db_session import get_database
+from db.session.lazy_session import LazySession, LazyAsyncSession
+from core.config import settings
+from services.executor import ExecutorSession, service_executor
 from sqlalchemy.orm import Session
-from typing import Generator
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import AsyncGenerator, Generator
 
 def get_db() -> Generator[Session, any, any]:
-    db = SessionLocal()
+    db = LazySession(get_database().SessionLocal)
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    if settings.SERVICE_EXECUTOR == "threads":
+        # Сервисы выполняются в пуле потоков через синхронный движок
+        db = ExecutorSession(get_database().SessionLocal, service_executor)
+    else:
+        db = LazyAsyncSession(get_database().AsyncSessionLocal)
+    try:
+        yield db
+    finally:
+        await db.close()
+
+
+def get_async_sessionmaker() -> async_sessionmaker:
+    """Фабрика сессий для потоковых ответов: тело такого ответа отдается уже
+    после закрытия зависимостей, поэтому сессию открывает сам генератор"""
+    return get_database().AsyncSessionLocal
@@ -1,54 +1,77 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from typing import List
-from sqlalchemy.orm import Session
-from ..deps.db_dependency import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..deps.db_dependency import get_async_db
+from ..responses import FastJSONResponse
+from ..caching import cache_headers, etag_matches, not_modified
+from core.config import settings
 from services.status_services import (
-    CreateStatusService,
-    SearchStatusService,
-    UpdateStatusService,
-    DeleteStatusService,
+    AsyncCreateStatusService,
+    AsyncSearchStatusService,
+    AsyncUpdateStatusService,
+    AsyncDeleteStatusService,
 )
 from schemas.models import StatusModel, StatusModification
 from exceptions.status_exceptions import StatusNotFoundException
+from services.versions import resource_versions
 
 router = APIRouter()
 
 
 @router.put("/create", status_code=201)
-async def create_status(status_name: str, session: Session = Depends(get_db)):
-    service = CreateStatusService(session)
-    service(status_name)
+async def create_status(status_name: str, session: AsyncSession = Depends(get_async_db)):
+    service = AsyncCreateStatusService(session)
+    await service(status_name)
 
 
 @router.get("/get", status_code=200)
-async def get_status_by_id(status_id: int, session: Session = Depends(get_db)) -> StatusModel:
-    service = SearchStatusService(session)
+async def get_status_by_id(
+    status_id: int, request: Request, response: Response, session: AsyncSession = Depends(get_async_db)
+) -> StatusModel:
+    # ETag берется до чтения: запись после него только сменит версию
+    etag = resource_versions.statuses_etag()
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    service = AsyncSearchStatusService(session)
     try:
-        return service.find_status_by_id(status_id)
+        status = await service.find_status_by_id(status_id)
     except StatusNotFoundException:
         raise HTTPException(status_code=404, detail="Указанного статуса не найдено")
 
+    response.headers.update(cache_headers(etag))
+    return status
+
 
 @router.get("/get_all_statuses", status_code=200)
-async def get_all_statuses(session: Session = Depends(get_db)) -> List[StatusModel]:
-    service = SearchStatusService(session)
-    statuses = service.get_all_statuses()
+async def get_all_statuses(
+    request: Request, response: Response, session: AsyncSession = Depends(get_async_db)
+) -> List[StatusModel]:
+    etag = resource_versions.statuses_etag()
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    service = AsyncSearchStatusService(session)
+    if settings.FAST_JSON_LISTS:
+        return FastJSONResponse(await service.get_all_status_rows(), headers=cache_headers(etag))
+    statuses = await service.get_all_statuses()
+    response.headers.update(cache_headers(etag))
     return statuses
 
 
 @router.patch("/update", status_code=200)
-async def update_status(status_modification_model: StatusModification, session: Session = Depends(get_db)):
-    service = UpdateStatusService(session)
+async def update_status(status_modification_model: StatusModification, session: AsyncSession = Depends(get_async_db)):
+    service = AsyncUpdateStatusService(session)
     try:
-        service(status_modification_model)
+        await service(status_modification_model)
     except StatusNotFoundException:
         raise HTTPException(status_code=404, detail="Указанный статус не найден")
 
 
 @router.delete("/delete", status_code=200)
-async def delete_status(status_id: int, session: Session = Depends(get_db)):
-    service = DeleteStatusService(session)
+async def delete_status(status_id: int, session: AsyncSession = Depends(get_async_db)):
+    service = AsyncDeleteStatusService(session)
     try:
-        service(status_id)
+        await service(status_id)
     except StatusNotFoundException:
         raise HTTPException(status_code=404, detail="Указанный статус не найден")
\ No newline at end of file
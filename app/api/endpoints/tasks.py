@@ -1,29 +1,129 @@
-from typing import List
+from typing import AsyncIterator, List, Literal, Optional
+import csv
+import io
 import uuid
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from ..deps.db_dependency import get_db
-from schemas.models import TaskCreationModel, TaskModel, TaskModificationModel
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, Body
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from ..deps.db_dependency import get_async_db, get_async_sessionmaker
+from ..responses import FastJSONResponse
+from ..caching import cache_headers, etag_matches, not_modified
+from core.config import settings
+from schemas.models import (
+    TaskCreationModel,
+    TaskModel,
+    TaskModificationModel,
+    TaskPage,
+    BulkTaskCreationResult,
+    BulkTaskModificationResult,
+    BulkTaskDeletionResult,
+)
+from services.versions import resource_versions
 from services.tasks_services import (
-    TaskCreationService,
-    TaskSearchService,
-    TaskModificationService,
-    TaskDeleteService,
+    AsyncTaskCreationService,
+    AsyncBulkTaskCreationService,
+    AsyncTaskSearchService,
+    AsyncTaskModificationService,
+    AsyncBulkTaskModificationService,
+    AsyncTaskDeleteService,
+    AsyncBulkTaskDeleteService,
+    TaskExportService,
+)
+from exceptions.task_exceptions import (
+    TaskCreationException,
+    TaskNotFoundException,
+    IncorrectUUIDPassed,
+    IncorrectCursorPassed,
+    IncorrectSearchQueryPassed,
 )
-from exceptions.task_exceptions import TaskCreationException, TaskNotFoundException, IncorrectUUIDPassed
 from exceptions.status_exceptions import StatusNotFoundException
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+task_creation_models_adapter = TypeAdapter(List[TaskCreationModel])
+
+
+def validation_error(exc: ValidationError, index: Optional[int] = None) -> RequestValidationError:
+    prefix = ("body",) if index is None else ("body", index)
+    return RequestValidationError(
+        [{**error, "loc": (*prefix, *error["loc"])} for error in exc.errors(include_url=False)]
+    )
+
+
+async def read_task_creation_models(request: Request) -> List[TaskCreationModel]:
+    """Тело массового создания: JSON-массив или NDJSON (одна задача на строку).
+    NDJSON разбирается по мере получения тела, без буферизации всего запроса"""
+    if not request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+        try:
+            return task_creation_models_adapter.validate_json(await request.body())
+        except ValidationError as e:
+            raise validation_error(e)
+
+    task_models = []
+    buffer = b""
+
+    def parse(lines: List[bytes]):
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                task_models.append(TaskCreationModel.model_validate_json(line))
+            except ValidationError as e:
+                raise validation_error(e, len(task_models))
+
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        parse(lines)
+    parse([buffer])
+
+    return task_models
+
+
+async def encode_ndjson(partitions: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+    async for rows in partitions:
+        yield b"".join(
+            orjson.dumps({"id": task_id.hex, "name": name, "text": text, "status": status}) + b"\n"
+            for task_id, name, text, status in rows
+        )
+
+
+async def encode_csv(partitions: AsyncIterator[List[tuple]]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["id", "name", "text", "status"])
+    yield buffer.getvalue().encode()
+
+    async for rows in partitions:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows((task_id.hex, name, text, status) for task_id, name, text, status in rows)
+        yield buffer.getvalue().encode()
+
 
-@router.put("/create", status_code=201)
+bulk_create_request_body = {
+    "required": True,
+    "content": {
+        media_type: {
+            "schema": {"type": "array", "items": {"$ref": "#/components/schemas/TaskCreationModel"}}
+        }
+        for media_type in ("application/json", NDJSON_MEDIA_TYPE)
+    },
+}
+
+
+@router.put("/create", status_code=201, response_model=TaskModel)
 async def create_task(
-    task_model: TaskCreationModel, session: Session = Depends(get_db)
+    task_model: TaskCreationModel, session: AsyncSession = Depends(get_async_db)
 ):
-    service = TaskCreationService(session)
+    service = AsyncTaskCreationService(session)
     try:
-        service(task_model)
-        return {"result": "ok"}
+        return await service(task_model)
     except TaskCreationException:
         raise HTTPException(
             status_code=400, detail="Произошла ошибка при создании задачи"
@@ -32,37 +132,118 @@ async def create_task(
         raise HTTPException(status_code=404, detail="Не найдено статуса с таким id")
 
 
+@router.post(
+    "/bulk_create",
+    status_code=201,
+    response_model=List[BulkTaskCreationResult],
+    openapi_extra={"requestBody": bulk_create_request_body},
+)
+async def bulk_create_tasks(
+    task_models: List[TaskCreationModel] = Depends(read_task_creation_models),
+    session: AsyncSession = Depends(get_async_db),
+):
+    service = AsyncBulkTaskCreationService(session)
+    try:
+        return await service(task_models)
+    except TaskCreationException:
+        raise HTTPException(
+            status_code=400, detail="Произошла ошибка при создании задач"
+        )
+    except StatusNotFoundException:
+        raise HTTPException(status_code=404, detail="Не найдено статуса с таким id")
+
+
 @router.get("/get", status_code=200, response_model=TaskModel)
-async def get_task(task_id: str, session: Session = Depends(get_db)) -> TaskModel:
-    service = TaskSearchService(session)
+async def get_task(
+    task_id: str, request: Request, response: Response, session: AsyncSession = Depends(get_async_db)
+) -> TaskModel:
+    service = AsyncTaskSearchService(session)
     try:
         task_id = uuid.UUID(task_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Неправильный формат UUID")
 
+    # ETag берется до чтения: запись после него только сменит версию
+    etag = resource_versions.task_etag(task_id)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     try:
-        return service.find_task_by_id(task_id)
+        task = await service.find_task_by_id(task_id)
     except TaskNotFoundException:
         raise HTTPException(status_code=404, detail="Не найдено задачи с таким id")
     except StatusNotFoundException:
         raise HTTPException(status_code=404, detail="Не найдено статуса с таким id")
 
+    response.headers.update(cache_headers(etag))
+    return task
+
+
+@router.get("/get_list", status_code=200, response_model=TaskPage)
+async def get_task_list(
+    limit: int = Query(default=100, ge=1, le=1000),
+    after: Optional[str] = None,
+    status: Optional[int] = None,  # Только задачи с этим статусом
+    session: AsyncSession = Depends(get_async_db),
+):
+    service = AsyncTaskSearchService(session)
+    try:
+        if settings.FAST_JSON_LISTS:
+            return FastJSONResponse(await service.get_tasks_page_rows(limit, after, status))
+        return await service.get_tasks_page(limit, after, status)
+    except IncorrectCursorPassed:
+        raise HTTPException(status_code=400, detail="Неправильный курсор")
+    except StatusNotFoundException:
+        raise HTTPException(status_code=404, detail="Не найдено статуса с таким id")
+
+
+@router.get("/search", status_code=200, response_model=TaskPage)
+async def search_tasks(
+    q: str = Query(min_length=1, max_length=256),
+    limit: int = Query(default=20, ge=1, le=1000),
+    after: Optional[str] = None,
+    status: Optional[int] = None,  # Только задачи с этим статусом
+    session: AsyncSession = Depends(get_async_db),
+):
+    """Полнотекстовый поиск по названию и тексту, самые релевантные задачи первыми"""
+    service = AsyncTaskSearchService(session)
+    try:
+        if settings.FAST_JSON_LISTS:
+            return FastJSONResponse(await service.search_tasks_rows(q, limit, after, status))
+        return await service.search_tasks(q, limit, after, status)
+    except IncorrectSearchQueryPassed:
+        raise HTTPException(status_code=400, detail="В поисковом запросе нет слов")
+    except IncorrectCursorPassed:
+        raise HTTPException(status_code=400, detail="Неправильный курсор")
+    except StatusNotFoundException:
+        raise HTTPException(status_code=404, detail="Не найдено статуса с таким id")
+
 
-@router.get("/get_list", status_code=200, response_model=List[TaskModel])
-async def get_task_list(session: Session = Depends(get_db)):
-    service = TaskSearchService(session)
-    tasks = service.get_all_tasks()
-    return tasks
+@router.get("/export", status_code=200, response_class=StreamingResponse)
+async def export_tasks(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    session_factory: async_sessionmaker = Depends(get_async_sessionmaker),
+):
+    """Потоковая выгрузка всех задач. Задачи без статуса выгружаются со status = null"""
+    service = TaskExportService(session_factory)
+    if format == "csv":
+        return StreamingResponse(
+            encode_csv(service.stream_rows()),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="tasks.csv"'},
+        )
+
+    return StreamingResponse(encode_ndjson(service.stream_rows()), media_type=NDJSON_MEDIA_TYPE)
 
 
 @router.patch("/update", status_code=200)
 async def update_task(
-    task_modification_model: TaskModificationModel, session: Session = Depends(get_db)
+    task_modification_model: TaskModificationModel, session: AsyncSession = Depends(get_async_db)
 ):
-    service = TaskModificationService(session)
+    service = AsyncTaskModificationService(session)
 
     try:
-        service(task_modification_model)
+        await service(task_modification_model)
     except IncorrectUUIDPassed:
         raise HTTPException(status_code=400, detail="Указан неправильный UUID задачи")
     except TaskNotFoundException:
@@ -71,15 +252,35 @@ async def update_task(
         raise HTTPException(status_code=404, detail="Указанный статус не найден")
 
 
+@router.patch("/bulk_update", status_code=200, response_model=BulkTaskModificationResult)
+async def bulk_update_tasks(
+    task_modification_models: List[TaskModificationModel],
+    session: AsyncSession = Depends(get_async_db),
+):
+    service = AsyncBulkTaskModificationService(session)
+    try:
+        return await service(task_modification_models)
+    except StatusNotFoundException:
+        raise HTTPException(status_code=404, detail="Не найдено статуса с таким id")
+
+
 @router.delete("/delete", status_code=200)
-async def delete_task(task_id: str, session: Session = Depends(get_db)):
-    service = TaskDeleteService(session)
+async def delete_task(task_id: str, session: AsyncSession = Depends(get_async_db)):
+    service = AsyncTaskDeleteService(session)
     try:
         task_id = uuid.UUID(task_id)
     except ValueError:
         raise HTTPException(status_code=400, detail="Неправильный формат id задачи")
 
     try:
-        service(task_id)
+        await service(task_id)
     except TaskNotFoundException:
         raise HTTPException(status_code=404, detail="Указаной задачи не найдено")
+
+
+@router.delete("/bulk_delete", status_code=200, response_model=BulkTaskDeletionResult)
+async def bulk_delete_tasks(
+    task_ids: List[str] = Body(...), session: AsyncSession = Depends(get_async_db)
+):
+    service = AsyncBulkTaskDeleteService(session)
+    return await service(task_ids)
@@ -0,0 +1,323 @@
+"""Метрики HTTP-запросов, пулов соединений, кэшей и пула потоков сервисов в формате Prometheus.
+
+Счетчики меняются только из потока event loop, поэтому обходятся без блокировок.
+На запрос приходится один поиск по ключу (метод, маршрут, статус) в словаре.
+
+При нескольких воркерах каждый периодически сохраняет снимок своих метрик
+в METRICS_DIR, а /metrics суммирует снимки всех процессов. Счетчики завершившихся
+воркеров остаются в сумме, а gauge-метрики берутся только у живых процессов
+"""
+import os
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import orjson
+from sqlalchemy.pool import Pool
+
+from db.session.pool_metrics import get_pool_status
+
+# Границы корзин гистограммы времени ответа, секунды
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+UNMATCHED_ROUTE = "unmatched"  # Запросы мимо маршрутов не должны плодить метки
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class RouteStats:
+    """Гистограмма времени ответа для одного набора меток"""
+
+    __slots__ = ("buckets", "total", "count")
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKETS) + 1)  # Последняя корзина - +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, duration: float):
+        self.buckets[bisect_left(BUCKETS, duration)] += 1
+        self.total += duration
+        self.count += 1
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.routes: Dict[Tuple[str, str, int], RouteStats] = {}
+        self.database_errors: Dict[Tuple[str, str], int] = {}
+        self.in_flight = 0
+
+    def observe(self, method: str, route: str, status: int, duration: float):
+        key = (method, route, status)
+        stats = self.routes.get(key)
+        if stats is None:
+            stats = self.routes[key] = RouteStats()
+        stats.observe(duration)
+
+    def record_database_error(self, method: str, route: str):
+        key = (method, route)
+        self.database_errors[key] = self.database_errors.get(key, 0) + 1
+
+    def snapshot(
+        self,
+        pools: Dict[str, Pool],
+        caches: Optional[Dict[str, Dict[str, int]]] = None,
+        executors: Optional[Dict[str, Dict[str, float]]] = None,
+    ) -> dict:
+        """Состояние процесса в виде, пригодном для JSON и суммирования.
+        caches - счетчики кэшей: hits, misses, evictions, errors;
+        executors - ServiceExecutor.stats() пулов потоков"""
+        return {
+            "pid": os.getpid(),
+            "routes": [
+                [method, route, status, stats.buckets, stats.total, stats.count]
+                for (method, route, status), stats in self.routes.items()
+            ],
+            "database_errors": [[method, route, count] for (method, route), count in self.database_errors.items()],
+            "in_flight": self.in_flight,
+            "pools": {name: get_pool_status(pool).model_dump() for name, pool in pools.items()},
+            "caches": caches or {},
+            "executors": executors or {},
+        }
+
+    def reset(self):
+        self.routes.clear()
+        self.database_errors.clear()
+        self.in_flight = 0
+
+
+request_metrics = RequestMetrics()
+
+
+def route_label(scope: dict) -> str:
+    """Шаблон пути маршрута, а не сам путь: /tasks/get, а не /tasks/get?task_id=..."""
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+class MetricsMiddleware:
+    """ASGI middleware: время считается до отправки последнего фрагмента тела,
+    поэтому потоковые ответы учитываются целиком"""
+
+    def __init__(self, app, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.metrics.in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.metrics.in_flight -= 1
+            self.metrics.observe(scope["method"], route_label(scope), status, time.perf_counter() - started)
+
+
+def write_snapshot(directory: str, snapshot: dict):
+    # Запись через временный файл, чтобы читатель не увидел половину JSON
+    path = Path(directory) / f"{snapshot['pid']}.json"
+    tmp_path = path.with_suffix(".tmp")
+    tmp_path.write_bytes(orjson.dumps(snapshot))
+    os.replace(tmp_path, path)
+
+
+def is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+def read_snapshots(directory: str, own_snapshot: dict) -> List[dict]:
+    """Снимки всех процессов; свой берется из памяти, а не из файла"""
+    snapshots = [own_snapshot]
+    for path in Path(directory).glob("*.json"):
+        if path.stem == str(own_snapshot["pid"]):
+            continue
+        try:
+            snapshot = orjson.loads(path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            continue
+        if not is_alive(snapshot["pid"]):
+            snapshot["in_flight"] = 0
+            snapshot["pools"] = {name: {**pool, "gauges_stale": True} for name, pool in snapshot["pools"].items()}
+            snapshot["executors"] = {
+                name: {**executor, "threads": 0, "active": 0, "queued": 0}
+                for name, executor in snapshot.get("executors", {}).items()
+            }
+        snapshots.append(snapshot)
+
+    return snapshots
+
+
+def escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def labels(**values) -> str:
+    return ",".join(f'{name}="{escape_label(value)}"' for name, value in values.items())
+
+
+def render(snapshots: Iterable[dict]) -> str:
+    """Суммирует снимки процессов и выводит их в формате Prometheus"""
+    routes: Dict[tuple, list] = {}
+    database_errors: Dict[tuple, int] = {}
+    pools: Dict[str, Dict[str, float]] = {}
+    caches: Dict[str, Dict[str, int]] = {}
+    executors: Dict[str, Dict[str, float]] = {}
+    in_flight = 0
+
+    for snapshot in snapshots:
+        in_flight += snapshot["in_flight"]
+        for method, route, status, buckets, total, count in snapshot["routes"]:
+            merged = routes.setdefault((method, route, status), [[0] * len(buckets), 0.0, 0])
+            merged[0] = [a + b for a, b in zip(merged[0], buckets)]
+            merged[1] += total
+            merged[2] += count
+        for method, route, count in snapshot["database_errors"]:
+            database_errors[(method, route)] = database_errors.get((method, route), 0) + count
+        for name, status in snapshot["pools"].items():
+            merged_pool = pools.setdefault(name, {})
+            for field in ("checkouts", "timeouts"):
+                merged_pool[field] = merged_pool.get(field, 0) + (status[field] or 0)
+            if status.get("gauges_stale"):
+                continue
+            for field in ("size", "checked_out", "idle", "overflow"):
+                merged_pool[field] = merged_pool.get(field, 0) + (status[field] or 0)
+            merged_pool["wait_max_ms"] = max(merged_pool.get("wait_max_ms", 0.0), status["wait_max_ms"] or 0.0)
+        for name, counters in snapshot.get("caches", {}).items():
+            merged_cache = caches.setdefault(name, {})
+            for field, value in counters.items():
+                merged_cache[field] = merged_cache.get(field, 0) + value
+        for name, stats in snapshot.get("executors", {}).items():
+            merged_executor = executors.setdefault(name, {})
+            for field, value in stats.items():
+                if field == "wait_max":
+                    merged_executor[field] = max(merged_executor.get(field, 0.0), value)
+                else:
+                    merged_executor[field] = merged_executor.get(field, 0) + value
+
+    lines = [
+        "# HELP http_requests_total Число HTTP-запросов",
+        "# TYPE http_requests_total counter",
+    ]
+    for (method, route, status), (_, _, count) in sorted(routes.items()):
+        lines.append(f"http_requests_total{{{labels(method=method, route=route, status=status)}}} {count}")
+
+    lines += [
+        "# HELP http_request_duration_seconds Время ответа",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for (method, route, status), (buckets, total, count) in sorted(routes.items()):
+        route_labels = labels(method=method, route=route, status=status)
+        cumulative = 0
+        for bound, bucket in zip(BUCKETS + ("+Inf",), buckets):
+            cumulative += bucket
+            lines.append(f'http_request_duration_seconds_bucket{{{route_labels},le="{bound}"}} {cumulative}')
+        lines.append(f"http_request_duration_seconds_sum{{{route_labels}}} {total}")
+        lines.append(f"http_request_duration_seconds_count{{{route_labels}}} {count}")
+
+    lines += [
+        "# HELP http_requests_in_flight Запросы, которые обрабатываются сейчас",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {in_flight}",
+        "# HELP http_database_errors_total Ответы 500 из-за ошибок БД",
+        "# TYPE http_database_errors_total counter",
+    ]
+    for (method, route), count in sorted(database_errors.items()):
+        lines.append(f"http_database_errors_total{{{labels(method=method, route=route)}}} {count}")
+
+    lines += [
+        "# HELP db_pool_connections Соединения пула по состояниям",
+        "# TYPE db_pool_connections gauge",
+    ]
+    for name, pool in sorted(pools.items()):
+        for state in ("size", "checked_out", "idle", "overflow"):
+            if state in pool:
+                lines.append(f"db_pool_connections{{{labels(engine=name, state=state)}}} {pool[state]}")
+
+    for metric, field, kind, description in (
+        ("db_pool_checkouts_total", "checkouts", "counter", "Выдано соединений из пула"),
+        ("db_pool_timeouts_total", "timeouts", "counter", "Таймауты ожидания соединения"),
+        ("db_pool_wait_max_seconds", "wait_max_ms", "gauge", "Максимальное ожидание соединения"),
+    ):
+        lines += [f"# HELP {metric} {description}", f"# TYPE {metric} {kind}"]
+        for name, pool in sorted(pools.items()):
+            value = pool.get(field, 0)
+            if field == "wait_max_ms":
+                value /= 1000
+            lines.append(f"{metric}{{{labels(engine=name)}}} {value}")
+
+    lines += [
+        "# HELP cache_requests_total Обращения к кэшу",
+        "# TYPE cache_requests_total counter",
+    ]
+    for name, counters in sorted(caches.items()):
+        for result, field in (("hit", "hits"), ("miss", "misses")):
+            lines.append(f"cache_requests_total{{{labels(cache=name, result=result)}}} {counters.get(field, 0)}")
+
+    for metric, field, description in (
+        ("cache_evictions_total", "evictions", "Записи, вытесненные из-за размера кэша"),
+        ("cache_errors_total", "errors", "Ошибки хранилища кэша"),
+    ):
+        lines += [f"# HELP {metric} {description}", f"# TYPE {metric} counter"]
+        for name, counters in sorted(caches.items()):
+            lines.append(f"{metric}{{{labels(cache=name)}}} {counters.get(field, 0)}")
+
+    if executors:
+        lines += [
+            "# HELP service_executor_threads Потоки пула для сервисов",
+            "# TYPE service_executor_threads gauge",
+        ]
+        for name, stats in sorted(executors.items()):
+            lines.append(f"service_executor_threads{{{labels(executor=name)}}} {stats['threads']}")
+        lines += [
+            "# HELP service_executor_calls Вызовы сервисов в потоках и в очереди",
+            "# TYPE service_executor_calls gauge",
+        ]
+        for name, stats in sorted(executors.items()):
+            for state in ("active", "queued"):
+                lines.append(f"service_executor_calls{{{labels(executor=name, state=state)}}} {stats[state]}")
+        lines += [
+            "# HELP service_executor_wait_seconds Ожидание свободного потока",
+            "# TYPE service_executor_wait_seconds summary",
+        ]
+        for name, stats in sorted(executors.items()):
+            lines.append(f"service_executor_wait_seconds_sum{{{labels(executor=name)}}} {stats['wait_total']}")
+            lines.append(f"service_executor_wait_seconds_count{{{labels(executor=name)}}} {stats['started']}")
+        for metric, field, kind, description in (
+            ("service_executor_wait_max_seconds", "wait_max", "gauge", "Максимальное ожидание свободного потока"),
+            ("service_executor_rejected_total", "rejected", "counter", "Вызовы, отклоненные с 503"),
+        ):
+            lines += [f"# HELP {metric} {description}", f"# TYPE {metric} {kind}"]
+            for name, stats in sorted(executors.items()):
+                lines.append(f"{metric}{{{labels(executor=name)}}} {stats[field]}")
+
+    return "\n".join(lines) + "\n"
+
+
+def clear_snapshots(directory: Optional[str]):
+    """Перед запуском воркеров: снимки прошлого запуска не должны попасть в сумму"""
+    if directory is None:
+        return
+
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    for snapshot in path.glob("*.json"):
+        snapshot.unlink(missing_ok=True)
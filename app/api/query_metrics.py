@@ -0,0 +1,53 @@
+import logging
+from starlette.datastructures import MutableHeaders
+from core.config import settings
+from db.session.query_metrics import QueryStats, current_query_stats
+
+logger = logging.getLogger(__name__)
+
+
+class QueryMetricsMiddleware:
+    """ASGI middleware: считает SQL-запросы HTTP-запроса и добавляет заголовок Server-Timing.
+
+    Заголовок уходит вместе с началом ответа, поэтому для потоковых ответов в нем
+    только запросы до начала отправки тела. Предупреждение в лог пишется после
+    отправки всего ответа и учитывает все запросы
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.QUERY_METRICS:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["Server-Timing"] = stats.server_timing()
+            await send(message)
+
+        token = current_query_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_query_stats.reset(token)
+
+        db_time_ms = stats.total_time * 1000
+        slowest_ms = stats.slowest_time * 1000
+        if (
+            stats.count > settings.QUERY_COUNT_WARNING
+            or db_time_ms > settings.DB_TIME_WARNING_MS
+            or slowest_ms > settings.SLOW_QUERY_WARNING_MS
+        ):
+            logger.warning(
+                "%s %s: %d queries, %.1f ms in DB, slowest %.1f ms: %s",
+                scope["method"],
+                scope["path"],
+                stats.count,
+                db_time_ms,
+                slowest_ms,
+                stats.slowest_statement,
+            )
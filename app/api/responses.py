@@ -0,0 +1,14 @@
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON-ответ, сериализуемый orjson прямо в байты.
+
+    Содержимое должно уже состоять из простых типов (dict, list, str, int, None):
+    валидация response_model для такого ответа не выполняется
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
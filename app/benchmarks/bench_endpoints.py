@@ -0,0 +1,203 @@
+"""Нагрузочный тест всех эндпоинтов роутеров задач и статусов: перцентили задержки
+и пропускная способность при заданной конкурентности.
+
+По умолчанию приложение вызывается внутри процесса через ASGI, база - SQLite.
+Для MySQL или PostgreSQL укажите --database-url (нужен и асинхронный драйвер).
+С --base-url запросы идут в запущенный сервер; --database-url тогда должен
+указывать на ту же базу, что и у сервера: она заполняется перед замером.
+
+Запуск из каталога app:
+    python -m benchmarks.bench_endpoints --tasks 10000 --requests 200 --output endpoints.json
+"""
+import argparse
+import asyncio
+import logging
+import time
+import uuid
+from typing import Callable, Dict, NamedTuple, Optional
+
+from benchmarks.common import (
+    DEFAULT_DATABASE_URL,
+    create_engines,
+    print_results,
+    reset_database,
+    seed,
+    seed_statuses,
+    seed_tasks,
+    summarize,
+    write_results,
+)
+
+import httpx  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from api.deps.db_dependency import get_db, get_async_db, get_async_sessionmaker  # noqa: E402
+from db.session.lazy_session import LazySession, LazyAsyncSession  # noqa: E402
+from main import app  # noqa: E402
+
+logging.getLogger().setLevel(logging.WARNING)  # main включает DEBUG для отладочных настроек
+
+
+class Scenario(NamedTuple):
+    method: str
+    path: str
+    build: Callable[[int], dict]  # Номер запроса -> аргументы httpx (params, json, ...)
+
+
+def build_scenarios(data: Dict[str, list], disposable: Dict[str, list], bulk_size: int) -> Dict[str, Scenario]:
+    """Сначала чтение, затем запись и удаление, чтобы удаления не влияли на чтение"""
+    task_ids = data["task_ids"]
+    status_ids = data["status_ids"]
+
+    def pick(items: list, i: int):
+        return items[i % len(items)]
+
+    def task_update(i: int, task_id: uuid.UUID) -> dict:
+        return {"id": task_id.hex, "name": f"Обновлена {i}", "text": None, "status": pick(status_ids, i)}
+
+    return {
+        "GET /health": Scenario("GET", "/health", lambda i: {}),
+        "GET /tasks/get": Scenario("GET", "/tasks/get", lambda i: {"params": {"task_id": pick(task_ids, i).hex}}),
+        "GET /tasks/get_list": Scenario("GET", "/tasks/get_list", lambda i: {"params": {"limit": 100}}),
+        "GET /tasks/get_list?status": Scenario(
+            "GET", "/tasks/get_list", lambda i: {"params": {"limit": 100, "status": pick(status_ids, i)}}
+        ),
+        # Слово есть в названии каждой задачи: ранжируется вся таблица
+        "GET /tasks/search": Scenario("GET", "/tasks/search", lambda i: {"params": {"q": "задача", "limit": 20}}),
+        "GET /tasks/export": Scenario("GET", "/tasks/export", lambda i: {}),
+        "GET /status/get": Scenario("GET", "/status/get", lambda i: {"params": {"status_id": pick(status_ids, i)}}),
+        "GET /status/get_all_statuses": Scenario("GET", "/status/get_all_statuses", lambda i: {}),
+        "PUT /tasks/create": Scenario(
+            "PUT", "/tasks/create",
+            lambda i: {"json": {"name": f"Новая {i}", "text": "Текст", "status": pick(status_ids, i)}},
+        ),
+        "POST /tasks/bulk_create": Scenario(
+            "POST", "/tasks/bulk_create",
+            lambda i: {"json": [
+                {"name": f"Новая {i}.{j}", "text": "Текст", "status": pick(status_ids, j)} for j in range(bulk_size)
+            ]},
+        ),
+        "PATCH /tasks/update": Scenario("PATCH", "/tasks/update", lambda i: {"json": task_update(i, pick(task_ids, i))}),
+        "PATCH /tasks/bulk_update": Scenario(
+            "PATCH", "/tasks/bulk_update",
+            lambda i: {"json": [task_update(i, pick(task_ids, i * bulk_size + j)) for j in range(bulk_size)]},
+        ),
+        "PUT /status/create": Scenario("PUT", "/status/create", lambda i: {"params": {"status_name": f"Новый {i}"}}),
+        "PATCH /status/update": Scenario(
+            "PATCH", "/status/update", lambda i: {"json": {"id": pick(status_ids, i), "name": f"Статус {i}"}}
+        ),
+        "DELETE /tasks/delete": Scenario(
+            "DELETE", "/tasks/delete", lambda i: {"params": {"task_id": disposable["task_ids"][i].hex}}
+        ),
+        "DELETE /tasks/bulk_delete": Scenario(
+            "DELETE", "/tasks/bulk_delete",
+            lambda i: {"json": [task_id.hex for task_id in disposable["bulk_task_ids"][i * bulk_size:(i + 1) * bulk_size]]},
+        ),
+        "DELETE /status/delete": Scenario(
+            "DELETE", "/status/delete", lambda i: {"params": {"status_id": disposable["status_ids"][i]}}
+        ),
+    }
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def send(i: int):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            resp = await client.request(scenario.method, scenario.path, **scenario.build(i))
+            latencies.append(time.perf_counter() - started)
+            if resp.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(requests)))
+    return summarize(latencies, time.perf_counter() - started, errors)
+
+
+def create_disposable(engine, data: Dict[str, list], requests: int, bulk_size: int) -> Dict[str, list]:
+    """Отдельные задачи и статусы для сценариев удаления"""
+    first_status_id = len(data["status_ids"]) + 1
+    status_ids = list(range(first_status_id, first_status_id + requests))
+    seed_statuses(engine, status_ids, prefix="Удаляемый")
+    task_ids = seed_tasks(engine, requests * (bulk_size + 1), data["status_ids"])
+    return {"task_ids": task_ids[:requests], "bulk_task_ids": task_ids[requests:], "status_ids": status_ids}
+
+
+async def run(args: argparse.Namespace) -> Dict[str, dict]:
+    engine, async_engine = create_engines(args.database_url)
+    reset_database(engine)
+    data = seed(engine, args.statuses, args.tasks)
+    disposable = create_disposable(engine, data, args.requests, args.bulk_size)
+    scenarios = build_scenarios(data, disposable, args.bulk_size)
+
+    overrides = dict(app.dependency_overrides)
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        session_factory = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+        sync_session_factory = sessionmaker(bind=engine, autoflush=False)
+
+        async def override_get_async_db():
+            session = LazyAsyncSession(session_factory)
+            try:
+                yield session
+            finally:
+                await session.close()
+
+        def override_get_db():
+            session = LazySession(sync_session_factory)
+            try:
+                yield session
+            finally:
+                session.close()
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_async_sessionmaker] = lambda: session_factory
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    results = {}
+    try:
+        async with client:
+            await client.get("/tasks/get_list")  # Прогрев пулов и кэша статусов
+            for name, scenario in scenarios.items():
+                if args.only and not any(part in name for part in args.only):
+                    continue
+                results[name] = await run_scenario(client, scenario, args.requests, args.concurrency)
+    finally:
+        app.dependency_overrides = overrides
+        await async_engine.dispose()
+        engine.dispose()
+
+    return results
+
+
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--base-url", help="Адрес запущенного сервера; по умолчанию - приложение внутри процесса")
+    parser.add_argument("--statuses", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=200, help="Запросов на каждый эндпоинт")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--bulk-size", type=int, default=100, help="Задач в одном массовом запросе")
+    parser.add_argument("--only", nargs="*", help="Запускать только сценарии, в имени которых есть подстрока")
+    parser.add_argument("--output", help="Файл для результатов в JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list] = None) -> dict:
+    args = parse_args(argv)
+    results = asyncio.run(run(args))
+    print_results(results)
+    params = {key: value for key, value in vars(args).items() if key not in ("output", "database_url")}
+    return write_results(args.output, "endpoints", args.database_url, params, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Стоимость сериализации списка задач в расчете на одну строку: обычный путь
+(ORM-объекты -> TaskModel -> валидация response_model -> json) против быстрого
+(кортежи колонок -> dict -> orjson).
+
+Запуск из каталога app:
+    python -m benchmarks.bench_serialization --rows 20000
+"""
+import argparse
+import os
+import time
+import uuid
+from typing import Callable
+
+os.environ.setdefault("DEBUG", "True")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import Session, joinedload  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from api.responses import FastJSONResponse  # noqa: E402
+from db.entities.models import Base, Status, Task  # noqa: E402
+from schemas.models import TaskModel, TaskPage  # noqa: E402
+from services.tasks_services import TaskSearchService  # noqa: E402
+
+page_adapter = TypeAdapter(TaskPage)
+
+
+def seed(session: Session, rows: int):
+    session.add(Status(id=1, name="В работе"))
+    session.execute(
+        insert(Task),
+        [
+            {"id": uuid.uuid4(), "name": f"Задача {i}", "text": "Текст задачи " * 20, "status_id": 1}
+            for i in range(rows)
+        ],
+    )
+    session.commit()
+
+
+def model_path(session: Session, rows: int) -> bytes:
+    """Как было: ORM-объекты, TaskModel на каждую строку, повторная валидация и json"""
+    tasks = session.query(Task).options(joinedload(Task.status)).order_by(Task.id).limit(rows).all()
+    page = TaskPage(
+        items=[TaskModel(id=task.id.hex, name=task.name, text=task.text, status=task.status.name) for task in tasks]
+    )
+    content = page_adapter.dump_python(page_adapter.validate_python(page), mode="json")
+    return JSONResponse(content).body
+
+
+def fast_path(session: Session, rows: int) -> bytes:
+    return FastJSONResponse(TaskSearchService(session).get_tasks_page_rows(limit=rows)).body
+
+
+def serialize_models(page: TaskPage) -> bytes:
+    return JSONResponse(page_adapter.dump_python(page_adapter.validate_python(page), mode="json")).body
+
+
+def serialize_rows(page: dict) -> bytes:
+    return FastJSONResponse(page).body
+
+
+def measure(fn: Callable[[], bytes], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session, args.rows)
+        service = TaskSearchService(session)
+
+        assert model_path(session, args.rows) and fast_path(session, args.rows)
+        page = service.get_tasks_page(limit=args.rows)
+        rows = service.get_tasks_page_rows(limit=args.rows)
+
+        results = {
+            "запрос + сериализация, TaskModel": measure(lambda: model_path(session, args.rows), args.repeat),
+            "запрос + сериализация, быстрый путь": measure(lambda: fast_path(session, args.rows), args.repeat),
+            "только сериализация, TaskModel": measure(lambda: serialize_models(page), args.repeat),
+            "только сериализация, orjson": measure(lambda: serialize_rows(rows), args.repeat),
+        }
+
+    print(f"Строк: {args.rows}, лучшее из {args.repeat} запусков")
+    for name, seconds in results.items():
+        print(f"{name:<40} {seconds * 1e6 / args.rows:8.2f} мкс/строка")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""Микробенчмарки методов сервисов без HTTP-слоя: каждый вызов идет в новой сессии,
+как в обработчике запроса.
+
+Запуск из каталога app:
+    python -m benchmarks.bench_services --tasks 10000 --iterations 200 --output services.json
+"""
+import argparse
+import asyncio
+import time
+from typing import Callable, Dict, NamedTuple, Optional
+
+from benchmarks.common import (
+    DEFAULT_DATABASE_URL,
+    create_engines,
+    print_results,
+    reset_database,
+    seed,
+    seed_statuses,
+    seed_tasks,
+    summarize,
+    timed,
+    write_results,
+)
+
+from sqlalchemy.ext.asyncio import async_sessionmaker  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from schemas.models import StatusModification, TaskCreationModel, TaskModificationModel  # noqa: E402
+from services.status_services import (  # noqa: E402
+    CreateStatusService,
+    DeleteStatusService,
+    SearchStatusService,
+    UpdateStatusService,
+)
+from services.tasks_services import (  # noqa: E402
+    BulkTaskCreationService,
+    BulkTaskDeleteService,
+    BulkTaskModificationService,
+    TaskCreationService,
+    TaskDeleteService,
+    TaskExportService,
+    TaskModificationService,
+    TaskSearchService,
+)
+
+
+class Operation(NamedTuple):
+    call: Callable[[Session, int], object]
+    divisor: int = 1  # Во сколько раз меньше итераций для операций над всей таблицей
+
+
+def build_operations(data: Dict[str, list], disposable: Dict[str, list], bulk_size: int, export) -> Dict[str, Operation]:
+    """Сначала чтение, затем запись и удаление, как в bench_endpoints"""
+    task_ids = data["task_ids"]
+    status_ids = data["status_ids"]
+
+    def pick(items: list, i: int):
+        return items[i % len(items)]
+
+    def task_update(i: int, task_id) -> TaskModificationModel:
+        return TaskModificationModel(id=task_id.hex, name=f"Обновлена {i}", text=None, status=pick(status_ids, i))
+
+    def task_creation(i: int) -> TaskCreationModel:
+        return TaskCreationModel(name=f"Новая {i}", text="Текст", status=pick(status_ids, i))
+
+    return {
+        "TaskSearchService.find_task_by_id": Operation(
+            lambda session, i: TaskSearchService(session).find_task_by_id(pick(task_ids, i))
+        ),
+        "TaskSearchService.get_tasks_page": Operation(
+            lambda session, i: TaskSearchService(session).get_tasks_page(limit=100)
+        ),
+        "TaskSearchService.get_tasks_page_rows": Operation(
+            lambda session, i: TaskSearchService(session).get_tasks_page_rows(limit=100)
+        ),
+        "TaskSearchService.get_all_tasks": Operation(
+            lambda session, i: TaskSearchService(session).get_all_tasks(), divisor=20
+        ),
+        "TaskExportService.stream_rows": Operation(lambda session, i: export(), divisor=20),
+        "SearchStatusService.find_status_by_id": Operation(
+            lambda session, i: SearchStatusService(session).find_status_by_id(pick(status_ids, i))
+        ),
+        "SearchStatusService.get_all_statuses": Operation(
+            lambda session, i: SearchStatusService(session).get_all_statuses()
+        ),
+        "TaskCreationService": Operation(lambda session, i: TaskCreationService(session)(task_creation(i))),
+        "BulkTaskCreationService": Operation(
+            lambda session, i: BulkTaskCreationService(session)([task_creation(j) for j in range(bulk_size)])
+        ),
+        "TaskModificationService": Operation(
+            lambda session, i: TaskModificationService(session)(task_update(i, pick(task_ids, i)))
+        ),
+        "BulkTaskModificationService": Operation(
+            lambda session, i: BulkTaskModificationService(session)(
+                [task_update(i, pick(task_ids, i * bulk_size + j)) for j in range(bulk_size)]
+            )
+        ),
+        "CreateStatusService": Operation(lambda session, i: CreateStatusService(session)(f"Новый {i}")),
+        "UpdateStatusService": Operation(
+            lambda session, i: UpdateStatusService(session)(StatusModification(id=pick(status_ids, i), name=f"Статус {i}"))
+        ),
+        "TaskDeleteService": Operation(lambda session, i: TaskDeleteService(session)(disposable["task_ids"][i])),
+        "BulkTaskDeleteService": Operation(
+            lambda session, i: BulkTaskDeleteService(session)(
+                [task_id.hex for task_id in disposable["bulk_task_ids"][i * bulk_size:(i + 1) * bulk_size]]
+            )
+        ),
+        "DeleteStatusService": Operation(
+            lambda session, i: DeleteStatusService(session)(disposable["status_ids"][i])
+        ),
+    }
+
+
+def create_disposable(engine, data: Dict[str, list], iterations: int, bulk_size: int) -> Dict[str, list]:
+    """Отдельные задачи и статусы для операций удаления"""
+    first_status_id = len(data["status_ids"]) + 1
+    status_ids = list(range(first_status_id, first_status_id + iterations))
+    seed_statuses(engine, status_ids, prefix="Удаляемый")
+    task_ids = seed_tasks(engine, iterations * (bulk_size + 1), data["status_ids"])
+    return {"task_ids": task_ids[:iterations], "bulk_task_ids": task_ids[iterations:], "status_ids": status_ids}
+
+
+def run(args: argparse.Namespace) -> Dict[str, dict]:
+    engine, async_engine = create_engines(args.database_url)
+    reset_database(engine)
+    data = seed(engine, args.statuses, args.tasks)
+    disposable = create_disposable(engine, data, args.iterations, args.bulk_size)
+
+    export_service = TaskExportService(async_sessionmaker(async_engine))
+    loop = asyncio.new_event_loop()
+
+    async def consume_export():
+        async for _ in export_service.stream_rows():
+            pass
+
+    operations = build_operations(data, disposable, args.bulk_size, lambda: loop.run_until_complete(consume_export()))
+
+    results = {}
+    try:
+        for name, operation in operations.items():
+            if args.only and not any(part in name for part in args.only):
+                continue
+            latencies = []
+            for i in range(max(1, args.iterations // operation.divisor)):
+                with Session(engine, autoflush=False) as session:
+                    latencies.append(timed(lambda: operation.call(session, i)))
+            results[name] = summarize(latencies)
+    finally:
+        loop.run_until_complete(async_engine.dispose())
+        loop.close()
+        engine.dispose()
+
+    return results
+
+
+def parse_args(argv: Optional[list] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--statuses", type=int, default=10)
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=200, help="Вызовов каждого метода")
+    parser.add_argument("--bulk-size", type=int, default=100, help="Задач в одном массовом вызове")
+    parser.add_argument("--only", nargs="*", help="Запускать только методы, в имени которых есть подстрока")
+    parser.add_argument("--output", help="Файл для результатов в JSON")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list] = None) -> dict:
+    args = parse_args(argv)
+    started = time.perf_counter()
+    results = run(args)
+    print_results(results)
+    print(f"Всего: {time.perf_counter() - started:.1f} с")
+    params = {key: value for key, value in vars(args).items() if key not in ("output", "database_url")}
+    return write_results(args.output, "services", args.database_url, params, results)
+
+
+if __name__ == "__main__":
+    main()
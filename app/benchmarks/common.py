@@ -0,0 +1,141 @@
+"""Общие части бенчмарков: подключение к БД, заполнение через фабрики из тестов,
+статистика и сохранение результатов в JSON"""
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+os.environ.setdefault("DEBUG", "True")
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+
+import factory  # noqa: E402
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.engine import Engine, make_url  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from db.entities.models import Base  # noqa: E402
+from db.session.db_session import get_async_database_uri  # noqa: E402
+from services.status_cache import status_cache  # noqa: E402
+from tests.factories import StatusDbModelFactory, TaskDbModelFactory  # noqa: E402
+
+DEFAULT_DATABASE_URL = "sqlite:///bench.sqlite3"
+
+
+def create_engines(database_url: str) -> Tuple[Engine, AsyncEngine]:
+    engine = create_engine(database_url)
+    async_engine = create_async_engine(get_async_database_uri(database_url))
+    return engine, async_engine
+
+
+def reset_database(engine: Engine):
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    status_cache.invalidate()
+
+
+def seed_statuses(engine: Engine, status_ids: List[int], prefix: str = "Статус"):
+    with Session(engine) as session:
+        session.add_all(
+            StatusDbModelFactory.build_batch(
+                len(status_ids), id=factory.Iterator(status_ids), name=factory.Sequence(lambda n: f"{prefix} {n}")
+            )
+        )
+        session.commit()
+
+    status_cache.invalidate()
+
+
+def seed_tasks(engine: Engine, count: int, status_ids: List[int], batch_size: int = 5000) -> List[uuid.UUID]:
+    task_ids = []
+    with Session(engine) as session:
+        for start in range(0, count, batch_size):
+            batch = TaskDbModelFactory.build_batch(
+                min(batch_size, count - start),
+                id=factory.LazyFunction(uuid.uuid4),
+                name=factory.Sequence(lambda n: f"Задача {n}"),
+                text="Текст задачи для бенчмарка " * 10,
+                status_id=factory.Iterator(status_ids),
+            )
+            task_ids.extend(task.id for task in batch)
+            session.add_all(batch)
+            session.commit()
+
+    return task_ids
+
+
+def seed(engine: Engine, statuses: int, tasks: int) -> Dict[str, list]:
+    """Заполняет базу через фабрики из tests/factories.py и возвращает созданные id"""
+    status_ids = list(range(1, statuses + 1))
+    seed_statuses(engine, status_ids)
+    return {"status_ids": status_ids, "task_ids": seed_tasks(engine, tasks, status_ids)}
+
+
+def summarize(latencies: List[float], wall_time: Optional[float] = None, errors: int = 0) -> dict:
+    """Перцентили в миллисекундах и пропускная способность"""
+    ordered = sorted(latencies)
+
+    def percentile(p: float) -> float:
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, round(p / 100 * (len(ordered) - 1)))] * 1000
+
+    total = wall_time if wall_time is not None else sum(latencies)
+    return {
+        "count": len(latencies),
+        "errors": errors,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+        "p50_ms": percentile(50),
+        "p90_ms": percentile(90),
+        "p99_ms": percentile(99),
+        "max_ms": ordered[-1] * 1000 if ordered else 0.0,
+        "throughput_per_s": len(latencies) / total if total else 0.0,
+    }
+
+
+def timed(fn) -> float:
+    started = time.perf_counter()
+    fn()
+    return time.perf_counter() - started
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(path: Optional[str], kind: str, database_url: str, params: dict, results: Dict[str, dict]):
+    report = {
+        "kind": kind,
+        "meta": {
+            "revision": git_revision(),
+            "database": make_url(database_url).get_backend_name(),
+            "python": platform.python_version(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            **params,
+        },
+        "results": results,
+    }
+    if path:
+        Path(path).write_text(json.dumps(report, ensure_ascii=False, indent=2))
+
+    return report
+
+
+def print_results(results: Dict[str, dict]):
+    width = max((len(name) for name in results), default=0)
+    print(f"{'':<{width}} {'n':>6} {'p50, мс':>9} {'p90, мс':>9} {'p99, мс':>9} {'в сек':>9} {'ошибок':>7}")
+    for name, stats in results.items():
+        print(
+            f"{name:<{width}} {stats['count']:>6} {stats['p50_ms']:>9.2f} {stats['p90_ms']:>9.2f} "
+            f"{stats['p99_ms']:>9.2f} {stats['throughput_per_s']:>9.1f} {stats['errors']:>7}"
+        )
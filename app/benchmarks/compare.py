@@ -0,0 +1,64 @@
+"""Сравнение двух JSON с результатами бенчмарков (bench_endpoints или bench_services).
+
+Завершается с кодом 1, если p50 или p99 какого-либо сценария выросли больше
+чем на --threshold процентов, поэтому подходит как проверка в CI.
+
+Запуск из каталога app:
+    python -m benchmarks.compare baseline.json current.json --threshold 10
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+METRICS = ("p50_ms", "p99_ms")
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> List[str]:
+    """Печатает таблицу изменений и возвращает список регрессий"""
+    regressions = []
+    print(f"{'':<40} {'метрика':>8} {'было, мс':>10} {'стало, мс':>10} {'изм., %':>8}")
+    for name, stats in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            print(f"{name:<40} новый сценарий")
+            continue
+
+        for metric in METRICS:
+            before, after = previous[metric], stats[metric]
+            change = (after - before) / before * 100 if before else 0.0
+            marker = ""
+            if change > threshold:
+                marker = " !"
+                regressions.append(f"{name}: {metric} {before:.2f} -> {after:.2f} мс (+{change:.1f}%)")
+            print(f"{name:<40} {metric:>8} {before:>10.2f} {after:>10.2f} {change:>+8.1f}{marker}")
+
+    return regressions
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Допустимый рост задержки, %%")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(Path(args.baseline).read_text())
+    current = json.loads(Path(args.current).read_text())
+    if baseline["kind"] != current["kind"]:
+        print(f"Нельзя сравнивать результаты {baseline['kind']} и {current['kind']}", file=sys.stderr)
+        return 2
+
+    regressions = compare(baseline, current, args.threshold)
+    if regressions:
+        print(f"\nРегрессии больше {args.threshold:g}%:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
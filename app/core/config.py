@@ -1,26 +1,118 @@
-from logging import DEBUG, INFO
-from typing import Literal
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import ClassVar, List, Literal, Optional
+from dotenv import load_dotenv
+from pydantic import AliasChoices, Field, TypeAdapter
 from pydantic_settings import BaseSettings
-from environs import Env
 
-env = Env()
+ENV_FILE = Path(__file__).resolve().parent.parent.parent / ".env"
 
-env.read_env()
 
+class CommonSettings(BaseSettings):
+    """Настройки, общие для разработки и продакшена. Читаются из переменных окружения"""
 
-class DevSettings(BaseSettings):
+    DEBUG: ClassVar[bool] = False
+
+    STATUS_CACHE_TTL: Optional[float] = None  # Секунды; None - кэш статусов не устаревает
+    STATUS_CACHE_MISS_RELOAD_INTERVAL: float = 1.0  # Секунды между перечитываниями справочника из-за неизвестного id
+    BULK_CHUNK_SIZE: int = 1000  # Сколько задач вставляется одним INSERT при массовом создании
+    EXPORT_BATCH_SIZE: int = 1000  # Сколько строк выгрузки читается с серверного курсора за раз
+    # Версия UUID новых задач: 7 растет со временем и вставляется в конец индекса, но раскрывает время создания
+    TASK_ID_VERSION: Literal[4, 7] = 4
+    FAST_JSON_LISTS: bool = True  # Списки сериализуются orjson напрямую, минуя pydantic-модели
+    ETAG_TTL: Optional[float] = None  # Секунды; ETag меняется не реже, чтобы учесть записи других экземпляров
+    # Файл общих для воркеров версий ETag; при нескольких воркерах main.py создает его, если не задан
+    VERSIONS_FILE: Optional[str] = None
+    HTTP_CACHE_MAX_AGE: int = 0  # max-age в Cache-Control; 0 - клиент каждый раз проверяет ETag
+
+    # Сжатие ответов: порядок предпочтения; zstd и br используются, если установлены zstandard и brotli
+    COMPRESSION_ENCODINGS: List[str] = ["zstd", "br", "gzip"]  # Пустой список выключает сжатие
+    COMPRESSION_MIN_SIZE: int = 1024  # Ответы меньше N байт не сжимаются
+    COMPRESSION_THREADPOOL_MIN_SIZE: int = 256 * 1024  # Ответы от N байт сжимаются в пуле потоков
+
+    # Кэш задач для /tasks/get: memory - LRU в процессе, redis - общий Redis-совместимый сервер, none - выключен
+    TASK_CACHE_BACKEND: Literal["none", "memory", "redis"] = "memory"
+    TASK_CACHE_SIZE: int = 10000  # Сколько задач хранит LRU в памяти
+    TASK_CACHE_TTL: Optional[float] = 30.0  # Секунды; столько запись может пережить изменение в другом воркере
+    TASK_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    TASK_CACHE_REDIS_TIMEOUT: float = 0.1  # Секунды; при ошибке или таймауте запрос идет в БД
+    TASK_CACHE_REDIS_RETRY_AFTER: float = 1.0  # Секунды без обращений к серверу кэша после сетевой ошибки
+
+    # Подсчет SQL-запросов на HTTP-запрос: заголовок Server-Timing и предупреждения в лог
+    QUERY_METRICS: bool = True
+    QUERY_COUNT_WARNING: int = 20  # Предупреждать, если запрос сделал больше N обращений к БД
+    DB_TIME_WARNING_MS: float = 500.0  # ... или провел в БД больше N мс
+    SLOW_QUERY_WARNING_MS: float = 200.0  # ... или один SQL-запрос шел дольше N мс
+
+    # Метрики /metrics. При нескольких воркерах снимки процессов складываются в METRICS_DIR;
+    # если каталог не задан, main.py создает временный
+    METRICS_DIR: Optional[str] = None
+    METRICS_SNAPSHOT_INTERVAL: float = 5.0  # Как часто воркер сохраняет свой снимок, секунды
+
+    # Проба /health/ready: фоновая проверка БД и заполненность пулов
+    READINESS_INTERVAL: float = 5.0  # Как часто выполняется SELECT 1, секунды
+    READINESS_TIMEOUT: float = 2.0  # Сколько ждать ответа БД, секунды
+    READINESS_MAX_AGE: float = 15.0  # Более старый результат проверки считается неизвестным
+    READINESS_MAX_POOL_SATURATION: float = 1.0  # Доля занятых соединений, при которой под не готов
+
+    # Пул соединений с БД (для SQLite в памяти не применяется)
+    POOL_SIZE: int = 5
+    POOL_MAX_OVERFLOW: int = 10
+    POOL_TIMEOUT: float = 30.0  # Сколько ждать свободного соединения, секунды
+    POOL_RECYCLE: int = -1  # Пересоздавать соединения старше N секунд; -1 - никогда
+    POOL_PRE_PING: bool = False
+
+    # Где выполняются сервисы: async - AsyncSession.run_sync на асинхронном драйвере,
+    # threads - ограниченный пул потоков с синхронным движком
+    SERVICE_EXECUTOR: Literal["async", "threads"] = "async"
+    SERVICE_THREADS: Optional[int] = None  # None - по числу соединений синхронного пула
+    SERVICE_QUEUE_SIZE: int = 64  # Сколько вызовов может ждать свободный поток; сверх этого - 503
+    SERVICE_QUEUE_TIMEOUT: Optional[float] = 5.0  # Вызов, ждавший поток дольше N секунд, получает 503
+
+    # Сервер uvicorn
+    WORKERS: int = 1  # Число процессов; каждый создает свой движок и пул соединений
+    LOOP: Literal["auto", "asyncio", "uvloop"] = "auto"  # auto - uvloop, если установлен
+    HTTP: Literal["auto", "h11", "httptools"] = "auto"  # auto - httptools, если установлен
+    BACKLOG: int = 2048
+    TIMEOUT_KEEP_ALIVE: int = 5
+    LIMIT_CONCURRENCY: Optional[int] = None  # Сверх лимита воркер отвечает 503
+    LIMIT_MAX_REQUESTS: Optional[int] = None  # Перезапуск воркера после N запросов
+    TIMEOUT_GRACEFUL_SHUTDOWN: Optional[int] = 30  # Сколько ждать завершения запросов при SIGTERM
+
+
+class DevSettings(CommonSettings):
+    DEBUG: ClassVar[bool] = True
     DATABASE_URI: str = "sqlite:///db.sqlite3"  # Для разработки и тестирования приложения
-    LOGGING_LEVEL: Literal[10] = DEBUG
+    LOGGING_LEVEL: Literal[10] = logging.DEBUG
     HOST: str = "127.0.0.1"
     PORT: int = 8000
 
 
-class ProductionSettings(BaseSettings):
-    DATABASE_URI: str = env.str("DATABASE_URL")
-    LOGGING_LEVEL: Literal[20] = INFO
+class ProductionSettings(CommonSettings):
+    # Из переменной DATABASE_URL; в конструктор можно передать DATABASE_URI
+    DATABASE_URI: str = Field(validation_alias=AliasChoices("DATABASE_URI", "DATABASE_URL"))
+    LOGGING_LEVEL: Literal[20] = logging.INFO
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    STATUS_CACHE_TTL: Optional[float] = 30.0  # При нескольких воркерах кэш статусов перечитывается
+    ETAG_TTL: Optional[float] = 30.0
+    POOL_SIZE: int = 10
+    POOL_MAX_OVERFLOW: int = 20
+    POOL_RECYCLE: int = 1800  # Меньше wait_timeout MySQL, иначе "server has gone away"
+    POOL_PRE_PING: bool = True
+    WORKERS: int = Field(default_factory=lambda: os.cpu_count() or 1)
+
+
+@lru_cache
+def get_settings() -> CommonSettings:
+    """Настройки процесса. .env читается один раз и не перекрывает переменные окружения,
+    а создается только выбранный переменной DEBUG набор настроек"""
+    load_dotenv(ENV_FILE)
+    if TypeAdapter(bool).validate_python(os.environ.get("DEBUG", False)):
+        return DevSettings()
+    return ProductionSettings()
 
 
-dev_settings = DevSettings()
-prod_settings = ProductionSettings()
+settings = get_settings()
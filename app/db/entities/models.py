@@ -1,6 +1,7 @@
 from sqlalchemy.orm import DeclarativeBase, relationship
-from sqlalchemy import Column, String, Integer, Uuid, ForeignKey
-from uuid import uuid4
+from sqlalchemy import Column, String, Integer, ForeignKey, Index, DDL, event, inspect
+from sqlalchemy.engine import Connection
+from .types import BinaryUUID, new_task_id
 
 
 class Base(DeclarativeBase): ...
@@ -21,12 +22,18 @@ class Status(Base):
 
 class Task(Base):
     __tablename__ = "task"
+    __table_args__ = (
+        # Выборка задач одного статуса с keyset-пагинацией по id - диапазон по индексу
+        Index("ix_task_status_id_id", "status_id", "id"),
+        # Полнотекстовый поиск по названию и тексту в MySQL
+        Index("ix_task_fulltext", "name", "text", mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
 
+    # Первичный ключ уже индекс: отдельный индекс по id только удваивал бы его
     id = Column(
-        Uuid(as_uuid=True, native_uuid=True),
+        BinaryUUID(),
         primary_key=True,
-        index=True,
-        default=uuid4,
+        default=new_task_id,
     )
     name = Column(String(length=2048))
     text = Column(String(length=4096))
@@ -35,3 +42,35 @@ class Task(Base):
 
     def __repr__(self):
         return self.name
+
+
+# В SQLite (DEBUG и тесты) вместо FULLTEXT - таблица FTS5 с внешним содержимым:
+# текст хранится только в task, а триггеры обновляют индекс в той же транзакции.
+# Строки связаны по rowid, поэтому после VACUUM индекс нужно перестроить:
+# INSERT INTO task_fts(task_fts) VALUES('rebuild')
+TASK_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS task_fts USING fts5("
+    "name, text, content='task', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_insert AFTER INSERT ON task BEGIN "
+    "INSERT INTO task_fts(rowid, name, text) VALUES (new.rowid, new.name, new.text); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_delete AFTER DELETE ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, name, text) VALUES ('delete', old.rowid, old.name, old.text); END",
+    "CREATE TRIGGER IF NOT EXISTS task_fts_update AFTER UPDATE OF name, text ON task BEGIN "
+    "INSERT INTO task_fts(task_fts, rowid, name, text) VALUES ('delete', old.rowid, old.name, old.text); "
+    "INSERT INTO task_fts(rowid, name, text) VALUES (new.rowid, new.name, new.text); END",
+)
+
+for statement in TASK_FTS_DDL:
+    event.listen(Task.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+# Триггеры удаляются вместе с task, таблицу индекса нужно удалить отдельно
+event.listen(Task.__table__, "after_drop", DDL("DROP TABLE IF EXISTS task_fts").execute_if(dialect="sqlite"))
+
+
+def create_task_fts(connection: Connection):
+    """Создает поисковый индекс в SQLite-базе, где task появилась раньше него, и заполняет его"""
+    if connection.dialect.name != "sqlite" or inspect(connection).has_table("task_fts"):
+        return
+
+    for statement in TASK_FTS_DDL:
+        connection.exec_driver_sql(statement)
+    connection.exec_driver_sql("INSERT INTO task_fts(task_fts) VALUES ('rebuild')")
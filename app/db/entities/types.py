@@ -0,0 +1,60 @@
+import os
+import time
+from typing import Optional
+from uuid import UUID, uuid4
+from sqlalchemy import Uuid
+from sqlalchemy.dialects import mysql
+from sqlalchemy.engine import Dialect
+from sqlalchemy.types import TypeDecorator, TypeEngine
+
+
+class BinaryUUID(TypeDecorator):
+    """UUID, который в MySQL хранится в BINARY(16), а не в CHAR(32).
+
+    Ключ вдвое короче, поэтому первичный индекс и все вторичные индексы, которые
+    хранят его копию, занимают меньше места. Порядок байтов совпадает с порядком
+    hex-строк, так что keyset-пагинация по id не меняется. В остальных БД -
+    обычный Uuid: нативный тип в PostgreSQL, CHAR(32) в SQLite
+    """
+
+    impl = Uuid
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect: Dialect) -> TypeEngine:
+        if dialect.name == "mysql":
+            return dialect.type_descriptor(mysql.BINARY(16))
+        return dialect.type_descriptor(Uuid(as_uuid=True, native_uuid=True))
+
+    def process_bind_param(self, value: Optional[UUID], dialect: Dialect):
+        if value is None or dialect.name != "mysql":
+            return value
+        return value.bytes
+
+    def process_result_value(self, value, dialect: Dialect) -> Optional[UUID]:
+        if value is None or dialect.name != "mysql":
+            return value
+        return UUID(bytes=bytes(value))
+
+
+def uuid7() -> UUID:
+    """UUID версии 7 (RFC 9562): первые 48 бит - время в миллисекундах, остальное
+    случайно. Новые id больше старых, поэтому вставка идет в конец первичного индекса,
+    а не в случайную страницу. Время создания при этом видно по id"""
+    timestamp_ms = time.time_ns() // 1_000_000
+    random_bits = int.from_bytes(os.urandom(10), "big")
+    value = (
+        (timestamp_ms & (1 << 48) - 1) << 80
+        | 0x7 << 76  # Версия
+        | (random_bits >> 62 & 0xFFF) << 64
+        | 0b10 << 62  # Вариант RFC 9562
+        | random_bits & (1 << 62) - 1
+    )
+    return UUID(int=value)
+
+
+def new_task_id() -> UUID:
+    """id новой задачи: UUIDv7 при TASK_ID_VERSION=7, иначе UUIDv4"""
+    # Настройки импортируются при вызове: модели загружает и alembic/env.py, где core нет в sys.path
+    from core.config import settings
+
+    return uuid7() if settings.TASK_ID_VERSION == 7 else uuid4()
@@ -1,14 +1,114 @@
-from environs import Env
+import os
+from functools import lru_cache
+from typing import NamedTuple
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
-from core.config import dev_settings, prod_settings
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, async_sessionmaker
+from core.config import settings, CommonSettings
+from db.session.pool_metrics import TimedQueuePool, TimedAsyncAdaptedQueuePool
+from db.session.query_metrics import instrument_engine
 
-env = Env()
+# Асинхронные драйверы для диалектов, которые используются с синхронным движком
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "mysql": "aiomysql",
+    "postgresql": "asyncpg",
+}
 
-debug = env.bool("DEBUG")
 
-engine = create_engine(
-    prod_settings.DATABASE_URI if not debug else dev_settings.DATABASE_URI
-)
+def get_async_database_uri(database_uri: str) -> str:
+    url = make_url(database_uri)
+    driver = ASYNC_DRIVERS.get(url.get_backend_name())
+    if driver is None:
+        return database_uri
 
-SessionLocal = sessionmaker(autoflush=False, autocommit=False, bind=engine)
+    return url.set(drivername=f"{url.get_backend_name()}+{driver}").render_as_string(
+        hide_password=False
+    )
+
+
+def get_pool_options(database_uri: str, settings: CommonSettings, is_async: bool = False) -> dict:
+    url = make_url(database_uri)
+    # SQLite в памяти живет в одном соединении, пул для него настраивать нельзя
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+
+    return {
+        "poolclass": TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool,
+        "pool_size": settings.POOL_SIZE,
+        "max_overflow": settings.POOL_MAX_OVERFLOW,
+        "pool_timeout": settings.POOL_TIMEOUT,
+        "pool_recycle": settings.POOL_RECYCLE,
+        "pool_pre_ping": settings.POOL_PRE_PING,
+    }
+
+
+def enable_sqlite_foreign_keys(engine: Engine):
+    """SQLite проверяет внешние ключи, только если на соединении включен PRAGMA foreign_keys.
+    Для асинхронного движка передается async_engine.sync_engine"""
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+class Database(NamedTuple):
+    engine: Engine
+    async_engine: AsyncEngine
+    SessionLocal: sessionmaker
+    AsyncSessionLocal: async_sessionmaker
+
+
+@lru_cache
+def get_database() -> Database:
+    """Движки и фабрики сессий создаются при первом обращении, а не при импорте:
+    процессам, которые не ходят в БД, не нужно загружать драйверы и создавать пулы"""
+    database_uri = settings.DATABASE_URI
+
+    engine = create_engine(database_uri, **get_pool_options(database_uri, settings))
+
+    async_engine = create_async_engine(
+        get_async_database_uri(database_uri),
+        **get_pool_options(database_uri, settings, is_async=True),
+    )
+
+    enable_sqlite_foreign_keys(engine)
+    enable_sqlite_foreign_keys(async_engine.sync_engine)
+
+    if settings.QUERY_METRICS:
+        instrument_engine(engine)
+        instrument_engine(async_engine.sync_engine)
+
+    return Database(
+        engine=engine,
+        async_engine=async_engine,
+        SessionLocal=sessionmaker(autoflush=False, autocommit=False, bind=engine),
+        AsyncSessionLocal=async_sessionmaker(
+            async_engine, autoflush=False, autocommit=False, expire_on_commit=False
+        ),
+    )
+
+
+def __getattr__(name: str):
+    # engine, async_engine, SessionLocal и AsyncSessionLocal остаются атрибутами модуля
+    if name in Database._fields:
+        return getattr(get_database(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def dispose_inherited_pools():
+    # Соединения родительского процесса нельзя использовать после fork:
+    # дочерний процесс откроет свои, не закрывая чужие сокеты
+    if get_database.cache_info().currsize:
+        database = get_database()
+        database.engine.dispose(close=False)
+        database.async_engine.sync_engine.dispose(close=False)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=dispose_inherited_pools)
@@ -0,0 +1,51 @@
+from typing import Callable, Optional, TypeVar
+from sqlalchemy.orm import Session
+
+T = TypeVar("T")
+
+
+class LazySession:
+    """Прокси сессии для зависимостей запроса.
+
+    Сессия создается при первом обращении к любому ее атрибуту, поэтому
+    запросы, на которые ответили из кэша или отклонили при валидации,
+    не создают ее вовсе. Соединение из пула сессия берет только на первом SQL-запросе
+    """
+
+    def __init__(self, factory: Callable[[], Session]):
+        self._factory = factory
+        self._session: Optional[Session] = None
+
+    @property
+    def session(self) -> Session:
+        if self._session is None:
+            self._session = self._factory()
+        return self._session
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name: str):
+        return getattr(self.session, name)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+
+class LazyAsyncSession(LazySession):
+    """То же для AsyncSession. Каждый вызов run_sync - законченная единица работы
+    сервиса: после него сессия закрывается, и соединение возвращается в пул сразу,
+    до сериализации ответа, а не при закрытии зависимостей. Для читающих сервисов
+    это закрывает открытую транзакцию; следующий вызов начнет новую"""
+
+    async def run_sync(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        try:
+            return await self.session.run_sync(fn, *args, **kwargs)
+        finally:
+            await self.session.close()
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
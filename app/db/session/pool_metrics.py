@@ -0,0 +1,73 @@
+import threading
+import time
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool, QueuePool, AsyncAdaptedQueuePool
+from schemas.models import PoolStatusModel
+
+
+class CheckoutStats:
+    """Сколько раз и как долго ждали соединение из пула"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, wait: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+
+
+class TimedPoolMixin:
+    """Замеряет время получения соединения из пула, включая ожидание и pre-ping"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkout_stats = CheckoutStats()
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.checkout_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+
+        self.checkout_stats.record(time.perf_counter() - started)
+        return connection
+
+
+class TimedQueuePool(TimedPoolMixin, QueuePool): ...
+
+
+class TimedAsyncAdaptedQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool): ...
+
+
+def get_pool_status(pool: Pool) -> PoolStatusModel:
+    status = PoolStatusModel(pool=type(pool).__name__)
+    if isinstance(pool, QueuePool):
+        status.size = pool.size()
+        status.checked_out = pool.checkedout()
+        status.idle = pool.checkedin()
+        # overflow() отрицателен, пока пул не заполнен до pool_size
+        status.overflow = max(pool.overflow(), 0)
+        # Публичного метода у QueuePool нет; если атрибут исчезнет в новой версии SQLAlchemy,
+        # поле останется пустым, а не сломает /health/pool и /metrics
+        status.max_overflow = getattr(pool, "_max_overflow", None)
+
+    stats = getattr(pool, "checkout_stats", None)
+    if stats is not None:
+        status.checkouts = stats.checkouts
+        status.timeouts = stats.timeouts
+        calls = stats.checkouts + stats.timeouts
+        status.wait_avg_ms = stats.wait_total / calls * 1000 if calls else 0.0
+        status.wait_max_ms = stats.wait_max * 1000
+
+    return status
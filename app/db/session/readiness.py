@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import Pool
+from db.session.pool_metrics import get_pool_status
+from schemas.models import ReadinessModel
+
+logger = logging.getLogger(__name__)
+
+
+def pool_saturation(pool: Pool) -> Optional[float]:
+    status = get_pool_status(pool)
+    if status.size is None:
+        return None
+
+    # Без max_overflow емкость считается по pool_size: заполненность при этом только завышается
+    capacity = status.size + max(status.max_overflow or 0, 0)
+    return status.checked_out / capacity if capacity else 1.0
+
+
+class ReadinessCheck:
+    """Проверка готовности принимать трафик.
+
+    SELECT 1 выполняется в фоне раз в interval секунд через оба движка: синхронный
+    (SERVICE_EXECUTOR=threads) и асинхронный, через пул и драйвер которого идут
+    эндпоинты. Проба только читает последний результат, поэтому частые пробы
+    не нагружают БД. Результат старше
+    max_age считается неизвестным: значит, фоновая проверка зависла или упала.
+    Заполненность пулов считается при каждой пробе: это чтение счетчиков в памяти
+    """
+
+    def __init__(
+        self,
+        engine: Engine,
+        pools: Dict[str, Pool],
+        interval: float,
+        timeout: float,
+        max_age: float,
+        max_saturation: float,
+        async_engine: Optional[AsyncEngine] = None,
+    ):
+        self.engine = engine
+        self.async_engine = async_engine
+        self.pools = pools
+        self.interval = interval
+        self.timeout = timeout
+        self.max_age = max_age
+        self.max_saturation = max_saturation
+        self.database_ok = False
+        self.detail: Optional[str] = "Проверка БД еще не выполнялась"
+        self.checked_at: Optional[float] = None
+        self._pending: Optional[asyncio.Future] = None
+
+    def check_database(self):
+        with self.engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+
+    async def check_async_database(self):
+        async with self.async_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    async def check_databases(self):
+        checks = [run_in_threadpool(self.check_database)]
+        if self.async_engine is not None:
+            checks.append(self.check_async_database())
+        await asyncio.gather(*checks)
+
+    async def refresh(self):
+        # Если прошлая проверка еще висит, новую не запускаем, а ждем ее
+        if self._pending is None or self._pending.done():
+            self._pending = asyncio.ensure_future(self.check_databases())
+
+        try:
+            await asyncio.wait_for(asyncio.shield(self._pending), self.timeout)
+        except asyncio.TimeoutError:
+            self.database_ok, self.detail = False, f"БД не ответила за {self.timeout:g} с"
+        except Exception as exc:
+            self.database_ok, self.detail = False, f"БД недоступна: {type(exc).__name__}"
+        else:
+            self.database_ok, self.detail = True, None
+
+        if not self.database_ok:
+            logger.warning("Readiness check failed: %s", self.detail)
+        self.checked_at = time.monotonic()
+
+    async def run(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
+
+    def status(self) -> ReadinessModel:
+        result = ReadinessModel(ready=self.database_ok, database=self.database_ok, detail=self.detail)
+        if self.checked_at is not None:
+            result.checked_ago_s = time.monotonic() - self.checked_at
+            if result.checked_ago_s > self.max_age:
+                result.ready = result.database = False
+                result.detail = f"Последняя проверка БД была {result.checked_ago_s:.0f} с назад"
+
+        for name, pool in self.pools.items():
+            saturation = pool_saturation(pool)
+            if saturation is None:
+                continue
+            result.pool_saturation[name] = saturation
+            if saturation >= self.max_saturation:
+                result.ready = False
+                result.detail = result.detail or f"Пул соединений {name} заполнен"
+
+        return result
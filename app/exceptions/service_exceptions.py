@@ -0,0 +1 @@
+class ServiceOverloaded(Exception): ...
\ No newline at end of file
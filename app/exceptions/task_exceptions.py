@@ -1,3 +1,5 @@
 class TaskCreationException(Exception): ...
 class TaskNotFoundException(Exception): ...
-class IncorrectUUIDPassed(Exception): ...
\ No newline at end of file
+class IncorrectUUIDPassed(Exception): ...
+class IncorrectCursorPassed(Exception): ...
+class IncorrectSearchQueryPassed(Exception): ...
\ No newline at end of file
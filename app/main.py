@@ -1,30 +1,10 @@
-from pathlib import Path
 import logging
+import os
 import signal
-from contextlib import asynccontextmanager
-from environs import Env
+import tempfile
 import uvicorn
-from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
-from sqlalchemy.exc import SQLAlchemyError
-from api.endpoints.tasks import router as tasks_router
-from api.endpoints.statuses import router as status_router
-from core.config import dev_settings, prod_settings
-from db.session.db_session import engine
-from db.entities.models import Base
-
-BASE_DIR = Path(__file__).resolve().parent.parent
-env = Env()
-
-env.read_env(BASE_DIR / ".env")
-
-debug = env.bool("DEBUG")
-print(debug)
-
-if debug:
-    settings = dev_settings
-else:
-    settings = prod_settings
+from uvicorn.supervisors import Multiprocess
+from core.config import settings
 
 logging.basicConfig(level=settings.LOGGING_LEVEL)
 logger = logging.getLogger(__name__)
@@ -32,55 +12,68 @@ logger = logging.getLogger(__name__)
 server = None
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    
-    if debug:
-        Base.metadata.drop_all(bind=engine)
-        Base.metadata.create_all(bind=engine)
-
-    yield
-
-    logger.info("Shutting down application...")
-    engine.dispose()
-    logger.info("Database connections closed.")
-
-
-app = FastAPI(title="TestTask", version="1.0", lifespan=lifespan)
-
+def __getattr__(name: str):
+    # Приложение собирается при первом обращении к main.app (uvicorn "main:app").
+    # При запуске python main.py модуль выполняется как __main__, а uvicorn
+    # импортирует main еще раз: так приложение строится только во втором импорте
+    if name == "app":
+        from api.application import app
 
-@app.exception_handler(SQLAlchemyError)
-async def database_error_handler(request: Request, exc: SQLAlchemyError):
-    logger.error(f"Database Error: {str(exc)}")
-
-    return JSONResponse(status_code=500, content={"detail": "Internal Database Error"})
-
-
-@app.get("/health")
-async def healthcheck():
-    return {"health": "ok"}
-
-
-app.include_router(tasks_router, prefix="/tasks")
-app.include_router(status_router, prefix="/status")
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def signal_handler(sig, frame):
-    logger.info("Received interrupt signal. Shutting down...")
+    logger.info("Received %s. Shutting down...", signal.Signals(sig).name)
     if server:
+        # Сервер перестает принимать соединения и ждет завершения текущих запросов
         server.should_exit = True
 
 
+def get_server_config() -> uvicorn.Config:
+    return uvicorn.Config(
+        "main:app",
+        port=settings.PORT,
+        host=settings.HOST,
+        reload=settings.DEBUG,
+        workers=1 if settings.DEBUG else settings.WORKERS,
+        loop=settings.LOOP,
+        http=settings.HTTP,
+        backlog=settings.BACKLOG,
+        timeout_keep_alive=settings.TIMEOUT_KEEP_ALIVE,
+        limit_concurrency=settings.LIMIT_CONCURRENCY,
+        limit_max_requests=settings.LIMIT_MAX_REQUESTS,
+        timeout_graceful_shutdown=settings.TIMEOUT_GRACEFUL_SHUTDOWN,
+    )
+
+
 if __name__ == "__main__":
     signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
 
-    config = uvicorn.Config(
-        "main:app", port=settings.PORT, host=settings.HOST, reload=debug
-    )
+    config = get_server_config()
     server = uvicorn.Server(config)
 
     try:
-        server.run()
+        if config.workers > 1:
+            from api.metrics import clear_snapshots
+            from services.versions import create_versions_file
+
+            # Воркеры читают METRICS_DIR из окружения при импорте приложения
+            metrics_dir = settings.METRICS_DIR or tempfile.mkdtemp(prefix="testtask-metrics-")
+            os.environ["METRICS_DIR"] = metrics_dir
+            clear_snapshots(metrics_dir)
+            # Общие версии ETag: файл создается заново, поэтому epoch меняется при каждом запуске
+            versions_file = settings.VERSIONS_FILE or os.path.join(metrics_dir, "versions.bin")
+            create_versions_file(versions_file)
+            os.environ["VERSIONS_FILE"] = versions_file
+            # Воркеры запускаются через spawn и заново импортируют приложение,
+            # поэтому у каждого свой движок и пул. SIGTERM супервизор передает
+            # воркерам, и каждый завершает текущие запросы
+            logger.info("Starting %d workers", config.workers)
+            Multiprocess(config, target=server.run, sockets=[config.bind_socket()]).run()
+        else:
+            server.run()
     except KeyboardInterrupt:
         logger.info("Server stopped by user")
     finally:
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, List, Optional
 
 class TaskModel(BaseModel):
     id: str
@@ -8,18 +8,42 @@ class TaskModel(BaseModel):
     status: str
 
 
+class TaskPage(BaseModel):
+    items: List[TaskModel]
+    next_cursor: Optional[str] = None  # None - страниц больше нет
+
+
 class TaskCreationModel(BaseModel):
     name: str
     text: str
     status: int  # ID статуса задачи
 
 
+class BulkTaskCreationResult(BaseModel):
+    index: int  # Позиция задачи в запросе
+    created: bool
+    id: Optional[str] = None
+    detail: Optional[str] = None
+
+
 class TaskModificationModel(BaseModel):
     id: str
     name: Optional[str]
     text: Optional[str]
     status: Optional[int]
 
+class BulkTaskModificationResult(BaseModel):
+    updated: List[str]
+    missing: List[str]  # Задачи, которых нет в базе
+    invalid: List[str]  # Неправильные UUID
+    status_not_found: List[str]  # Задачи, для которых указан несуществующий статус
+
+
+class BulkTaskDeletionResult(BaseModel):
+    deleted: List[str]
+    missing: List[str]
+    invalid: List[str]
+
 class StatusModel(BaseModel):
 
     id: int
@@ -29,3 +53,24 @@ class StatusModification(BaseModel):
 
     id: int
     name: Optional[str]
+
+
+class PoolStatusModel(BaseModel):
+    pool: str  # Класс пула соединений
+    size: Optional[int] = None
+    checked_out: Optional[int] = None
+    idle: Optional[int] = None
+    overflow: Optional[int] = None
+    max_overflow: Optional[int] = None
+    checkouts: Optional[int] = None
+    timeouts: Optional[int] = None
+    wait_avg_ms: Optional[float] = None
+    wait_max_ms: Optional[float] = None
+
+
+class ReadinessModel(BaseModel):
+    ready: bool
+    database: bool  # Последняя фоновая проверка БД прошла успешно
+    checked_ago_s: Optional[float] = None  # Сколько секунд назад была проверка
+    detail: Optional[str] = None
+    pool_saturation: Dict[str, float] = {}  # Доля занятых соединений от pool_size + max_overflow
@@ -1,6 +1,58 @@
+import asyncio
+from typing import Type
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from services.status_cache import StatusCache, status_cache
+from services.versions import ResourceVersions, resource_versions
+from services.task_cache import DeferredInvalidations, TaskCache, task_cache as default_task_cache
+from services.executor import ExecutorSession
 
 class Service:
     
-    def __init__(self, session: Session):
-        self.session = session
\ No newline at end of file
+    def __init__(
+        self,
+        session: Session,
+        cache: StatusCache = status_cache,
+        versions: ResourceVersions = resource_versions,
+        task_cache: TaskCache = default_task_cache,
+    ):
+        self.session = session
+        self.status_cache = cache
+        self.versions = versions
+        self.task_cache = task_cache
+
+
+class AsyncService:
+    """Асинхронный вариант сервиса.
+
+    Логика остается в синхронном сервисе `service_class`, а выполняется
+    через AsyncSession.run_sync: запросы идут через асинхронный драйвер
+    и не блокируют event loop
+    """
+
+    service_class: Type[Service]
+
+    def __init__(self, session: AsyncSession, task_cache: TaskCache = default_task_cache):
+        self.session = session
+        self.task_cache = task_cache
+
+    async def __call__(self, *args):
+        return await self._run("__call__", *args)
+
+    @property
+    def blocking_cache_on_loop(self) -> bool:
+        """Сетевой кэш задач нельзя вызывать из run_sync: он выполняется на event loop.
+        С SERVICE_EXECUTOR=threads run_sync и так выполняется в пуле потоков"""
+        return self.task_cache.blocking and not isinstance(self.session, ExecutorSession)
+
+    async def _run(self, method: str, *args):
+        task_cache = DeferredInvalidations() if self.blocking_cache_on_loop else self.task_cache
+
+        def call(sync_session: Session):
+            service = self.service_class(sync_session, task_cache=task_cache)
+            return getattr(service, method)(*args)
+
+        result = await self.session.run_sync(call)
+        if isinstance(task_cache, DeferredInvalidations) and task_cache.task_ids:
+            await asyncio.to_thread(self.task_cache.invalidate, task_cache.task_ids)
+        return result
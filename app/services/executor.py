@@ -0,0 +1,122 @@
+"""Выполнение синхронных сервисов в ограниченном пуле потоков (SERVICE_EXECUTOR=threads).
+
+Потоков по умолчанию столько же, сколько соединений в пуле синхронного движка:
+лишние потоки только ждали бы соединение. Очередь тоже ограничена: при ее
+заполнении вызов сразу получает ServiceOverloaded (503), а не копит задержку
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional, TypeVar
+from sqlalchemy.orm import Session, sessionmaker
+from core.config import settings
+from exceptions.service_exceptions import ServiceOverloaded
+
+T = TypeVar("T")
+
+
+class ServiceExecutor:
+    def __init__(self, max_workers: int, max_queue: int, queue_timeout: Optional[float] = None):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_use = 0  # Выполняются и ждут в очереди
+        self.started = 0
+        self.rejected = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> int:
+        return min(self.in_use, self.max_workers)
+
+    @property
+    def queued(self) -> int:
+        return max(self.in_use - self.max_workers, 0)
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        with self._lock:
+            if self.in_use >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise ServiceOverloaded()
+            self.in_use += 1
+
+        submitted = time.perf_counter()
+
+        def job():
+            waited = time.perf_counter() - submitted
+            with self._lock:
+                self.started += 1
+                self.wait_total += waited
+                self.wait_max = max(self.wait_max, waited)
+            # Клиент, скорее всего, уже не ждет ответа
+            if self.queue_timeout is not None and waited > self.queue_timeout:
+                with self._lock:
+                    self.rejected += 1
+                raise ServiceOverloaded()
+            return fn(*args)
+
+        # Контекст копируется, чтобы в потоке работал учет SQL-запросов текущего HTTP-запроса
+        future = self._get_executor().submit(contextvars.copy_context().run, job)
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future: Future):
+        # Вызывается и после выполнения, и при отмене еще не начатого вызова
+        with self._lock:
+            self.in_use -= 1
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        # Потоки создаются при первом вызове, а не при импорте: до fork воркеров их нет
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="service")
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "threads": self.max_workers,
+            "active": self.active,
+            "queued": self.queued,
+            "started": self.started,
+            "rejected": self.rejected,
+            "wait_total": self.wait_total,
+            "wait_max": self.wait_max,
+        }
+
+
+class ExecutorSession:
+    """Сессия запроса для SERVICE_EXECUTOR=threads. AsyncService обращается
+    к сессии только через run_sync, поэтому сервисы не меняются: функция выполняется
+    в потоке пула с синхронной сессией, которая там же и закрывается"""
+
+    def __init__(self, factory: sessionmaker, executor: ServiceExecutor):
+        self._factory = factory
+        self.executor = executor
+
+    async def run_sync(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        def call():
+            session: Session = self._factory()
+            try:
+                return fn(session, *args, **kwargs)
+            finally:
+                session.close()
+
+        return await self.executor.run(call)
+
+    async def close(self): ...
+
+
+service_executor = ServiceExecutor(
+    settings.SERVICE_THREADS or settings.POOL_SIZE + settings.POOL_MAX_OVERFLOW,
+    max_queue=settings.SERVICE_QUEUE_SIZE,
+    queue_timeout=settings.SERVICE_QUEUE_TIMEOUT,
+)
@@ -0,0 +1,34 @@
+import base64
+import binascii
+from uuid import UUID
+from exceptions.task_exceptions import IncorrectCursorPassed
+
+
+def encode_cursor(task_id: UUID) -> str:
+    """Непрозрачный курсор для keyset-пагинации по id задачи"""
+    return base64.urlsafe_b64encode(task_id.bytes).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> UUID:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return UUID(bytes=raw)
+    except (binascii.Error, ValueError):
+        raise IncorrectCursorPassed()
+
+
+def encode_offset_cursor(offset: int) -> str:
+    """Курсор для выдачи, отсортированной по релевантности: порядок зависит
+    от запроса, поэтому keyset невозможен и курсор хранит смещение"""
+    return base64.urlsafe_b64encode(offset.to_bytes(4, "big")).rstrip(b"=").decode("ascii")
+
+
+def decode_offset_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    except (binascii.Error, ValueError):
+        raise IncorrectCursorPassed()
+    if len(raw) != 4:
+        raise IncorrectCursorPassed()
+
+    return int.from_bytes(raw, "big")
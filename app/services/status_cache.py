@@ -0,0 +1,87 @@
+import threading
+import time
+from typing import Dict, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from core.config import settings
+from db.entities.models import Status
+
+
+class StatusCache:
+    """Справочник статусов (id -> name) в памяти процесса.
+
+    Справочник загружается целиком одним запросом и обновляется сервисами
+    статусов при записи. Если id не найден, справочник перечитывается: статус мог
+    создать другой воркер. Такое перечитывание бывает не чаще раза в
+    miss_reload_interval секунд, а в промежутке промах проверяется запросом
+    одной строки, поэтому запросы с несуществующими id не читают всю таблицу
+    статусов каждый раз. ttl (в секундах) ограничивает, как долго
+    воркер может не видеть переименований и удалений, сделанных другими воркерами
+    """
+
+    def __init__(self, ttl: Optional[float] = None, miss_reload_interval: float = 1.0):
+        self.ttl = ttl
+        self.miss_reload_interval = miss_reload_interval
+        self._statuses: Optional[Dict[int, str]] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def get_name(self, session: Session, status_id: int) -> Optional[str]:
+        statuses = self._statuses
+        if statuses is None or self._is_expired() or (status_id not in statuses and self._can_reload_on_miss()):
+            statuses = self._load(session)
+        elif status_id not in statuses:
+            # Перечитывать справочник еще рано: статус, созданный другим воркером, ищется одной строкой
+            name = session.scalar(select(Status.name).where(Status.id == status_id))
+            if name is not None:
+                self.set(status_id, name)
+            return name
+
+        return statuses.get(status_id)
+
+    def exists(self, session: Session, status_id: int) -> bool:
+        return self.get_name(session, status_id) is not None
+
+    def get_all(self, session: Session) -> Dict[int, str]:
+        statuses = self._statuses
+        if statuses is None or self._is_expired():
+            statuses = self._load(session)
+
+        return statuses
+
+    def set(self, status_id: int, name: str):
+        with self._lock:
+            # Пока справочник не загружен, его целиком прочитает первый запрос
+            if self._statuses is not None:
+                self._statuses = {**self._statuses, status_id: name}
+
+    def discard(self, status_id: int):
+        with self._lock:
+            if self._statuses is not None and status_id in self._statuses:
+                statuses = dict(self._statuses)
+                del statuses[status_id]
+                self._statuses = statuses
+
+    def invalidate(self):
+        with self._lock:
+            self._statuses = None
+
+    def _is_expired(self) -> bool:
+        return self.ttl is not None and time.monotonic() - self._loaded_at > self.ttl
+
+    def _can_reload_on_miss(self) -> bool:
+        return time.monotonic() - self._loaded_at >= self.miss_reload_interval
+
+    def _load(self, session: Session) -> Dict[int, str]:
+        rows = session.query(Status.id, Status.name).all()
+        statuses = {status_id: name for status_id, name in rows}
+        with self._lock:
+            self._statuses = statuses
+            self._loaded_at = time.monotonic()
+
+        return statuses
+
+
+status_cache = StatusCache(
+    ttl=settings.STATUS_CACHE_TTL, miss_reload_interval=settings.STATUS_CACHE_MISS_RELOAD_INTERVAL
+)
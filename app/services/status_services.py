@@ -1,8 +1,9 @@
 from typing import List
+from sqlalchemy import update
 from sqlalchemy.exc import NoResultFound
 from db.entities.models import Status
 from exceptions.status_exceptions import StatusNotFoundException
-from services.base_service import Service
+from services.base_service import Service, AsyncService
 from schemas.models import StatusModel, StatusModification
 
 
@@ -13,44 +14,60 @@ class CreateStatusService(Service):
     def __create_status(self, status_name: str):
         status = Status(name=status_name)
         self.session.add(status)
+        self.session.flush()
+        status_id = status.id
         self.session.commit()
+        self.status_cache.set(status_id, status_name)
+        self.versions.bump_statuses()
 
 
 class SearchStatusService(Service):
     def find_status_by_id(self, status_id: int) -> StatusModel:
-        try:
-            status = self.session.get_one(Status, status_id)
-            return StatusModel(id=status.id, name=status.name)
-        except NoResultFound:
+        name = self.status_cache.get_name(self.session, status_id)
+        if name is None:
             raise StatusNotFoundException()
 
+        return StatusModel(id=status_id, name=name)
+
     def get_all_statuses(self) -> List[StatusModel]:
-        statuses = self.session.query(Status).all()
+        statuses = self.status_cache.get_all(self.session)
         result = []
-        for status in statuses:
-            result.append(StatusModel(id=status.id, name=status.name))
+        for status_id in sorted(statuses):
+            result.append(StatusModel(id=status_id, name=statuses[status_id]))
 
         return result
 
+    def get_all_status_rows(self) -> List[dict]:
+        """Список статусов без pydantic-моделей, для быстрой сериализации"""
+        statuses = self.status_cache.get_all(self.session)
+        return [{"id": status_id, "name": statuses[status_id]} for status_id in sorted(statuses)]
+
 
 class UpdateStatusService(Service):
     def __call__(self, status_modification_model: StatusModification):
         self.__update_status(status_modification_model)
 
     def __update_status(self, status_modification_model: StatusModification):
-        status = None
-        try:
-            status = self.session.get_one(Status, status_modification_model.id)
-        except NoResultFound:
-            raise StatusNotFoundException()
+        status_id = status_modification_model.id
+        name = status_modification_model.name
+        if not name:
+            if not self.status_cache.exists(self.session, status_id):
+                raise StatusNotFoundException()
+            return
 
-        status.name = (
-            status_modification_model.name
-            if status_modification_model.name
-            else status.name
+        result = self.session.execute(
+            update(Status)
+            .where(Status.id == status_id)
+            .values(name=name)
+            .execution_options(synchronize_session=False)
         )
-        self.session.add(status)
+        if result.rowcount == 0:
+            self.session.rollback()
+            raise StatusNotFoundException()
+
         self.session.commit()
+        self.status_cache.set(status_id, name)
+        self.versions.bump_statuses()
 
 
 class DeleteStatusService(Service):
@@ -63,4 +80,32 @@ class DeleteStatusService(Service):
             self.session.delete(status)
             self.session.commit()
         except NoResultFound:
-            raise StatusNotFoundException()
\ No newline at end of file
+            raise StatusNotFoundException()
+
+        self.status_cache.discard(status_id)
+        self.versions.bump_statuses()
+
+
+class AsyncCreateStatusService(AsyncService):
+    service_class = CreateStatusService
+
+
+class AsyncSearchStatusService(AsyncService):
+    service_class = SearchStatusService
+
+    async def find_status_by_id(self, status_id: int) -> StatusModel:
+        return await self._run("find_status_by_id", status_id)
+
+    async def get_all_statuses(self) -> List[StatusModel]:
+        return await self._run("get_all_statuses")
+
+    async def get_all_status_rows(self) -> List[dict]:
+        return await self._run("get_all_status_rows")
+
+
+class AsyncUpdateStatusService(AsyncService):
+    service_class = UpdateStatusService
+
+
+class AsyncDeleteStatusService(AsyncService):
+    service_class = DeleteStatusService
@@ -0,0 +1,364 @@
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+from uuid import UUID
+import orjson
+from core.config import settings
+from services.versions import ResourceVersions
+
+
+class CacheBackend(ABC):
+    """Хранилище байтовых значений с TTL. Ошибки хранилища не должны ломать
+    запрос: backend считает их и ведет себя как при промахе"""
+
+    # Вызовы ходят по сети: асинхронные сервисы выполняют их в пуле потоков, а не на event loop
+    blocking = False
+
+    def __init__(self, ttl: Optional[float]):
+        self.ttl = ttl
+        self.evictions = 0
+        self.errors = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]: ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes): ...
+
+    @abstractmethod
+    def delete(self, keys: List[str]): ...
+
+    @abstractmethod
+    def clear(self): ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """LRU в памяти процесса. Записи других воркеров он не видит,
+    поэтому ttl ограничивает, как долго запись может быть устаревшей"""
+
+    def __init__(self, max_size: int, ttl: Optional[float]):
+        super().__init__(ttl)
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes):
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, keys: List[str]):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RespError(Exception): ...
+
+
+FAILED = object()  # Команда не дошла до сервера кэша
+MAX_PENDING_DELETES = 10000  # Сколько несостоявшихся сбросов запоминается поштучно
+
+
+class RespConnection:
+    """Одно соединение с Redis-совместимым сервером по протоколу RESP2"""
+
+    def __init__(self, host: str, port: int, timeout: float):
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile("rb")
+
+    def command(self, *args):
+        parts = [b"*%d\r\n" % len(args)]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        self.sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _read_reply(self):
+        line = self.reader.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Соединение с сервером кэша закрыто")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b"+":
+            return payload
+        if kind == b"-":
+            raise RespError(payload.decode())
+        if kind == b":":
+            return int(payload)
+        if kind == b"$":
+            length = int(payload)
+            if length == -1:
+                return None
+            data = self.reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            length = int(payload)
+            return None if length == -1 else [self._read_reply() for _ in range(length)]
+        raise RespError(f"Неизвестный ответ сервера кэша: {line!r}")
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Общий для всех воркеров кэш в Redis-совместимом сервере.
+
+    Вызовы блокирующие, поэтому асинхронные сервисы выполняют их в пуле потоков.
+    После сетевой ошибки чтение и запись не обращаются к серверу retry_after секунд:
+    пока он недоступен, запросы сразу идут в БД, не дожидаясь таймаута соединения.
+    Сбросы при этом не пропускаются (см. delete)
+    """
+
+    blocking = True
+
+    def __init__(
+        self, url: str, ttl: Optional[float], timeout: float, retry_after: float = 1.0, prefix: str = "testtask:"
+    ):
+        super().__init__(ttl)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self.retry_after = retry_after
+        self.prefix = prefix
+        self._down_until = 0.0
+        self._pending_deletes: Set[str] = set()
+        self._clear_pending = False
+        self._idle: List[RespConnection] = []
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        # Пока сброс не дошел до сервера, там может лежать устаревшая запись
+        if self._clear_pending or key in self._pending_deletes:
+            return None
+        return self._execute("GET", self.prefix + key)
+
+    def set(self, key: str, value: bytes):
+        if self.ttl is None:
+            self._execute("SET", self.prefix + key, value)
+        else:
+            self._execute("SET", self.prefix + key, value, "PX", int(self.ttl * 1000))
+
+    def delete(self, keys: List[str]):
+        # Сброс отправляется и во время паузы после ошибки: устаревшую запись из общего
+        # кэша читали бы все воркеры до конца ttl. Несостоявшийся сброс запоминается
+        # и повторяется перед следующими командами
+        if keys:
+            with self._lock:
+                self._pending_deletes.update(keys)
+                if len(self._pending_deletes) > MAX_PENDING_DELETES:
+                    # Слишком много ключей: после восстановления удаляются все свои ключи
+                    self._pending_deletes.clear()
+                    self._clear_pending = True
+            self._flush_deletes()
+
+    def clear(self):
+        if time.monotonic() >= self._down_until:
+            self._clear_keys()
+
+    def _clear_keys(self) -> bool:
+        # Удаляются только свои ключи, а не вся база сервера
+        cursor = b"0"
+        while True:
+            reply = self._call("SCAN", cursor, "MATCH", self.prefix + "*", "COUNT", 1000)
+            if reply is FAILED or reply is None:
+                return False
+            cursor, keys = reply
+            if keys and self._call("DEL", *keys) is FAILED:
+                return False
+            if cursor == b"0":
+                return True
+
+    def _flush_deletes(self) -> bool:
+        """Отправляет отложенные сбросы; False, если сервер все еще недоступен"""
+        if self._clear_pending:
+            if not self._clear_keys():
+                return False
+            self._clear_pending = False
+
+        with self._lock:
+            keys = list(self._pending_deletes)
+        if keys:
+            if self._call("DEL", *(self.prefix + key for key in keys)) is FAILED:
+                return False
+            with self._lock:
+                self._pending_deletes.difference_update(keys)
+        return True
+
+    def _execute(self, *args):
+        if time.monotonic() < self._down_until:
+            return None
+        if (self._pending_deletes or self._clear_pending) and not self._flush_deletes():
+            return None
+
+        reply = self._call(*args)
+        return None if reply is FAILED else reply
+
+    def _call(self, *args):
+        """Одна команда; FAILED, если сервер недоступен"""
+        connection = None
+        try:
+            connection = self._acquire()
+            reply = connection.command(*args)
+        except RespError:
+            self.errors += 1
+            if connection is None:
+                # Сервер отклонил AUTH или SELECT: _acquire уже закрыл соединение
+                return FAILED
+            # Ответ с ошибкой прочитан целиком, соединение можно использовать дальше
+            reply = None
+        except OSError:
+            # После таймаута в сокете может остаться чужой ответ: соединение закрывается
+            self.errors += 1
+            self._down_until = time.monotonic() + self.retry_after
+            if connection is not None:
+                connection.close()
+            return FAILED
+
+        with self._lock:
+            self._idle.append(connection)
+        return reply
+
+    def _acquire(self) -> RespConnection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+
+        connection = RespConnection(self.host, self.port, self.timeout)
+        try:
+            if self.password:
+                connection.command("AUTH", self.password)
+            if self.db:
+                connection.command("SELECT", self.db)
+        except (OSError, RespError):
+            connection.close()
+            raise
+        return connection
+
+
+class TaskCache:
+    """Read-through кэш задач по UUID.
+
+    Хранится строка задачи со status_id, а не название статуса: название
+    берется из кэша статусов, поэтому переименование статуса не требует
+    сбрасывать задачи. Сервисы изменения и удаления после коммита увеличивают
+    версию задачи и затем сбрасывают запись. Версии общие для воркеров
+    одного запуска (VERSIONS_FILE); запись, которую другой экземпляр приложения
+    сбросил между чтением строки и ее записью в общий кэш, может остаться
+    устаревшей не дольше ttl
+    """
+
+    def __init__(self, backend: Optional[CacheBackend]):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    @property
+    def blocking(self) -> bool:
+        return self.backend is not None and self.backend.blocking
+
+    def get(self, task_id: UUID) -> Optional[dict]:
+        value = self.backend.get(task_id.hex)
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return orjson.loads(value)
+
+    def set(self, task_id: UUID, row: dict):
+        self.backend.set(task_id.hex, orjson.dumps(row))
+
+    def set_if_unchanged(self, task_id: UUID, row: dict, version: int, versions: ResourceVersions):
+        """Записывает строку, прочитанную из БД при версии задачи version.
+
+        Изменение, закоммиченное после чтения, могло сбросить запись еще до set:
+        тогда версия уже другая, и запись удаляется. Сброс после этой проверки
+        удалит ее сам, так как версия увеличивается до сброса"""
+        self.set(task_id, row)
+        if versions.task_version(task_id) != version:
+            self.invalidate([task_id])
+
+    def invalidate(self, task_ids: Iterable[UUID]):
+        if self.backend is not None:
+            self.backend.delete([task_id.hex for task_id in task_ids])
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.backend.evictions if self.backend else 0,
+            "errors": self.backend.errors if self.backend else 0,
+        }
+
+
+class DeferredInvalidations:
+    """Заменяет TaskCache в синхронном сервисе, который выполняется на event loop
+    (AsyncSession.run_sync): сбросы не идут в сетевой backend сразу, а копятся,
+    и асинхронный сервис выполняет их в пуле потоков после run_sync"""
+
+    enabled = True
+    blocking = False
+
+    def __init__(self):
+        self.task_ids: List[UUID] = []
+
+    def invalidate(self, task_ids: Iterable[UUID]):
+        self.task_ids.extend(task_ids)
+
+
+def create_task_cache_backend(backend: str) -> Optional[CacheBackend]:
+    if backend == "memory":
+        return MemoryCacheBackend(max_size=settings.TASK_CACHE_SIZE, ttl=settings.TASK_CACHE_TTL)
+    if backend == "redis":
+        return RedisCacheBackend(
+            settings.TASK_CACHE_REDIS_URL,
+            ttl=settings.TASK_CACHE_TTL,
+            timeout=settings.TASK_CACHE_REDIS_TIMEOUT,
+            retry_after=settings.TASK_CACHE_REDIS_RETRY_AFTER,
+        )
+
+    return None
+
+
+task_cache = TaskCache(create_task_cache_backend(settings.TASK_CACHE_BACKEND))
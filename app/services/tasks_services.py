@@ -1,62 +1,218 @@
+import asyncio
+import re
 from uuid import UUID
-from typing import List
-from sqlalchemy.exc import OperationalError, NoResultFound
-from services.base_service import Service
-from schemas.models import TaskCreationModel, TaskModel, TaskModificationModel
+from typing import AsyncIterator, Dict, List, Optional, Set, Tuple
+from sqlalchemy import insert, update, delete, select, and_, or_, case, column, literal_column, table, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.exc import IntegrityError, OperationalError, NoResultFound
+from sqlalchemy.orm import joinedload
+from services.base_service import Service, AsyncService
+from services.versions import resource_versions
+from db.entities.types import new_task_id
+from services.pagination import encode_cursor, decode_cursor, encode_offset_cursor, decode_offset_cursor
+from core.config import settings
+from schemas.models import (
+    TaskCreationModel,
+    TaskModel,
+    TaskModificationModel,
+    TaskPage,
+    BulkTaskCreationResult,
+    BulkTaskModificationResult,
+    BulkTaskDeletionResult,
+)
 from db.entities.models import Task, Status
-from exceptions.task_exceptions import TaskCreationException, TaskNotFoundException, IncorrectUUIDPassed
+from exceptions.task_exceptions import (
+    TaskCreationException,
+    TaskNotFoundException,
+    IncorrectUUIDPassed,
+    IncorrectSearchQueryPassed,
+)
 from exceptions.status_exceptions import StatusNotFoundException
 
 
 class TaskCreationService(Service):
-    def __call__(self, task_model: TaskCreationModel):
-        self.__create_task(task_model)
+    def __call__(self, task_model: TaskCreationModel) -> TaskModel:
+        return self.__create_task(task_model)
 
-    def __create_task(self, task_model: TaskCreationModel):
+    def __create_task(self, task_model: TaskCreationModel) -> TaskModel:
+        # Существование статуса проверяет внешний ключ task.status_id, без отдельного
+        # запроса. id генерируется здесь, поэтому RETURNING не нужен ни на одной БД.
+        # Название статуса обычно берется из кэша статусов; при холодном или
+        # устаревшем кэше это еще один SELECT справочника
+        task_id = new_task_id()
         try:
-            self.session.get_one(Status, task_model.status)
-        except NoResultFound:
-            raise StatusNotFoundException()
-
-        try:
-            self.session.add(
-                Task(
+            self.session.execute(
+                insert(Task).values(
+                    id=task_id,
                     name=task_model.name,
                     text=task_model.text,
                     status_id=task_model.status,
                 )
             )
-            self.session.flush()
+            # Название читается до коммита: статус уже проверен внешним ключом,
+            # и до конца транзакции другой воркер не может его удалить
+            status_name = self.status_cache.get_name(self.session, task_model.status)
+            if status_name is None:
+                # Возможно только без проверки внешних ключей (SQLite без PRAGMA foreign_keys)
+                self.session.rollback()
+                raise StatusNotFoundException()
             self.session.commit()
+        except IntegrityError:
+            self.session.rollback()
+            self.status_cache.discard(task_model.status)
+            self.versions.bump_statuses()
+            raise StatusNotFoundException()
+        except OperationalError:
+            self.session.rollback()
+            raise TaskCreationException()
+
+        self.versions.bump_tasks([task_id])
+        return TaskModel(id=task_id.hex, name=task_model.name, text=task_model.text, status=status_name)
+
+
+class BulkTaskService(Service):
+    """Общие части массовых операций: разбор id и проверка наличия одним запросом IN на пачку"""
+
+    chunk_size: int = settings.BULK_CHUNK_SIZE
+
+    def _chunks(self, items: list) -> List[list]:
+        return [items[start:start + self.chunk_size] for start in range(0, len(items), self.chunk_size)]
+
+    def _parse_ids(self, task_ids: List[str]) -> Tuple[Dict[UUID, str], List[str]]:
+        parsed = {}
+        invalid = []
+        for task_id in task_ids:
+            try:
+                parsed[UUID(task_id)] = task_id
+            except ValueError:
+                invalid.append(task_id)
+
+        return parsed, invalid
+
+    def _existing_ids(self, task_ids: List[UUID]) -> Set[UUID]:
+        existing = set()
+        for chunk in self._chunks(task_ids):
+            existing.update(task_id for (task_id,) in self.session.query(Task.id).filter(Task.id.in_(chunk)))
+
+        return existing
+
+    def _existing_status_ids(self, status_ids: Set[int]) -> Set[int]:
+        return {
+            status_id
+            for (status_id,) in self.session.query(Status.id).filter(Status.id.in_(status_ids))
+        }
+
+
+class BulkTaskCreationService(BulkTaskService):
+    def __call__(self, task_models: List[TaskCreationModel]) -> List[BulkTaskCreationResult]:
+        return self.__create_tasks(task_models)
+
+    def __create_tasks(self, task_models: List[TaskCreationModel]) -> List[BulkTaskCreationResult]:
+        # Все статусы проверяются одним запросом с IN
+        status_ids = {task_model.status for task_model in task_models}
+
+        rows, results = self.__plan_rows(task_models, self._existing_status_ids(status_ids))
+        try:
+            try:
+                self.__insert_rows(rows)
+            except IntegrityError:
+                # Статус удалили между проверкой и INSERT: статусы проверяются заново,
+                # и задачи с удаленным статусом не создаются
+                self.session.rollback()
+                self.status_cache.invalidate()
+                self.versions.bump_statuses()
+                rows, results = self.__plan_rows(task_models, self._existing_status_ids(status_ids))
+                try:
+                    self.__insert_rows(rows)
+                except IntegrityError:
+                    self.session.rollback()
+                    raise StatusNotFoundException()
         except OperationalError:
+            self.session.rollback()
             raise TaskCreationException()
 
+        self.versions.bump_tasks(row["id"] for row in rows)
+        return results
+
+    def __plan_rows(
+        self, task_models: List[TaskCreationModel], existing_status_ids: Set[int]
+    ) -> Tuple[List[dict], List[BulkTaskCreationResult]]:
+        results = []
+        rows = []
+        for index, task_model in enumerate(task_models):
+            if task_model.status not in existing_status_ids:
+                results.append(
+                    BulkTaskCreationResult(index=index, created=False, detail="Не найдено статуса с таким id")
+                )
+                continue
+
+            task_id = new_task_id()
+            rows.append(
+                {
+                    "id": task_id,
+                    "name": task_model.name,
+                    "text": task_model.text,
+                    "status_id": task_model.status,
+                }
+            )
+            results.append(BulkTaskCreationResult(index=index, created=True, id=task_id.hex))
+
+        return rows, results
+
+    def __insert_rows(self, rows: List[dict]):
+        # Один executemany на пачку, вся загрузка - одна транзакция
+        for chunk in self._chunks(rows):
+            self.session.execute(insert(Task), chunk)
+        self.session.commit()
+
+
+SEARCH_MAX_TERMS = 16
+
+# Внешнее содержимое FTS5 связано с task по rowid (см. db.entities.models)
+task_fts = table("task_fts", column("rowid"))
+
+
+def search_terms(q: str) -> List[str]:
+    """Слова запроса без операторов полнотекстового синтаксиса обеих БД"""
+    return re.findall(r"\w+", q)[:SEARCH_MAX_TERMS]
+
 
 class TaskSearchService(Service):
-    def find_task_by_id(self, task_id: str) -> TaskModel:
+    def find_task_by_id(self, task_id: UUID) -> TaskModel:
+        row = self.task_cache.get(task_id) if self.task_cache.enabled else None
+        if row is None:
+            version = self.versions.task_version(task_id)
+            row = self.read_task(task_id)
+            if self.task_cache.enabled:
+                self.task_cache.set_if_unchanged(task_id, row, version, self.versions)
+
+        return self.task_model(task_id, row)
+
+    def read_task(self, task_id: UUID) -> dict:
         try:
             task = self.session.get_one(Task, ident=task_id)
-            status = (
-                self.session.query(Status).filter_by(id=task.status_id).one_or_none()
-            )
-            if status is None:
-                raise StatusNotFoundException()
-            else:
-                model = TaskModel(
-                    id=task.id.hex, name=task.name, text=task.text, status=status.name
-                )
-                return model
         except NoResultFound:
             raise TaskNotFoundException()
 
+        return {"name": task.name, "text": task.text, "status_id": task.status_id}
+
+    def task_model(self, task_id: UUID, row: dict) -> TaskModel:
+        status_name = self.status_cache.get_name(self.session, row["status_id"])
+        if status_name is None:
+            raise StatusNotFoundException()
+
+        return TaskModel(id=task_id.hex, name=row["name"], text=row["text"], status=status_name)
+
     def get_all_tasks(self) -> List[TaskModel]:
         result = []
-        tasks: List[Task] = self.session.query(Task).all()
+        # Статусы подгружаются тем же запросом через LEFT OUTER JOIN,
+        # чтобы не делать отдельный запрос на каждую задачу
+        tasks: List[Task] = (
+            self.session.query(Task).options(joinedload(Task.status)).all()
+        )
         for task in tasks:
-            status: Status = (
-                self.session.query(Status).filter_by(id=task.status_id).one_or_none()
-            )
-            if status is None:
+            if task.status is None:
                 raise StatusNotFoundException()
             else:
                 result.append(
@@ -64,57 +220,207 @@ class TaskSearchService(Service):
                         id=task.id.hex,
                         name=task.name,
                         text=task.text,
-                        status=status.name,
+                        status=task.status.name,
                     )
                 )
 
         return result
 
+    def get_tasks_page(
+        self, limit: int, after: Optional[str] = None, status_id: Optional[int] = None
+    ) -> TaskPage:
+        rows, next_cursor = self._select_tasks_page(limit, after, status_id)
+        items = [
+            TaskModel(id=task_id.hex, name=name, text=text, status=status_name)
+            for task_id, name, text, status_name in rows
+        ]
+
+        return TaskPage(items=items, next_cursor=next_cursor)
+
+    def get_tasks_page_rows(
+        self, limit: int, after: Optional[str] = None, status_id: Optional[int] = None
+    ) -> dict:
+        """То же, что get_tasks_page, но без pydantic-моделей: словарь
+        для быстрой сериализации, совпадающий по схеме с TaskPage"""
+        rows, next_cursor = self._select_tasks_page(limit, after, status_id)
+        items = [
+            {"id": task_id.hex, "name": name, "text": text, "status": status_name}
+            for task_id, name, text, status_name in rows
+        ]
+
+        return {"items": items, "next_cursor": next_cursor}
+
+    def _select_tasks_page(
+        self, limit: int, after: Optional[str], status_id: Optional[int]
+    ) -> Tuple[List[tuple], Optional[str]]:
+        """Keyset-пагинация по Task.id: вместо OFFSET используется условие id > курсора,
+        поэтому любая страница стоит столько же, сколько первая. С фильтром по статусу
+        запрос идет по индексу (status_id, id). Выбираются только нужные колонки
+        кортежами, без загрузки ORM-объектов"""
+        query = self.session.query(
+            Task.id, Task.name, Task.text, Status.id, Status.name
+        ).outerjoin(Task.status)
+        if status_id is not None:
+            query = query.filter(Task.status_id == status_id)
+        if after is not None:
+            query = query.filter(Task.id > decode_cursor(after))
+
+        # Берем на одну запись больше, чтобы понять, есть ли следующая страница
+        rows = query.order_by(Task.id).limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1][0])
+
+        return self._with_status_names(rows), next_cursor
+
+    def search_tasks(
+        self, q: str, limit: int, after: Optional[str] = None, status_id: Optional[int] = None
+    ) -> TaskPage:
+        rows, next_cursor = self._select_search_page(q, limit, after, status_id)
+        items = [
+            TaskModel(id=task_id.hex, name=name, text=text, status=status_name)
+            for task_id, name, text, status_name in rows
+        ]
+
+        return TaskPage(items=items, next_cursor=next_cursor)
+
+    def search_tasks_rows(
+        self, q: str, limit: int, after: Optional[str] = None, status_id: Optional[int] = None
+    ) -> dict:
+        """То же, что search_tasks, но словарем для быстрой сериализации"""
+        rows, next_cursor = self._select_search_page(q, limit, after, status_id)
+        items = [
+            {"id": task_id.hex, "name": name, "text": text, "status": status_name}
+            for task_id, name, text, status_name in rows
+        ]
+
+        return {"items": items, "next_cursor": next_cursor}
+
+    def _select_search_page(
+        self, q: str, limit: int, after: Optional[str], status_id: Optional[int]
+    ) -> Tuple[List[tuple], Optional[str]]:
+        """Поиск по словам запроса в name и text, все слова обязательны, последнее
+        слово ищется и как префикс. Результаты отсортированы по релевантности,
+        при равной релевантности - по id, чтобы страницы не пересекались"""
+        terms = search_terms(q)
+        if not terms:
+            raise IncorrectSearchQueryPassed()
+        offset = decode_offset_cursor(after) if after is not None else 0
+
+        query = self.session.query(
+            Task.id, Task.name, Task.text, Status.id, Status.name
+        ).outerjoin(Task.status)
+        if status_id is not None:
+            query = query.filter(Task.status_id == status_id)
+
+        dialect = self.session.get_bind().dialect.name
+        if dialect == "sqlite":
+            # Слова в кавычках: AND, OR, NOT и NEAR - операторы FTS5
+            expression = " ".join(f'"{term}"' for term in terms) + "*"
+            query = (
+                query.join(task_fts, task_fts.c.rowid == literal_column("task.rowid"))
+                .filter(text("task_fts MATCH :expression").bindparams(expression=expression))
+                .order_by(text("bm25(task_fts)"), Task.id)
+            )
+        elif dialect == "mysql":
+            expression = " ".join(f"+{term}" for term in terms) + "*"
+            relevance = match(Task.name, Task.text, against=expression).in_boolean_mode()
+            query = query.filter(relevance).order_by(relevance.desc(), Task.id)
+        else:
+            # Без полнотекстового индекса: полный просмотр таблицы и без ранжирования
+            query = query.filter(
+                and_(*(or_(Task.name.ilike(f"%{term}%"), Task.text.ilike(f"%{term}%")) for term in terms))
+            ).order_by(Task.id)
+
+        rows = query.offset(offset).limit(limit + 1).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_offset_cursor(offset + limit)
+
+        return self._with_status_names(rows), next_cursor
+
+    def _with_status_names(self, rows: List[tuple]) -> List[tuple]:
+        result = []
+        for task_id, name, text, found_status_id, status_name in rows:
+            if found_status_id is None:
+                raise StatusNotFoundException()
+            result.append((task_id, name, text, status_name))
+
+        return result
+
+
+class TaskExportService:
+    """Выгрузка всей таблицы задач через серверный курсор.
+
+    Строки читаются пачками по batch_size, поэтому память не зависит от размера
+    таблицы. Сессию сервис открывает сам: выгрузка продолжается после выхода из эндпоинта
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, batch_size: int = settings.EXPORT_BATCH_SIZE):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+
+    async def stream_rows(self) -> AsyncIterator[List[tuple]]:
+        query = (
+            select(Task.id, Task.name, Task.text, Status.name)
+            .outerjoin(Task.status)
+            .order_by(Task.id)
+            .execution_options(yield_per=self.batch_size)
+        )
+        async with self.session_factory() as session:
+            result = await session.stream(query)
+            async for partition in result.partitions():
+                yield partition
+
 
 class TaskModificationService(Service):
     def __call__(self, task_modification_model: TaskModificationModel):
         self.__update_task(task_modification_model)
 
     def __update_task(self, task_modification_model: TaskModificationModel):
-        task = None
-        task_id = None
-
         try:
             task_id = UUID(task_modification_model.id)
         except ValueError:
             raise IncorrectUUIDPassed()
 
+        # Как и при массовом обновлении, пустые поля не меняются
+        values = {
+            "name": task_modification_model.name,
+            "text": task_modification_model.text,
+            "status_id": task_modification_model.status,
+        }
+        values = {key: value for key, value in values.items() if value}
+        if not values:
+            if self.session.scalar(select(Task.id).where(Task.id == task_id)) is None:
+                raise TaskNotFoundException()
+            return
 
+        # Один UPDATE без загрузки задачи: отсутствие задачи видно по rowcount
+        # (MySQL-диалект считает найденные, а не измененные строки), неверный статус -
+        # по ошибке внешнего ключа
         try:
-            task = self.session.get_one(Task, task_id)
-        except NoResultFound:
-            raise TaskNotFoundException()
-
-        if task_modification_model.status:
-            try:
-                self.session.get_one(Status, task_modification_model.status)
-            except NoResultFound:
-                raise StatusNotFoundException()
-
-        if task:
-            task.name = (
-                task_modification_model.name
-                if task_modification_model.name
-                else task.name
-            )
-            task.text = (
-                task_modification_model.text
-                if task_modification_model.text
-                else task.text
-            )
-            task.status_id = (
-                task_modification_model.status
-                if task_modification_model.status
-                else task.status
+            result = self.session.execute(
+                update(Task)
+                .where(Task.id == task_id)
+                .values(**values)
+                .execution_options(synchronize_session=False)
             )
+        except IntegrityError:
+            self.session.rollback()
+            self.status_cache.discard(task_modification_model.status)
+            self.versions.bump_statuses()
+            raise StatusNotFoundException()
 
-            self.session.add(task)
-            self.session.commit()
+        if result.rowcount == 0:
+            self.session.rollback()
+            raise TaskNotFoundException()
+
+        self.session.commit()
+        # Версия увеличивается до сброса кэша (см. TaskCache.set_if_unchanged)
+        self.versions.bump_tasks([task_id])
+        self.task_cache.invalidate([task_id])
 
 
 class TaskDeleteService(Service):
@@ -124,7 +430,192 @@ class TaskDeleteService(Service):
     def __delete_task(self, task_id: str):
         try:
             task = self.session.get_one(Task, task_id)
+            deleted_id = task.id
             self.session.delete(task)
             self.session.commit()
         except NoResultFound:
             raise TaskNotFoundException()
+
+        self.versions.bump_tasks([deleted_id])
+        self.task_cache.invalidate([deleted_id])
+
+
+class BulkTaskModificationService(BulkTaskService):
+    def __call__(self, task_modification_models: List[TaskModificationModel]) -> BulkTaskModificationResult:
+        return self.__update_tasks(task_modification_models)
+
+    def __update_tasks(self, task_modification_models: List[TaskModificationModel]) -> BulkTaskModificationResult:
+        parsed_ids, invalid = self._parse_ids([model.id for model in task_modification_models])
+        existing_ids = self._existing_ids(list(parsed_ids))
+        status_ids = {model.status for model in task_modification_models if model.status}
+
+        rows, result = self.__plan_updates(
+            task_modification_models, existing_ids, self._existing_status_ids(status_ids), invalid
+        )
+        try:
+            self.__execute_updates(rows)
+        except IntegrityError:
+            # Статус удалили между проверкой и UPDATE: статусы проверяются заново,
+            # и задачи с удаленным статусом попадают в status_not_found
+            self.session.rollback()
+            self.status_cache.invalidate()
+            self.versions.bump_statuses()
+            rows, result = self.__plan_updates(
+                task_modification_models, existing_ids, self._existing_status_ids(status_ids), invalid
+            )
+            try:
+                self.__execute_updates(rows)
+            except IntegrityError:
+                self.session.rollback()
+                raise StatusNotFoundException()
+
+        self.session.commit()
+        self.versions.bump_tasks(row["id"] for row in rows)
+        self.task_cache.invalidate(row["id"] for row in rows)
+
+        return result
+
+    def __plan_updates(
+        self,
+        task_modification_models: List[TaskModificationModel],
+        existing_ids: Set[UUID],
+        existing_status_ids: Set[int],
+        invalid: List[str],
+    ) -> Tuple[List[dict], BulkTaskModificationResult]:
+        rows = []
+        updated = []
+        missing = []
+        status_not_found = []
+        for model in task_modification_models:
+            try:
+                task_id = UUID(model.id)
+            except ValueError:
+                continue
+            if task_id not in existing_ids:
+                missing.append(model.id)
+                continue
+            if model.status and model.status not in existing_status_ids:
+                status_not_found.append(model.id)
+                continue
+
+            # Как и в TaskModificationService, пустые поля не меняются
+            values = {"name": model.name, "text": model.text, "status_id": model.status}
+            row = {key: value for key, value in values.items() if value}
+            if row:
+                rows.append({"id": task_id, **row})
+            updated.append(model.id)
+
+        return rows, BulkTaskModificationResult(
+            updated=updated, missing=missing, invalid=invalid, status_not_found=status_not_found
+        )
+
+    def __execute_updates(self, rows: List[dict]):
+        # Один UPDATE ... WHERE id IN на пачку: значение каждого поля выбирается
+        # через CASE по id, а задачи, в которых поле не меняется, сохраняют прежнее.
+        # executemany по первичному ключу драйверы MySQL отправляют построчно
+        for chunk in self._chunks(rows):
+            # Для повторяющегося id, как и при построчном обновлении, побеждает последнее значение
+            columns: Dict[str, Dict[UUID, object]] = {}
+            for row in chunk:
+                for key, value in row.items():
+                    if key != "id":
+                        columns.setdefault(key, {})[row["id"]] = value
+
+            values = {
+                # Task.id == id, а не CASE task.id WHEN: id передается в типе колонки (BINARY в MySQL)
+                key: case(*((Task.id == task_id, value) for task_id, value in by_id.items()), else_=getattr(Task, key))
+                for key, by_id in columns.items()
+            }
+            self.session.execute(
+                update(Task)
+                .where(Task.id.in_(list({row["id"] for row in chunk})))
+                .values(values)
+                .execution_options(synchronize_session=False)
+            )
+
+
+class BulkTaskDeleteService(BulkTaskService):
+    def __call__(self, task_ids: List[str]) -> BulkTaskDeletionResult:
+        return self.__delete_tasks(task_ids)
+
+    def __delete_tasks(self, task_ids: List[str]) -> BulkTaskDeletionResult:
+        parsed_ids, invalid = self._parse_ids(task_ids)
+        existing_ids = self._existing_ids(list(parsed_ids))
+
+        for chunk in self._chunks(list(existing_ids)):
+            self.session.execute(
+                delete(Task).where(Task.id.in_(chunk)).execution_options(synchronize_session=False)
+            )
+        self.session.commit()
+        self.versions.bump_tasks(existing_ids)
+        self.task_cache.invalidate(existing_ids)
+
+        return BulkTaskDeletionResult(
+            deleted=[task_id for parsed_id, task_id in parsed_ids.items() if parsed_id in existing_ids],
+            missing=[task_id for parsed_id, task_id in parsed_ids.items() if parsed_id not in existing_ids],
+            invalid=invalid,
+        )
+
+
+class AsyncTaskCreationService(AsyncService):
+    service_class = TaskCreationService
+
+
+class AsyncBulkTaskCreationService(AsyncService):
+    service_class = BulkTaskCreationService
+
+
+class AsyncTaskSearchService(AsyncService):
+    service_class = TaskSearchService
+
+    async def find_task_by_id(self, task_id: UUID) -> TaskModel:
+        if not self.blocking_cache_on_loop:
+            return await self._run("find_task_by_id", task_id)
+
+        # Сетевой кэш вызывается в отдельном потоке, а в run_sync идут только запросы к БД
+        row = await asyncio.to_thread(self.task_cache.get, task_id)
+        if row is None:
+            version = resource_versions.task_version(task_id)
+            row = await self._run("read_task", task_id)
+            await asyncio.to_thread(self.task_cache.set_if_unchanged, task_id, row, version, resource_versions)
+
+        return await self._run("task_model", task_id, row)
+
+    async def get_all_tasks(self) -> List[TaskModel]:
+        return await self._run("get_all_tasks")
+
+    async def get_tasks_page(
+        self, limit: int, after: Optional[str] = None, status_id: Optional[int] = None
+    ) -> TaskPage:
+        return await self._run("get_tasks_page", limit, after, status_id)
+
+    async def get_tasks_page_rows(
+        self, limit: int, after: Optional[str] = None, status_id: Optional[int] = None
+    ) -> dict:
+        return await self._run("get_tasks_page_rows", limit, after, status_id)
+
+    async def search_tasks(
+        self, q: str, limit: int, after: Optional[str] = None, status_id: Optional[int] = None
+    ) -> TaskPage:
+        return await self._run("search_tasks", q, limit, after, status_id)
+
+    async def search_tasks_rows(
+        self, q: str, limit: int, after: Optional[str] = None, status_id: Optional[int] = None
+    ) -> dict:
+        return await self._run("search_tasks_rows", q, limit, after, status_id)
+
+
+class AsyncTaskModificationService(AsyncService):
+    service_class = TaskModificationService
+
+
+class AsyncTaskDeleteService(AsyncService):
+    service_class = TaskDeleteService
+
+
+class AsyncBulkTaskModificationService(AsyncService):
+    service_class = BulkTaskModificationService
+
+
+class AsyncBulkTaskDeleteService(AsyncService):
+    service_class = BulkTaskDeleteService
@@ -0,0 +1,103 @@
+import mmap
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Optional
+from uuid import UUID, uuid4
+from core.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: без блокировки файла одновременные записи могут потерять увеличение
+    fcntl = None
+
+BUCKETS = 4096
+EPOCH_SIZE = 8  # Байт под epoch в начале общего файла
+COUNTER_SIZE = 8  # int64
+
+
+def create_versions_file(path: str, buckets: int = BUCKETS):
+    """Перед запуском воркеров: файл общих счетчиков с новым epoch и нулевыми счетчиками"""
+    with open(path, "wb") as file:
+        file.write(uuid4().hex[:EPOCH_SIZE].encode())
+        file.write(bytes(COUNTER_SIZE * (buckets + 1)))
+
+
+class ResourceVersions:
+    """Счетчики версий задач и статусов для ETag.
+
+    Сервисы увеличивают счетчик после коммита, а эндпоинты сравнивают ETag
+    с If-None-Match до обращения к БД. Задачи раскладываются по фиксированному
+    числу корзин: память не растет, а совпадение корзин дает лишь лишний 200
+    вместо 304. Название статуса входит в ответ задачи, поэтому ETag задачи
+    включает и версию статусов.
+
+    Без path счетчики и epoch живут в памяти процесса. При нескольких воркерах
+    main.py создает файл (VERSIONS_FILE), и воркеры отображают его в память:
+    epoch и счетчики общие, поэтому ETag одного воркера совпадает у другого,
+    а запись в любом воркере сразу меняет ETag во всех. Запись в других экземплярах
+    приложения (на других машинах) процесс не видит, поэтому при ttl ETag
+    дополнительно меняется каждые ttl секунд: устаревший 304 возможен не дольше этого окна
+    """
+
+    def __init__(self, ttl: Optional[float] = None, buckets: int = BUCKETS, path: Optional[str] = None):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._file = None
+        if path is None:
+            self.epoch = uuid4().hex[:EPOCH_SIZE]
+            self._counters = memoryview(bytearray(COUNTER_SIZE * (buckets + 1))).cast("q")
+        else:
+            self._file = open(path, "r+b")
+            data = mmap.mmap(self._file.fileno(), 0)
+            self.epoch = data[:EPOCH_SIZE].decode()
+            self._counters = memoryview(data)[EPOCH_SIZE:].cast("q")
+        # Нулевой счетчик - статусы, остальные - корзины задач
+        self._buckets = len(self._counters) - 1
+
+    @property
+    def statuses(self) -> int:
+        return self._counters[0]
+
+    def bump_statuses(self):
+        with self._locked():
+            self._counters[0] += 1
+
+    def bump_tasks(self, task_ids: Iterable[UUID]):
+        with self._locked():
+            for task_id in task_ids:
+                self._counters[self._bucket(task_id)] += 1
+
+    def task_version(self, task_id: UUID) -> int:
+        return self._counters[self._bucket(task_id)]
+
+    def statuses_etag(self) -> str:
+        return f'W/"{self._prefix()}-{self.statuses}"'
+
+    def task_etag(self, task_id: UUID) -> str:
+        return f'W/"{self._prefix()}-{self.statuses}-{self.task_version(task_id)}"'
+
+    def _bucket(self, task_id: UUID) -> int:
+        return 1 + task_id.int % self._buckets
+
+    @contextmanager
+    def _locked(self):
+        # Чтение обходится без блокировок, запись в общий файл блокирует его для других воркеров
+        with self._lock:
+            if self._file is None or fcntl is None:
+                yield
+                return
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._file, fcntl.LOCK_UN)
+
+    def _prefix(self) -> str:
+        if self.ttl is None:
+            return self.epoch
+
+        return f"{self.epoch}-{int(time.time() // self.ttl)}"
+
+
+resource_versions = ResourceVersions(ttl=settings.ETAG_TTL, path=settings.VERSIONS_FILE)
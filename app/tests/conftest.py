@@ -1,16 +1,47 @@
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from fastapi.testclient import TestClient
 from main import app
-from services.tasks_services import TaskCreationService, TaskSearchService, TaskModificationService, TaskDeleteService
+from services.tasks_services import (
+    TaskCreationService,
+    BulkTaskCreationService,
+    TaskSearchService,
+    TaskModificationService,
+    BulkTaskModificationService,
+    TaskDeleteService,
+    BulkTaskDeleteService,
+)
 from services.status_services import CreateStatusService, SearchStatusService, UpdateStatusService, DeleteStatusService
-from api.deps.db_dependency import get_db
+from services.status_cache import status_cache
+from services.task_cache import task_cache
+from api.deps.db_dependency import get_db, get_async_db, get_async_sessionmaker
 from db.entities.models import Base
+from db.session.query_metrics import instrument_engine
+from db.session.db_session import enable_sqlite_foreign_keys
+from db.session.lazy_session import LazyAsyncSession
 
 @pytest.fixture(scope="session")
-def engine():
-    return create_engine("sqlite:///:memory:?check_same_thread=False", echo=False)
+def database_path(tmp_path_factory):
+    # Файловая база, чтобы синхронный и асинхронный (aiosqlite) движки видели одни данные
+    return tmp_path_factory.mktemp("db") / "test.sqlite3"
+
+@pytest.fixture(scope="session")
+def engine(database_path):
+    engine = create_engine(f"sqlite:///{database_path}?check_same_thread=False", echo=False)
+    instrument_engine(engine)
+    enable_sqlite_foreign_keys(engine)
+    return engine
+
+@pytest.fixture(scope="session")
+def async_engine(database_path):
+    # NullPool: каждый TestClient работает в своем event loop
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{database_path}", poolclass=NullPool)
+    instrument_engine(async_engine.sync_engine)
+    enable_sqlite_foreign_keys(async_engine.sync_engine)
+    return async_engine
 
 @pytest.fixture(scope="session")
 def create_tables(engine):
@@ -20,19 +51,57 @@ def create_tables(engine):
 
 @pytest.fixture
 def mock_session(engine, create_tables):
-    conn = engine.connect()
-    transaction = conn.begin()
-    Session = sessionmaker(bind=conn)
+    Session = sessionmaker(bind=engine)
     session = Session()
     yield session
+    session.rollback()
     session.close()
-    transaction.rollback()
-    conn.close()
+    with engine.begin() as conn:
+        for table in reversed(Base.metadata.sorted_tables):
+            conn.execute(table.delete())
+
+@pytest.fixture(autouse=True)
+def clear_status_cache():
+    # Кэши статусов и задач общие для процесса, а база очищается после каждого теста
+    status_cache.invalidate()
+    task_cache.clear()
+    yield
+    status_cache.invalidate()
+    task_cache.clear()
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+def async_session_factory(async_engine):
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+@pytest.fixture
+async def async_session(async_session_factory, mock_session):
+    async with async_session_factory() as session:
+        yield session
+
+@pytest.fixture
+def query_counter(engine):
+    """Список SQL-запросов, выполненных движком за время теста"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
 
 @pytest.fixture
 def task_creation_service(mock_session):
     return TaskCreationService(mock_session)
 
+@pytest.fixture
+def bulk_task_creation_service(mock_session):
+    return BulkTaskCreationService(mock_session)
+
 @pytest.fixture
 def task_search_service(mock_session):
     return TaskSearchService(mock_session)
@@ -41,10 +110,18 @@ def task_search_service(mock_session):
 def task_modification_service(mock_session):
     return TaskModificationService(mock_session)
 
+@pytest.fixture
+def bulk_task_modification_service(mock_session):
+    return BulkTaskModificationService(mock_session)
+
 @pytest.fixture
 def task_delete_service(mock_session):
     return TaskDeleteService(mock_session)
 
+@pytest.fixture
+def bulk_task_delete_service(mock_session):
+    return BulkTaskDeleteService(mock_session)
+
 @pytest.fixture
 def create_status_service(mock_session):
     return CreateStatusService(mock_session)
@@ -62,7 +139,7 @@ def delete_status_service(mock_session):
     return DeleteStatusService(mock_session)
 
 @pytest.fixture(scope="function")
-def api_client(mock_session):
+def api_client(mock_session, async_session_factory):
 
     def override_get_db():
         try:
@@ -70,6 +147,18 @@ def api_client(mock_session):
         finally:
             mock_session.close()
 
+    async def override_get_async_db():
+        session = LazyAsyncSession(async_session_factory)
+        try:
+            yield session
+        finally:
+            await session.close()
+            # Запрос шел через отдельное соединение, поэтому после него
+            # тестовая сессия должна перечитать объекты из базы
+            mock_session.expire_all()
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_async_sessionmaker] = lambda: async_session_factory
     with TestClient(app) as test_client:
         yield test_client
\ No newline at end of file
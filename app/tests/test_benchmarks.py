@@ -0,0 +1,38 @@
+import json
+
+from benchmarks import bench_endpoints, bench_services, compare
+
+
+def test_endpoint_benchmarks_cover_all_routes_without_errors(tmp_path):
+    output = tmp_path / "endpoints.json"
+    database_url = f"sqlite:///{tmp_path / 'bench.sqlite3'}"
+    report = bench_endpoints.main(
+        ["--database-url", database_url, "--tasks", "50", "--requests", "3", "--bulk-size", "2", "--output", str(output)]
+    )
+
+    assert json.loads(output.read_text()) == report
+    assert report["meta"]["database"] == "sqlite"
+    for stats in report["results"].values():
+        assert stats["count"] == 3
+        assert stats["errors"] == 0
+
+
+def test_service_benchmarks(tmp_path):
+    database_url = f"sqlite:///{tmp_path / 'bench.sqlite3'}"
+    report = bench_services.main(
+        ["--database-url", database_url, "--tasks", "50", "--iterations", "3", "--bulk-size", "2"]
+    )
+
+    assert "TaskSearchService.get_tasks_page" in report["results"]
+    assert report["results"]["TaskCreationService"]["count"] == 3
+
+
+def test_compare_fails_on_regression(tmp_path):
+    baseline = {"kind": "services", "results": {"op": {"p50_ms": 1.0, "p99_ms": 2.0}}}
+    current = {"kind": "services", "results": {"op": {"p50_ms": 1.05, "p99_ms": 3.0}}}
+    (tmp_path / "baseline.json").write_text(json.dumps(baseline))
+    (tmp_path / "current.json").write_text(json.dumps(current))
+    args = [str(tmp_path / "baseline.json"), str(tmp_path / "current.json")]
+
+    assert compare.main(args + ["--threshold", "10"]) == 1
+    assert compare.main(args + ["--threshold", "60"]) == 0
@@ -0,0 +1,92 @@
+import gzip
+import uuid
+import pytest
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from .factories import StatusDbModelFactory, TaskDbModelFactory
+from api import compression
+from api.compression import CompressionMiddleware, choose_encoding
+
+
+def make_client(response, **options) -> TestClient:
+    async def app(scope, receive, send):
+        await response(scope, receive, send)
+
+    options = {"encodings": ["gzip"], "min_size": 100, **options}
+    return TestClient(CompressionMiddleware(app, **options))
+
+
+def test_large_task_list_is_compressed(api_client, mock_session):
+    mock_session.add(StatusDbModelFactory())
+    for _ in range(20):
+        mock_session.add(TaskDbModelFactory(id=uuid.uuid4(), text="Длинный текст задачи " * 100))
+    mock_session.commit()
+
+    resp = api_client.get("/tasks/get_list", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert int(resp.headers["Content-Length"]) < len(resp.content)
+    assert len(resp.json()["items"]) == 20
+
+
+def test_small_response_is_not_compressed(api_client):
+    resp = api_client.get("/health", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in resp.headers
+    assert resp.headers["Vary"] == "Accept-Encoding"
+
+
+def test_identity_only_client_gets_uncompressed_body():
+    client = make_client(PlainTextResponse("x" * 1000))
+    resp = client.get("/", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in resp.headers
+    assert resp.text == "x" * 1000
+
+
+def test_streaming_response_is_not_compressed():
+    async def chunks():
+        for _ in range(3):
+            yield "x" * 1000
+
+    client = make_client(StreamingResponse(chunks(), media_type="text/csv"))
+    resp = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in resp.headers
+    assert len(resp.text) == 3000
+
+
+def test_large_body_is_compressed_in_threadpool(mocker):
+    spy = mocker.spy(compression, "run_in_threadpool")
+    client = make_client(PlainTextResponse("x" * 5000), threadpool_min_size=1000)
+
+    resp = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert resp.text == "x" * 5000
+    assert spy.call_count == 1
+
+
+def test_medium_body_is_compressed_inline(mocker):
+    spy = mocker.spy(compression, "run_in_threadpool")
+    client = make_client(PlainTextResponse("x" * 500), threadpool_min_size=1000)
+
+    resp = client.get("/", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert spy.call_count == 0
+
+
+@pytest.mark.parametrize(
+    "accept_encoding, expected",
+    [
+        ("gzip, deflate", "gzip"),
+        ("br;q=1.0, gzip;q=0.5", "br"),
+        ("gzip;q=0", None),
+        ("*", "br"),
+        ("identity", None),
+        ("", None),
+    ],
+)
+def test_choose_encoding(accept_encoding, expected, mocker):
+    mocker.patch.dict(compression.ENCODERS, {"br": lambda body: body})
+    assert choose_encoding(accept_encoding, ["zstd", "br", "gzip"]) == expected
+
+
+def test_unavailable_encoding_is_skipped(mocker):
+    mocker.patch.dict(compression.ENCODERS, {"gzip": gzip.compress}, clear=True)
+    assert choose_encoding("zstd, br, gzip", ["zstd", "br", "gzip"]) == "gzip"
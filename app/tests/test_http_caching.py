@@ -0,0 +1,109 @@
+import uuid
+import pytest
+from .factories import StatusDbModelFactory, TaskDbModelFactory
+from services.versions import ResourceVersions, create_versions_file
+
+@pytest.fixture
+def task_id(mock_session):
+    task_id = uuid.uuid4()
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(TaskDbModelFactory(id=task_id))
+    mock_session.commit()
+    return task_id
+
+
+def test_status_list_is_not_modified_without_queries(api_client, mock_session):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.commit()
+
+    resp = api_client.get("/status/get_all_statuses")
+    etag = resp.headers["ETag"]
+    assert resp.headers["Cache-Control"] == "private, no-cache"
+
+    resp = api_client.get("/status/get_all_statuses", headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.content == b""
+    assert resp.headers["ETag"] == etag
+    assert 'desc="0 queries"' in resp.headers["Server-Timing"]
+
+
+def test_status_etag_changes_after_update(api_client, mock_session):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.commit()
+    etag = api_client.get("/status/get", params={"status_id": 1}).headers["ETag"]
+
+    api_client.patch("/status/update", json={"id": 1, "name": "Готово"})
+
+    resp = api_client.get("/status/get", params={"status_id": 1}, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()["name"] == "Готово"
+    assert resp.headers["ETag"] != etag
+
+
+def test_task_is_not_modified(api_client, task_id):
+    etag = api_client.get("/tasks/get", params={"task_id": task_id.hex}).headers["ETag"]
+
+    resp = api_client.get("/tasks/get", params={"task_id": task_id.hex}, headers={"If-None-Match": f'"x", {etag}'})
+    assert resp.status_code == 304
+
+
+def test_task_etag_changes_after_task_update(api_client, task_id):
+    etag = api_client.get("/tasks/get", params={"task_id": task_id.hex}).headers["ETag"]
+
+    api_client.patch("/tasks/update", json={"id": task_id.hex, "name": "Новое", "text": None, "status": None})
+
+    resp = api_client.get("/tasks/get", params={"task_id": task_id.hex}, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()["name"] == "Новое"
+
+
+def test_task_etag_changes_after_status_rename(api_client, task_id):
+    etag = api_client.get("/tasks/get", params={"task_id": task_id.hex}).headers["ETag"]
+
+    api_client.patch("/status/update", json={"id": 1, "name": "Готово"})
+
+    resp = api_client.get("/tasks/get", params={"task_id": task_id.hex}, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()["status"] == "Готово"
+
+
+def test_deleted_task_is_not_answered_with_304(api_client, task_id):
+    etag = api_client.get("/tasks/get", params={"task_id": task_id.hex}).headers["ETag"]
+
+    api_client.delete("/tasks/delete", params={"task_id": task_id.hex})
+
+    resp = api_client.get("/tasks/get", params={"task_id": task_id.hex}, headers={"If-None-Match": etag})
+    assert resp.status_code == 404
+
+
+def test_etag_changes_every_ttl_window(mocker):
+    versions = ResourceVersions(ttl=30)
+    time_mock = mocker.patch("services.versions.time.time", return_value=1000.0)
+    etag = versions.statuses_etag()
+
+    time_mock.return_value = 1019.0
+    assert versions.statuses_etag() == etag
+    time_mock.return_value = 1021.0
+    assert versions.statuses_etag() != etag
+
+
+def test_etags_differ_between_processes():
+    task_id = uuid.uuid4()
+    assert ResourceVersions().task_etag(task_id) != ResourceVersions().task_etag(task_id)
+
+
+def test_workers_share_versions_file(tmp_path):
+    path = str(tmp_path / "versions.bin")
+    create_versions_file(path)
+    first, second = ResourceVersions(path=path), ResourceVersions(path=path)
+    task_id = uuid.uuid4()
+    assert first.task_etag(task_id) == second.task_etag(task_id)
+
+    etag = second.task_etag(task_id)
+    first.bump_tasks([task_id])
+    assert second.task_version(task_id) == 1
+    assert second.task_etag(task_id) != etag
+
+    first.bump_statuses()
+    assert second.statuses == 1
+    assert first.statuses_etag() == second.statuses_etag()
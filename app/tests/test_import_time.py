@@ -0,0 +1,51 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict
+
+APP_DIR = Path(__file__).resolve().parent.parent
+
+# Измерено около 250 мс; запас на медленные машины CI
+MAIN_IMPORT_BUDGET_MS = 750
+
+# Нужны только процессу, который обслуживает запросы
+APPLICATION_MODULES = ("fastapi", "sqlalchemy", "api.application", "api.endpoints.tasks", "services.tasks_services")
+
+
+def import_profile(code: str) -> Dict[str, int]:
+    """Модули, загруженные при выполнении code, и их суммарное время импорта в мкс
+    по python -X importtime"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP_DIR,
+        env={**os.environ, "DEBUG": "True"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        profile[name.strip()] = int(cumulative)
+
+    return profile
+
+
+def test_main_import_within_budget():
+    profile = import_profile("import main")
+
+    assert not set(APPLICATION_MODULES) & set(profile)
+    assert profile["main"] / 1000 < MAIN_IMPORT_BUDGET_MS
+
+
+def test_application_is_built_on_first_access():
+    assert "api.application" in import_profile("import main; main.app")
+
+
+def test_database_module_does_not_create_engines():
+    profile = import_profile("import db.session.db_session")
+
+    assert "aiosqlite" not in profile
@@ -0,0 +1,82 @@
+import os
+import pytest
+from sqlalchemy.exc import OperationalError
+from api.metrics import BUCKETS, RequestMetrics, read_snapshots, render, request_metrics, write_snapshot
+from services.status_services import AsyncSearchStatusService
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    request_metrics.reset()
+    yield
+    request_metrics.reset()
+
+
+def metric_lines(text: str, name: str) -> list:
+    return [line for line in text.splitlines() if line.startswith(name)]
+
+
+def test_metrics_count_requests_by_route_template(api_client):
+    api_client.get("/tasks/get", params={"task_id": "not-a-uuid"})
+    api_client.get("/tasks/get", params={"task_id": "still-not-a-uuid"})
+    api_client.get("/no/such/route")
+
+    text = api_client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/tasks/get",status="400"} 2' in text
+    assert 'http_requests_total{method="GET",route="unmatched",status="404"} 1' in text
+    assert (
+        'http_request_duration_seconds_bucket{method="GET",route="/tasks/get",status="400",le="+Inf"} 2' in text
+    )
+    assert 'http_request_duration_seconds_count{method="GET",route="/tasks/get",status="400"} 2' in text
+    # Сам запрос /metrics еще обрабатывается
+    assert "http_requests_in_flight 1" in text
+
+
+def test_metrics_count_database_errors(api_client, mocker):
+    mocker.patch.object(AsyncSearchStatusService, "get_all_status_rows", side_effect=OperationalError("SELECT", {}, None))
+    mocker.patch.object(AsyncSearchStatusService, "get_all_statuses", side_effect=OperationalError("SELECT", {}, None))
+
+    resp = api_client.get("/status/get_all_statuses")
+    assert resp.status_code == 500
+
+    text = api_client.get("/metrics").text
+    assert 'http_database_errors_total{method="GET",route="/status/get_all_statuses"} 1' in text
+    assert 'http_requests_total{method="GET",route="/status/get_all_statuses",status="500"} 1' in text
+
+
+def test_metrics_include_pool_gauges(api_client):
+    text = api_client.get("/metrics").text
+    assert metric_lines(text, 'db_pool_checkouts_total{engine="sync"}')
+    assert metric_lines(text, 'db_pool_checkouts_total{engine="async"}')
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = RequestMetrics()
+    metrics.observe("GET", "/tasks/get", 200, 0.001)
+    metrics.observe("GET", "/tasks/get", 200, 0.2)
+    metrics.observe("GET", "/tasks/get", 200, 60)
+
+    text = render([metrics.snapshot({})])
+    buckets = metric_lines(text, "http_request_duration_seconds_bucket")
+    assert len(buckets) == len(BUCKETS) + 1
+    assert buckets[0].endswith('le="0.005"} 1')
+    assert buckets[-2].endswith('le="10.0"} 2')
+    assert buckets[-1].endswith('le="+Inf"} 3')
+
+
+def test_snapshots_of_worker_processes_are_summed(tmp_path):
+    own = RequestMetrics()
+    own.observe("GET", "/tasks/get", 200, 0.01)
+    live_worker = RequestMetrics()
+    live_worker.observe("GET", "/tasks/get", 200, 0.01)
+    live_worker.in_flight = 2
+    dead_worker = RequestMetrics()
+    dead_worker.observe("GET", "/tasks/get", 200, 0.01)
+    dead_worker.in_flight = 5
+
+    write_snapshot(tmp_path, {**live_worker.snapshot({}), "pid": os.getppid()})
+    # Процесса с таким pid нет: его счетчики остаются, а gauge-метрики нет
+    write_snapshot(tmp_path, {**dead_worker.snapshot({}), "pid": 2 ** 22 + 1})
+
+    text = render(read_snapshots(tmp_path, own.snapshot({})))
+    assert 'http_requests_total{method="GET",route="/tasks/get",status="200"} 3' in text
+    assert "http_requests_in_flight 2" in text
@@ -0,0 +1,77 @@
+import logging
+import re
+from .factories import StatusDbModelFactory, TaskDbModelFactory
+from core.config import DevSettings
+from db.session.query_metrics import QueryStats
+from api import query_metrics
+
+
+def parse_server_timing(header: str) -> dict:
+    metrics = {}
+    for metric in header.split(", "):
+        name, *params = metric.split(";")
+        metrics[name] = dict(param.split("=", 1) for param in params)
+
+    return metrics
+
+
+def test_query_stats_keeps_slowest_statement():
+    stats = QueryStats()
+    stats.record("SELECT 1", 0.002)
+    stats.record("SELECT 2", 0.005)
+    stats.record("SELECT 3", 0.001)
+
+    assert stats.count == 3
+    assert stats.slowest_statement == "SELECT 2"
+    assert stats.server_timing() == 'db;dur=8.00;desc="3 queries", db-slowest;dur=5.00'
+
+
+def test_server_timing_header_counts_queries(api_client, mock_session):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(TaskDbModelFactory())
+    mock_session.commit()
+
+    resp = api_client.get("/tasks/get_list")
+    metrics = parse_server_timing(resp.headers["Server-Timing"])
+    assert resp.status_code == 200
+    assert re.fullmatch(r'"[1-9]\d* queries"', metrics["db"]["desc"])
+    assert float(metrics["db"]["dur"]) >= float(metrics["db-slowest"]["dur"]) > 0
+
+
+def test_server_timing_header_without_queries(api_client):
+    resp = api_client.get("/health")
+    assert parse_server_timing(resp.headers["Server-Timing"])["db"]["desc"] == '"0 queries"'
+
+
+def test_warning_when_query_count_exceeds_threshold(api_client, mock_session, mocker, caplog):
+    mocker.patch.object(query_metrics, "settings", DevSettings(QUERY_COUNT_WARNING=0))
+    mock_session.add(StatusDbModelFactory())
+    mock_session.commit()
+
+    with caplog.at_level(logging.WARNING, logger="api.query_metrics"):
+        api_client.get("/status/get", params={"status_id": 1})
+
+    assert "GET /status/get" in caplog.text
+    assert "SELECT" in caplog.text
+
+
+def test_no_header_when_metrics_disabled(api_client, mocker):
+    mocker.patch.object(query_metrics, "settings", DevSettings(QUERY_METRICS=False))
+
+    resp = api_client.get("/health")
+    assert "Server-Timing" not in resp.headers
+
+
+def test_streaming_response_queries_are_logged(api_client, mock_session, mocker, caplog):
+    mocker.patch.object(query_metrics, "settings", DevSettings(QUERY_COUNT_WARNING=0))
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(TaskDbModelFactory())
+    mock_session.commit()
+
+    with caplog.at_level(logging.WARNING, logger="api.query_metrics"):
+        resp = api_client.get("/tasks/export")
+
+    assert resp.status_code == 200
+    assert "Server-Timing" in resp.headers
+    # Запросы выгрузки идут уже после начала ответа и видны только в логе
+    assert "GET /tasks/export: 1 queries" in caplog.text
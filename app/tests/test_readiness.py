@@ -0,0 +1,115 @@
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import QueuePool
+from db.session.pool_metrics import get_pool_status
+from db.session.readiness import ReadinessCheck, pool_saturation
+from api import application
+
+
+def make_check(engine, **options) -> ReadinessCheck:
+    params = dict(pools={}, interval=5.0, timeout=2.0, max_age=15.0, max_saturation=1.0)
+    params.update(options)
+    return ReadinessCheck(engine, **params)
+
+
+@pytest.mark.anyio
+async def test_ready_after_successful_check(engine):
+    check = make_check(engine)
+    assert not check.status().ready
+
+    await check.refresh()
+    status = check.status()
+    assert status.ready
+    assert status.database
+    assert status.checked_ago_s < 1
+
+
+@pytest.mark.anyio
+async def test_not_ready_when_database_unavailable(tmp_path):
+    check = make_check(create_engine(f"sqlite:///{tmp_path / 'missing' / 'db.sqlite3'}"))
+
+    await check.refresh()
+    status = check.status()
+    assert not status.ready
+    assert "OperationalError" in status.detail
+
+
+@pytest.mark.anyio
+async def test_async_engine_is_checked(engine, async_engine, tmp_path):
+    check = make_check(engine, async_engine=async_engine)
+    await check.refresh()
+    assert check.status().ready
+
+    broken = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'missing' / 'db.sqlite3'}")
+    check = make_check(engine, async_engine=broken)
+    await check.refresh()
+    status = check.status()
+    assert not status.ready
+    assert "OperationalError" in status.detail
+    await broken.dispose()
+
+
+@pytest.mark.anyio
+async def test_hanging_check_times_out_and_is_not_restarted(engine, mocker):
+    calls = []
+
+    def slow_check():
+        calls.append(1)
+        time.sleep(0.3)
+
+    check = make_check(engine, timeout=0.05)
+    mocker.patch.object(check, "check_database", side_effect=slow_check)
+
+    await check.refresh()
+    await check.refresh()
+    assert not check.status().ready
+    assert len(calls) == 1
+
+
+@pytest.mark.anyio
+async def test_stale_result_is_not_ready(engine):
+    check = make_check(engine, max_age=10.0)
+    await check.refresh()
+    check.checked_at -= 11
+
+    assert not check.status().ready
+
+
+@pytest.mark.anyio
+async def test_not_ready_when_pool_is_saturated(database_path):
+    engine = create_engine(f"sqlite:///{database_path}", poolclass=QueuePool, pool_size=1, max_overflow=0)
+    check = make_check(engine, pools={"sync": engine.pool})
+    await check.refresh()
+    assert check.status().pool_saturation == {"sync": 0.0}
+
+    with engine.connect():
+        status = check.status()
+        assert not status.ready
+        assert status.database
+        assert status.pool_saturation == {"sync": 1.0}
+
+    engine.dispose()
+
+
+def test_pool_status_without_private_max_overflow():
+    engine = create_engine("sqlite://", poolclass=QueuePool, pool_size=2)
+    del engine.pool._max_overflow  # Как если бы атрибут убрали в новой версии SQLAlchemy
+
+    assert get_pool_status(engine.pool).max_overflow is None
+    assert pool_saturation(engine.pool) == 0.0
+
+
+@pytest.mark.anyio
+async def test_readiness_endpoint(api_client, engine, mocker):
+    check = make_check(engine)
+    mocker.patch.object(application, "readiness_check", check)
+
+    assert api_client.get("/health/live").status_code == 200
+    assert api_client.get("/health/ready").status_code == 503
+
+    await check.refresh()
+    resp = api_client.get("/health/ready")
+    assert resp.status_code == 200
+    assert resp.json()["ready"] is True
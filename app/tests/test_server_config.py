@@ -0,0 +1,36 @@
+from core.config import DevSettings, ProductionSettings
+import main
+
+
+def test_server_config_from_production_settings(mocker):
+    settings = ProductionSettings(WORKERS=4, BACKLOG=4096, LIMIT_CONCURRENCY=500, TIMEOUT_KEEP_ALIVE=15)
+    mocker.patch.object(main, "settings", settings)
+
+    config = main.get_server_config()
+    assert config.workers == 4
+    assert config.backlog == 4096
+    assert config.limit_concurrency == 500
+    assert config.timeout_keep_alive == 15
+    assert config.timeout_graceful_shutdown == 30
+    assert not config.reload
+
+
+def test_server_config_in_debug_uses_single_worker(mocker):
+    mocker.patch.object(main, "settings", DevSettings(WORKERS=8))
+
+    config = main.get_server_config()
+    assert config.workers == 1
+    assert config.reload
+
+
+def test_production_settings_default_to_cpu_count(mocker):
+    mocker.patch("core.config.os.cpu_count", return_value=16)
+    assert ProductionSettings().WORKERS == 16
+
+
+def test_signal_handler_drains_server(mocker):
+    server = mocker.Mock(should_exit=False)
+    mocker.patch.object(main, "server", server)
+
+    main.signal_handler(15, None)
+    assert server.should_exit is True
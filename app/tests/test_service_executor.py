@@ -0,0 +1,102 @@
+import asyncio
+import threading
+import time
+import pytest
+from sqlalchemy.orm import sessionmaker
+from .factories import StatusDbModelFactory, TaskDbModelFactory
+from api.deps.db_dependency import get_async_db
+from api.metrics import RequestMetrics, render
+from db.session.query_metrics import QueryStats, current_query_stats
+from exceptions.service_exceptions import ServiceOverloaded
+from main import app
+from services.executor import ExecutorSession, ServiceExecutor
+from services.tasks_services import AsyncTaskSearchService
+
+
+@pytest.mark.anyio
+async def test_executor_runs_in_worker_thread():
+    executor = ServiceExecutor(2, max_queue=0)
+
+    assert await executor.run(threading.current_thread) is not threading.current_thread()
+    with pytest.raises(ZeroDivisionError):
+        await executor.run(lambda: 1 / 0)
+    assert executor.stats()["started"] == 2
+    assert executor.in_use == 0
+    executor.shutdown()
+
+
+@pytest.mark.anyio
+async def test_executor_rejects_when_queue_is_full():
+    executor = ServiceExecutor(1, max_queue=1)
+    release = threading.Event()
+
+    running = asyncio.ensure_future(executor.run(release.wait))
+    queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+    await asyncio.sleep(0.01)
+    assert (executor.active, executor.queued) == (1, 1)
+
+    with pytest.raises(ServiceOverloaded):
+        await executor.run(lambda: "rejected")
+
+    release.set()
+    assert await queued == "queued"
+    await running
+    assert executor.stats()["rejected"] == 1
+    assert executor.in_use == 0
+    executor.shutdown()
+
+
+@pytest.mark.anyio
+async def test_executor_drops_calls_that_waited_too_long():
+    executor = ServiceExecutor(1, max_queue=1, queue_timeout=0.01)
+
+    running = asyncio.ensure_future(executor.run(time.sleep, 0.05))
+    await asyncio.sleep(0)
+    with pytest.raises(ServiceOverloaded):
+        await executor.run(lambda: "late")
+    await running
+    assert executor.stats()["wait_max"] > 0.01
+    executor.shutdown()
+
+
+@pytest.mark.anyio
+async def test_executor_session_runs_services(engine, mock_session):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(TaskDbModelFactory())
+    mock_session.commit()
+    executor = ServiceExecutor(1, max_queue=0)
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+
+    try:
+        page = await AsyncTaskSearchService(ExecutorSession(sessionmaker(bind=engine), executor)).get_tasks_page(10)
+    finally:
+        current_query_stats.reset(token)
+
+    assert len(page.items) == 1
+    # Запросы из потока пула учтены в статистике HTTP-запроса
+    assert stats.count > 0
+    executor.shutdown()
+
+
+def test_saturated_executor_returns_503(api_client, engine, monkeypatch):
+    executor = ServiceExecutor(1, max_queue=0)
+    executor.in_use = 1  # Единственный поток занят
+    monkeypatch.setitem(
+        app.dependency_overrides, get_async_db, lambda: ExecutorSession(sessionmaker(bind=engine), executor)
+    )
+
+    resp = api_client.get("/tasks/get_list")
+    assert resp.status_code == 503
+    assert resp.headers["Retry-After"] == "1"
+
+
+def test_executor_metrics_are_rendered():
+    executor = ServiceExecutor(4, max_queue=8)
+    executor.rejected = 3
+    snapshot = RequestMetrics().snapshot({}, executors={"service": executor.stats()})
+
+    text = render([snapshot, snapshot])
+    assert 'service_executor_threads{executor="service"} 8' in text
+    assert 'service_executor_calls{executor="service",state="queued"} 0' in text
+    assert 'service_executor_rejected_total{executor="service"} 6' in text
@@ -0,0 +1,123 @@
+from db.entities.models import Status
+from services.status_cache import StatusCache
+from .factories import (
+    StatusDbModelFactory,
+    TaskDbModelFactory,
+    TaskCreationModelFactory,
+    UpdateStatusModelFactory,
+)
+
+
+def test_cache_loads_catalogue_once(mock_session, query_counter):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(StatusDbModelFactory(id=2, name="Готово"))
+    mock_session.commit()
+    cache = StatusCache()
+    query_counter.clear()
+
+    assert cache.get_name(mock_session, 1) == "В работе"
+    assert cache.get_name(mock_session, 2) == "Готово"
+    assert cache.exists(mock_session, 1)
+    assert len(query_counter) == 1
+
+
+def test_cache_reloads_on_miss(mock_session, mocker):
+    monotonic = mocker.patch("services.status_cache.time.monotonic", return_value=100.0)
+    cache = StatusCache(miss_reload_interval=1)
+    assert cache.get_name(mock_session, 1) is None
+
+    mock_session.add(StatusDbModelFactory())
+    mock_session.commit()
+
+    monotonic.return_value = 101.0
+    assert cache.get_name(mock_session, 1) == "В работе"
+
+
+def test_unknown_ids_do_not_reload_on_every_lookup(mock_session, mocker, query_counter):
+    monotonic = mocker.patch("services.status_cache.time.monotonic", return_value=100.0)
+    mock_session.add(StatusDbModelFactory())
+    mock_session.commit()
+    cache = StatusCache(miss_reload_interval=1)
+    query_counter.clear()
+
+    def catalogue_loads():
+        return [statement for statement in query_counter if "WHERE" not in statement]
+
+    for _ in range(5):
+        assert cache.get_name(mock_session, 999999) is None
+    assert len(catalogue_loads()) == 1
+
+    monotonic.return_value = 100.5
+    assert cache.get_name(mock_session, 999999) is None
+    assert len(catalogue_loads()) == 1
+
+    monotonic.return_value = 101.0
+    assert cache.get_name(mock_session, 999999) is None
+    assert len(catalogue_loads()) == 2
+
+
+def test_status_created_by_another_worker_is_found_between_reloads(mock_session, mocker, query_counter):
+    mocker.patch("services.status_cache.time.monotonic", return_value=100.0)
+    mock_session.add(StatusDbModelFactory())
+    mock_session.commit()
+    cache = StatusCache(miss_reload_interval=1)
+    assert cache.get_name(mock_session, 2) is None
+
+    # Статус создан другим воркером, перечитывать справочник еще рано
+    mock_session.add(StatusDbModelFactory(id=2, name="Готово"))
+    mock_session.commit()
+    query_counter.clear()
+    assert cache.get_name(mock_session, 2) == "Готово"
+    assert len(query_counter) == 1
+    assert "WHERE" in query_counter[0]
+
+    query_counter.clear()
+    assert cache.get_name(mock_session, 2) == "Готово"
+    assert query_counter == []
+
+
+def test_cache_reloads_after_ttl(mock_session, mocker):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.commit()
+    cache = StatusCache(ttl=10)
+    monotonic = mocker.patch("services.status_cache.time.monotonic", return_value=100.0)
+    assert cache.get_name(mock_session, 1) == "В работе"
+
+    mock_session.query(Status).filter_by(id=1).update({"name": "Переименован"})
+    mock_session.commit()
+    assert cache.get_name(mock_session, 1) == "В работе"
+
+    monotonic.return_value = 111.0
+    assert cache.get_name(mock_session, 1) == "Переименован"
+
+
+def test_status_services_write_through(create_status_service, update_status_service, delete_status_service,
+                                       search_status_service, mock_session, query_counter):
+    create_status_service("Новый")
+    status_id = mock_session.query(Status).filter_by(name="Новый").one().id
+    search_status_service.get_all_statuses()
+
+    update_status_service(UpdateStatusModelFactory(id=status_id, name="Обновлен"))
+    query_counter.clear()
+    assert search_status_service.find_status_by_id(status_id).name == "Обновлен"
+    assert len(query_counter) == 0
+
+    delete_status_service(status_id)
+    assert search_status_service.get_all_statuses() == []
+
+
+def test_task_services_skip_status_query(task_creation_service, task_search_service, mock_session, query_counter):
+    task = TaskDbModelFactory()
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(task)
+    mock_session.commit()
+    task_search_service.find_task_by_id(task.id)
+    query_counter.clear()
+
+    task_creation_service(TaskCreationModelFactory())
+    assert not any("FROM status" in statement for statement in query_counter)
+
+    query_counter.clear()
+    found_task = task_search_service.find_task_by_id(task.id)
+    assert found_task.status == "В работе"
+    assert not any("FROM status" in statement for statement in query_counter)
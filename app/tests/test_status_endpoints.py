@@ -2,6 +2,7 @@ import pytest
 import json
 from sqlalchemy.exc import NoResultFound
 from db.entities.models import Status
+from core.config import settings
 from .factories import StatusDbModelFactory
 
 def test_status_creation_endpoint(api_client, mock_session):
@@ -48,6 +49,18 @@ def test_list_endpoint_with_correct_statuses(api_client, mock_session):
     assert resp.status_code == 200
     assert len(text) == 1
 
+def test_list_endpoint_fast_json_matches_model_serialization(api_client, mock_session, mocker):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(StatusDbModelFactory(id=2, name="Готово"))
+    mock_session.commit()
+
+    mocker.patch.object(settings, "FAST_JSON_LISTS", True)
+    fast_resp = api_client.get("/status/get_all_statuses")
+    mocker.patch.object(settings, "FAST_JSON_LISTS", False)
+    model_resp = api_client.get("/status/get_all_statuses")
+
+    assert json.loads(fast_resp.text) == json.loads(model_resp.text)
+
 def test_update_endpoint_with_incorrect_status(api_client):
     resp = api_client.patch("/status/update", json={"id": 0, "name": "test"})
 
@@ -2,6 +2,7 @@ import pytest
 from sqlalchemy.exc import NoResultFound
 from db.entities.models import Status
 from exceptions.status_exceptions import StatusNotFoundException
+from services.status_services import AsyncSearchStatusService, AsyncUpdateStatusService
 from .factories import StatusDbModelFactory, UpdateStatusModelFactory
 
 def test_status_creation_service(create_status_service, mock_session):
@@ -56,6 +57,17 @@ def test_update_service_with_correct_updated(update_status_service, mock_session
     assert updated_status.id == 1
     assert updated_status.name == "update"
 
+def test_update_service_is_single_update(update_status_service, mock_session, query_counter):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.commit()
+    query_counter.clear()
+
+    update_status_service(UpdateStatusModelFactory())
+
+    assert len(query_counter) == 1
+    assert query_counter[0].startswith("UPDATE status SET name=")
+    assert update_status_service.status_cache.get_name(mock_session, 1) == "update"
+
 def test_status_delete_service_with_non_existing_status(delete_status_service):
     with pytest.raises(StatusNotFoundException):
         delete_status_service(0)
@@ -68,4 +80,20 @@ def test_status_delete_service_with_correct_task(delete_status_service, mock_ses
     delete_status_service(status.id)
 
     with pytest.raises(NoResultFound):
-        mock_session.get_one(Status, status.id)
\ No newline at end of file
+        mock_session.get_one(Status, status.id)
+
+@pytest.mark.anyio
+async def test_async_update_and_search_services(async_session, mock_session):
+    status = StatusDbModelFactory()
+    mock_session.add(status)
+    mock_session.commit()
+
+    await AsyncUpdateStatusService(async_session)(UpdateStatusModelFactory())
+
+    found_status = await AsyncSearchStatusService(async_session).find_status_by_id(1)
+    assert found_status.name == "update"
+
+@pytest.mark.anyio
+async def test_async_search_with_incorrect_id(async_session):
+    with pytest.raises(StatusNotFoundException):
+        await AsyncSearchStatusService(async_session).find_status_by_id(0)
@@ -0,0 +1,359 @@
+import socketserver
+import threading
+import time
+import uuid
+import pytest
+from .factories import StatusDbModelFactory, TaskDbModelFactory, TaskUpdateModelFactory, UpdateStatusModelFactory
+from exceptions.task_exceptions import TaskNotFoundException
+from services.task_cache import MemoryCacheBackend, RedisCacheBackend, TaskCache, task_cache
+from services.tasks_services import (
+    AsyncBulkTaskDeleteService,
+    AsyncTaskModificationService,
+    AsyncTaskSearchService,
+    TaskDeleteService,
+    TaskModificationService,
+    TaskSearchService,
+)
+from services.status_services import UpdateStatusService
+
+
+class RespHandler(socketserver.StreamRequestHandler):
+    """Заменитель Redis для тестов: GET, SET с PX, DEL, SCAN, SELECT, AUTH"""
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            args = []
+            for _ in range(int(line[1:])):
+                length = int(self.rfile.readline()[1:])
+                args.append(self.rfile.read(length + 2)[:-2])
+            self.wfile.write(self.server.execute(args))
+
+class RespServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), RespHandler)
+        self.data = {}
+        self.commands = []
+        self.password = b"secret"
+
+    def execute(self, args) -> bytes:
+        command = args[0].upper()
+        self.commands.append(command)
+        now = time.monotonic()
+        if command == b"GET":
+            value, expires_at = self.data.get(args[1], (None, None))
+            if value is None or (expires_at and expires_at < now):
+                return b"$-1\r\n"
+            return b"$%d\r\n%s\r\n" % (len(value), value)
+        if command == b"SET":
+            expires_at = now + int(args[4]) / 1000 if len(args) > 3 and args[3].upper() == b"PX" else None
+            self.data[args[1]] = (args[2], expires_at)
+            return b"+OK\r\n"
+        if command == b"DEL":
+            deleted = sum(self.data.pop(key, None) is not None for key in args[1:])
+            return b":%d\r\n" % deleted
+        if command == b"SCAN":
+            prefix = args[3].rstrip(b"*")
+            keys = [key for key in self.data if key.startswith(prefix)]
+            return b"*2\r\n$1\r\n0\r\n*%d\r\n" % len(keys) + b"".join(
+                b"$%d\r\n%s\r\n" % (len(key), key) for key in keys
+            )
+        if command == b"SELECT":
+            return b"+OK\r\n"
+        if command == b"AUTH":
+            return b"+OK\r\n" if args[1] == self.password else b"-WRONGPASS invalid password\r\n"
+        return b"-ERR unknown command\r\n"
+
+
+@pytest.fixture
+def resp_server():
+    server = RespServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def memory_cache():
+    return TaskCache(MemoryCacheBackend(max_size=100, ttl=30))
+
+
+@pytest.fixture
+def task(mock_session):
+    task = TaskDbModelFactory(id=uuid.uuid4())
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(task)
+    mock_session.commit()
+    return task
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryCacheBackend(max_size=2, ttl=None)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    backend.get("a")
+    backend.set("c", b"3")
+
+    assert backend.get("b") is None
+    assert backend.get("a") == b"1"
+    assert backend.evictions == 1
+    assert len(backend) == 2
+
+
+def test_memory_backend_expires_entries(mocker):
+    monotonic = mocker.patch("services.task_cache.time.monotonic", return_value=100.0)
+    backend = MemoryCacheBackend(max_size=10, ttl=5)
+    backend.set("a", b"1")
+
+    monotonic.return_value = 104.0
+    assert backend.get("a") == b"1"
+    monotonic.return_value = 106.0
+    assert backend.get("a") is None
+
+
+def test_cached_task_is_read_without_queries(mock_session, memory_cache, task, query_counter):
+    service = TaskSearchService(mock_session, task_cache=memory_cache)
+    service.find_task_by_id(task.id)
+    query_counter.clear()
+
+    found_task = service.find_task_by_id(task.id)
+
+    assert found_task.name == task.name
+    assert found_task.status == "В работе"
+    assert query_counter == []
+    assert memory_cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "errors": 0}
+
+
+def test_status_rename_is_visible_in_cached_task(mock_session, memory_cache, task):
+    service = TaskSearchService(mock_session, task_cache=memory_cache)
+    service.find_task_by_id(task.id)
+
+    UpdateStatusService(mock_session)(UpdateStatusModelFactory(name="Готово"))
+
+    assert service.find_task_by_id(task.id).status == "Готово"
+    assert memory_cache.hits == 1
+
+
+def test_modification_invalidates_cached_task(mock_session, memory_cache, task):
+    service = TaskSearchService(mock_session, task_cache=memory_cache)
+    service.find_task_by_id(task.id)
+
+    TaskModificationService(mock_session, task_cache=memory_cache)(
+        TaskUpdateModelFactory(id=str(task.id), name="Новое", text=None, status=None)
+    )
+
+    assert service.find_task_by_id(task.id).name == "Новое"
+    assert memory_cache.hits == 0
+
+
+def test_update_during_cache_fill_is_not_cached(mock_session, memory_cache, task, mocker):
+    service = TaskSearchService(mock_session, task_cache=memory_cache)
+    read_task = service.read_task
+
+    def read_then_update(task_id):
+        row = read_task(task_id)
+        # Изменение закоммичено и сбросило кэш между чтением строки и ее записью в кэш
+        TaskModificationService(mock_session, task_cache=memory_cache)(
+            TaskUpdateModelFactory(id=str(task_id), name="Новое", text=None, status=None)
+        )
+        return row
+
+    old_name = task.name
+    mocker.patch.object(service, "read_task", side_effect=read_then_update)
+    assert service.find_task_by_id(task.id).name == old_name
+
+    mocker.stopall()
+    assert memory_cache.get(task.id) is None
+    assert service.find_task_by_id(task.id).name == "Новое"
+
+
+def test_delete_invalidates_cached_task(mock_session, memory_cache, task):
+    task_id = task.id
+    service = TaskSearchService(mock_session, task_cache=memory_cache)
+    service.find_task_by_id(task_id)
+
+    TaskDeleteService(mock_session, task_cache=memory_cache)(task_id)
+
+    with pytest.raises(TaskNotFoundException):
+        service.find_task_by_id(task_id)
+
+
+def test_redis_backend(resp_server):
+    backend = RedisCacheBackend(f"redis://127.0.0.1:{resp_server.server_address[1]}/1", ttl=30, timeout=1)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+
+    assert backend.get("a") == b"1"
+    assert resp_server.data[b"testtask:a"][1] is not None  # Ключ записан с TTL
+
+    backend.delete(["a"])
+    assert backend.get("a") is None
+
+    resp_server.data[b"other"] = (b"3", None)
+    backend.clear()
+    assert list(resp_server.data) == [b"other"]
+    assert backend.errors == 0
+    assert resp_server.commands.count(b"SELECT") == 1  # Соединение переиспользуется
+
+
+def test_redis_backend_with_wrong_password(resp_server):
+    backend = RedisCacheBackend(f"redis://:wrong@127.0.0.1:{resp_server.server_address[1]}", ttl=30, timeout=1)
+
+    assert backend.get("a") is None
+    assert backend.get("a") is None
+    assert backend.errors == 2
+    # Отклоненное соединение не попадает в пул
+    assert backend._idle == []
+
+
+def test_task_search_through_redis_backend(mock_session, resp_server, task, query_counter):
+    cache = TaskCache(RedisCacheBackend(f"redis://127.0.0.1:{resp_server.server_address[1]}", ttl=30, timeout=1))
+    service = TaskSearchService(mock_session, task_cache=cache)
+    service.find_task_by_id(task.id)
+    query_counter.clear()
+
+    assert service.find_task_by_id(task.id).name == task.name
+    assert query_counter == []
+    assert cache.hits == 1
+
+
+def test_unavailable_redis_falls_back_to_database(mock_session, resp_server, task):
+    port = resp_server.server_address[1]
+    resp_server.shutdown()
+    resp_server.server_close()
+    cache = TaskCache(RedisCacheBackend(f"redis://127.0.0.1:{port}", ttl=30, timeout=0.1))
+
+    found_task = TaskSearchService(mock_session, task_cache=cache).find_task_by_id(task.id)
+
+    assert found_task.name == task.name
+    assert cache.stats()["errors"] == 1  # SET после ошибки GET уже не ходит к серверу
+
+
+def test_redis_backend_backs_off_after_connection_error(resp_server, mocker):
+    monotonic = mocker.patch("services.task_cache.time.monotonic", return_value=100.0)
+    backend = RedisCacheBackend(f"redis://127.0.0.1:{resp_server.server_address[1]}", ttl=30, timeout=1, retry_after=5)
+    mocker.patch("services.task_cache.RespConnection", side_effect=ConnectionRefusedError)
+
+    assert backend.get("a") is None
+    assert backend.get("a") is None
+    assert backend.errors == 1
+
+    mocker.stopall()
+    mocker.patch("services.task_cache.time.monotonic", return_value=106.0)
+    backend.set("a", b"1")
+    assert backend.get("a") == b"1"
+
+
+def test_modification_during_backoff_reaches_shared_cache(mock_session, resp_server, task):
+    url = f"redis://127.0.0.1:{resp_server.server_address[1]}"
+    cache = TaskCache(RedisCacheBackend(url, ttl=30, timeout=1, retry_after=60))
+    other_worker = TaskCache(RedisCacheBackend(url, ttl=30, timeout=1))
+    TaskSearchService(mock_session, task_cache=cache).find_task_by_id(task.id)
+    cache.backend._down_until = time.monotonic() + 60  # Пауза после сетевой ошибки
+
+    TaskModificationService(mock_session, task_cache=cache)(
+        TaskUpdateModelFactory(id=str(task.id), name="Новое", text=None, status=None)
+    )
+
+    assert other_worker.get(task.id) is None
+    assert TaskSearchService(mock_session, task_cache=other_worker).find_task_by_id(task.id).name == "Новое"
+
+
+def test_failed_delete_is_retried(resp_server, mocker):
+    url = f"redis://127.0.0.1:{resp_server.server_address[1]}"
+    backend = RedisCacheBackend(url, ttl=30, timeout=1, retry_after=5)
+    other_worker = RedisCacheBackend(url, ttl=30, timeout=1)
+    backend.set("a", b"old")
+
+    mocker.patch.object(backend, "_acquire", side_effect=ConnectionRefusedError)
+    backend.delete(["a"])
+    assert other_worker.get("a") == b"old"
+    assert backend.get("a") is None  # Свою устаревшую запись процесс уже не читает
+
+    mocker.stopall()
+    backend._down_until = 0.0
+    assert backend.get("b") is None  # Первая команда после паузы досылает сброс
+    assert other_worker.get("a") is None
+    assert backend._pending_deletes == set()
+
+
+def test_too_many_failed_deletes_clear_own_keys(resp_server, mocker):
+    mocker.patch("services.task_cache.MAX_PENDING_DELETES", 1)
+    backend = RedisCacheBackend(f"redis://127.0.0.1:{resp_server.server_address[1]}", ttl=30, timeout=1)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    resp_server.data[b"other"] = (b"3", None)
+
+    mocker.patch.object(backend, "_acquire", side_effect=ConnectionRefusedError)
+    backend.delete(["a", "b"])
+    mocker.stopall()
+    backend._down_until = 0.0
+
+    backend.set("c", b"3")
+    assert sorted(resp_server.data) == [b"other", b"testtask:c"]
+
+
+class RecordingBackend(MemoryCacheBackend):
+    """Сетевой, с точки зрения сервисов, backend: запоминает потоки, из которых вызван"""
+
+    blocking = True
+
+    def __init__(self):
+        super().__init__(max_size=10, ttl=30)
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.current_thread())
+        return super().get(key)
+
+    def delete(self, keys):
+        self.threads.append(threading.current_thread())
+        super().delete(keys)
+
+
+@pytest.mark.anyio
+async def test_async_search_calls_blocking_cache_off_loop(async_session, task):
+    backend = RecordingBackend()
+    service = AsyncTaskSearchService(async_session, task_cache=TaskCache(backend))
+
+    assert (await service.find_task_by_id(task.id)).name == task.name
+    assert (await service.find_task_by_id(task.id)).name == task.name
+    assert len(backend) == 1
+    assert threading.current_thread() not in backend.threads
+
+
+@pytest.mark.anyio
+async def test_async_writes_invalidate_blocking_cache_off_loop(async_session, task):
+    backend = RecordingBackend()
+    cache = TaskCache(backend)
+    await AsyncTaskSearchService(async_session, task_cache=cache).find_task_by_id(task.id)
+    backend.threads.clear()
+
+    await AsyncTaskModificationService(async_session, task_cache=cache)(
+        TaskUpdateModelFactory(id=str(task.id), name="Новое", text=None, status=None)
+    )
+    assert len(backend) == 0
+    await AsyncTaskSearchService(async_session, task_cache=cache).find_task_by_id(task.id)
+
+    await AsyncBulkTaskDeleteService(async_session, task_cache=cache)([task.id.hex])
+    assert len(backend) == 0
+    assert len(backend.threads) == 3  # Сброс, чтение, сброс
+    assert threading.current_thread() not in backend.threads
+
+
+def test_cache_counters_in_metrics(api_client, task):
+    # Счетчики общего кэша накапливаются за все тесты
+    hits, misses = task_cache.hits, task_cache.misses
+    api_client.get("/tasks/get", params={"task_id": task.id.hex})
+    api_client.get("/tasks/get", params={"task_id": task.id.hex})
+
+    text = api_client.get("/metrics").text
+    assert f'cache_requests_total{{cache="task",result="hit"}} {hits + 1}' in text
+    assert f'cache_requests_total{{cache="task",result="miss"}} {misses + 1}' in text
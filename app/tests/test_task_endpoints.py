@@ -1,9 +1,13 @@
+import csv
+import io
 import uuid
 import json
 import pytest
 from sqlalchemy.exc import NoResultFound
 from .factories import StatusDbModelFactory, TaskDbModelFactory
 from db.entities.models import Task
+from core.config import settings
+from schemas.models import TaskPage
 
 def test_create_task_endpoint_with_incorrect_status(api_client):
     resp = api_client.put("/tasks/create", json={"name": "test", "text": "test", "status": "-5"})
@@ -20,6 +24,42 @@ def test_create_task_endpoint_with_correct_status(api_client, mock_session):
     assert task is not None
     assert task.name == "test"
     assert task.text == "test"
+    assert resp.json() == {"id": task.id.hex, "name": "test", "text": "test", "status": "В работе"}
+
+def test_bulk_create_endpoint_with_json_list(api_client, mock_session):
+    status = StatusDbModelFactory()
+    mock_session.add(status)
+    mock_session.commit()
+
+    resp = api_client.post("/tasks/bulk_create", json=[
+        {"name": "test 1", "text": "test", "status": 1},
+        {"name": "test 2", "text": "test", "status": 5},
+    ])
+    results = json.loads(resp.text)
+    assert resp.status_code == 201
+    assert [result["created"] for result in results] == [True, False]
+    assert mock_session.query(Task).count() == 1
+
+def test_bulk_create_endpoint_with_ndjson(api_client, mock_session):
+    status = StatusDbModelFactory()
+    mock_session.add(status)
+    mock_session.commit()
+
+    body = "\n".join(json.dumps({"name": f"test {i}", "text": "test", "status": 1}) for i in range(3))
+    resp = api_client.post(
+        "/tasks/bulk_create", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert resp.status_code == 201
+    assert len(json.loads(resp.text)) == 3
+    assert mock_session.query(Task).count() == 3
+
+def test_bulk_create_endpoint_with_invalid_ndjson_line(api_client):
+    body = json.dumps({"name": "test", "text": "test", "status": 1}) + "\n" + json.dumps({"name": "test"})
+    resp = api_client.post(
+        "/tasks/bulk_create", content=body, headers={"Content-Type": "application/x-ndjson"}
+    )
+    assert resp.status_code == 422
+    assert json.loads(resp.text)["detail"][0]["loc"][:2] == ["body", 1]
 
 def test_search_endpoint_with_incorrect_id(api_client):
     fake_uuid = uuid.uuid4()
@@ -47,7 +87,8 @@ def test_list_endpoint_with_empty_base(api_client):
     resp = api_client.get("/tasks/get_list")
     result = json.loads(resp.text)
     assert resp.status_code == 200
-    assert result == []
+    assert result["items"] == []
+    assert result["next_cursor"] is None
 
 def test_list_endpoint_with_existing_tasks(api_client, mock_session):
     task = TaskDbModelFactory()
@@ -57,11 +98,89 @@ def test_list_endpoint_with_existing_tasks(api_client, mock_session):
     mock_session.add(status)
     mock_session.add(task)
     mock_session.add(another_task)
+    mock_session.commit()
 
     resp = api_client.get("/tasks/get_list")
     tasks = json.loads(resp.text)
     assert resp.status_code == 200
-    assert len(tasks) == 2
+    assert len(tasks["items"]) == 2
+
+def test_list_endpoint_follows_cursor(api_client, mock_session):
+    status = StatusDbModelFactory()
+    mock_session.add(status)
+    for i in range(5):
+        mock_session.add(TaskDbModelFactory(id=uuid.uuid4(), name=f"Тест {i}"))
+    mock_session.commit()
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["after"] = cursor
+        resp = api_client.get("/tasks/get_list", params=params)
+        assert resp.status_code == 200
+        page = json.loads(resp.text)
+        seen.extend(task["id"] for task in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == 5
+    assert seen == sorted(seen)
+
+def test_list_endpoint_filtered_by_status(api_client, mock_session):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(StatusDbModelFactory(id=2, name="Готово"))
+    mock_session.add(TaskDbModelFactory(id=uuid.uuid4(), status_id=1))
+    mock_session.add(TaskDbModelFactory(id=uuid.uuid4(), status_id=2))
+    mock_session.commit()
+
+    resp = api_client.get("/tasks/get_list?status=2")
+    page = json.loads(resp.text)
+    assert resp.status_code == 200
+    assert [task["status"] for task in page["items"]] == ["Готово"]
+
+def test_list_endpoint_fast_json_matches_model_serialization(api_client, mock_session, mocker):
+    mock_session.add(StatusDbModelFactory())
+    for i in range(3):
+        mock_session.add(TaskDbModelFactory(id=uuid.uuid4(), name=f"Тест {i}"))
+    mock_session.commit()
+
+    mocker.patch.object(settings, "FAST_JSON_LISTS", True)
+    fast_resp = api_client.get("/tasks/get_list?limit=2")
+    mocker.patch.object(settings, "FAST_JSON_LISTS", False)
+    model_resp = api_client.get("/tasks/get_list?limit=2")
+
+    assert fast_resp.status_code == model_resp.status_code == 200
+    assert fast_resp.headers["content-type"] == "application/json"
+    assert json.loads(fast_resp.text) == json.loads(model_resp.text)
+    TaskPage.model_validate_json(fast_resp.text)
+
+def test_list_endpoint_with_incorrect_cursor(api_client):
+    resp = api_client.get("/tasks/get_list?after=не-курсор")
+    assert resp.status_code == 400
+
+def test_search_endpoint(api_client, mock_session):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(StatusDbModelFactory(id=2, name="Готово"))
+    mock_session.add(TaskDbModelFactory(id=uuid.uuid4(), name="Позвонить врачу", status_id=1))
+    mock_session.add(TaskDbModelFactory(id=uuid.uuid4(), name="Позвонить маме", status_id=2))
+    mock_session.commit()
+
+    resp = api_client.get("/tasks/search", params={"q": "позвонить", "status": 2})
+    page = json.loads(resp.text)
+    assert resp.status_code == 200
+    assert [task["name"] for task in page["items"]] == ["Позвонить маме"]
+    assert page["next_cursor"] is None
+
+@pytest.mark.parametrize(
+    "params, status_code",
+    [({"q": ""}, 422), ({"q": "!!!"}, 400), ({"q": "тест", "after": "не-курсор"}, 400)],
+)
+def test_search_endpoint_with_incorrect_query(api_client, params, status_code):
+    resp = api_client.get("/tasks/search", params=params)
+    assert resp.status_code == status_code
 
 def test_update_endpoint_with_nonexisting_task(api_client):
     task = TaskDbModelFactory()
@@ -100,8 +219,69 @@ def test_delete_endpoint_with_correct_task(api_client, mock_session):
     mock_session.add(task)
     mock_session.commit()
 
-    resp = api_client.delete(f"/tasks/delete?task_id={task.id.hex}")
+    task_id = task.id
+    resp = api_client.delete(f"/tasks/delete?task_id={task_id.hex}")
     assert resp.status_code == 200
 
     with pytest.raises(NoResultFound):
-        mock_session.get_one(Task, task.id)
\ No newline at end of file
+        mock_session.get_one(Task, task_id)
+
+def test_bulk_update_endpoint(api_client, mock_session):
+    task = TaskDbModelFactory()
+    status = StatusDbModelFactory()
+    mock_session.add(status)
+    mock_session.add(task)
+    mock_session.commit()
+    missing_id = str(uuid.uuid4())
+
+    resp = api_client.patch("/tasks/bulk_update", json=[
+        {"id": str(task.id), "name": "update", "text": None, "status": None},
+        {"id": missing_id, "name": "update", "text": None, "status": None},
+    ])
+    result = json.loads(resp.text)
+    assert resp.status_code == 200
+    assert result["updated"] == [str(task.id)]
+    assert result["missing"] == [missing_id]
+    assert mock_session.get_one(Task, task.id).name == "update"
+
+def test_bulk_delete_endpoint(api_client, mock_session):
+    task = TaskDbModelFactory()
+    status = StatusDbModelFactory()
+    mock_session.add(status)
+    mock_session.add(task)
+    mock_session.commit()
+    task_id = task.id
+    missing_id = str(uuid.uuid4())
+
+    resp = api_client.request("DELETE", "/tasks/bulk_delete", json=[task_id.hex, missing_id])
+    result = json.loads(resp.text)
+    assert resp.status_code == 200
+    assert result["deleted"] == [task_id.hex]
+    assert result["missing"] == [missing_id]
+    assert mock_session.query(Task).count() == 0
+
+def test_export_endpoint_ndjson(api_client, mock_session):
+    mock_session.add(StatusDbModelFactory())
+    for i in range(3):
+        mock_session.add(TaskDbModelFactory(id=uuid.uuid4(), name=f"Тест {i}"))
+    mock_session.commit()
+
+    resp = api_client.get("/tasks/export")
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    assert len(lines) == 3
+    assert {line["name"] for line in lines} == {"Тест 0", "Тест 1", "Тест 2"}
+    assert all(line["status"] == "В работе" for line in lines)
+
+def test_export_endpoint_csv(api_client, mock_session):
+    task = TaskDbModelFactory(text="текст, с запятой")
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(task)
+    mock_session.commit()
+
+    resp = api_client.get("/tasks/export?format=csv")
+    rows = list(csv.reader(io.StringIO(resp.text)))
+    assert resp.status_code == 200
+    assert rows[0] == ["id", "name", "text", "status"]
+    assert rows[1] == [task.id.hex, "test", "текст, с запятой", "В работе"]
@@ -1,9 +1,23 @@
+import time
 import uuid
 import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.dialects import mysql
+from sqlalchemy.schema import CreateTable
 from sqlalchemy.exc import NoResultFound
-from db.entities.models import Task
-from exceptions.task_exceptions import TaskNotFoundException
+from core.config import settings
+from db.entities.models import Base, Task, Status, create_task_fts
+from db.entities.types import BinaryUUID, uuid7
+from exceptions.task_exceptions import TaskNotFoundException, IncorrectCursorPassed, IncorrectSearchQueryPassed
 from exceptions.status_exceptions import StatusNotFoundException
+from services.tasks_services import (
+    AsyncTaskCreationService,
+    AsyncTaskSearchService,
+    AsyncTaskDeleteService,
+    TaskExportService,
+)
+from services.pagination import encode_cursor
+from services.status_cache import StatusCache
 from .factories import (
     TaskCreationModelFactory,
     TaskWithNonExistingStatus,
@@ -24,7 +38,7 @@ def test_correct_task_creation(task_creation_service, mock_session):
     mock_session.add(status)
     mock_session.commit()
     task = TaskCreationModelFactory()
-    task_creation_service(task)
+    created = task_creation_service(task)
 
     task_from_db = (
         mock_session.query(Task).filter_by(name="Тестовая задача").one_or_none()
@@ -32,6 +46,138 @@ def test_correct_task_creation(task_creation_service, mock_session):
     assert task_from_db is not None
     assert task_from_db.name == "Тестовая задача"
     assert task_from_db.text == "Тестовая задача для проверки сервиса создания задач"
+    assert created.id == task_from_db.id.hex
+    assert created.status == "В работе"
+
+
+def test_task_creation_when_status_cache_misses(task_creation_service, mock_session):
+    # Справочник загружен до создания статуса, а перечитывать его еще рано
+    task_creation_service.status_cache = StatusCache(miss_reload_interval=60)
+    task_creation_service.status_cache.get_all(mock_session)
+    mock_session.add(StatusDbModelFactory())
+    mock_session.commit()
+
+    created = task_creation_service(TaskCreationModelFactory())
+    assert created.status == "В работе"
+    assert mock_session.get(Task, uuid.UUID(created.id)) is not None
+
+
+def test_task_creation_with_uuid7_ids(task_creation_service, mock_session, mocker):
+    mocker.patch.object(settings, "TASK_ID_VERSION", 7)
+    mock_session.add(StatusDbModelFactory())
+    mock_session.commit()
+
+    created = task_creation_service(TaskCreationModelFactory())
+    assert uuid.UUID(created.id).version == 7
+    assert mock_session.get(Task, uuid.UUID(created.id)) is not None
+
+
+def test_orm_insert_uses_configured_id_version(mock_session, mocker):
+    mocker.patch.object(settings, "TASK_ID_VERSION", 7)
+    mock_session.add(StatusDbModelFactory())
+    task = Task(name="ORM", text="Задача без id", status_id=1)
+    mock_session.add(task)
+    mock_session.commit()
+
+    assert task.id.version == 7
+
+
+def test_uuid7_is_time_ordered():
+    ids = []
+    for _ in range(3):
+        ids.append(uuid7())
+        time.sleep(0.002)
+
+    assert all(task_id.version == 7 and task_id.variant == uuid.RFC_4122 for task_id in ids)
+    assert ids == sorted(ids)
+    assert ids[0].bytes[:6] < ids[-1].bytes[:6]
+
+
+def test_task_id_is_binary_on_mysql():
+    dialect = mysql.dialect()
+    task_id = uuid.uuid4()
+    id_type = BinaryUUID()
+
+    assert "id BINARY(16) NOT NULL" in str(CreateTable(Task.__table__).compile(dialect=dialect))
+    assert id_type.process_bind_param(task_id, dialect) == task_id.bytes
+    assert id_type.process_result_value(bytearray(task_id.bytes), dialect) == task_id
+    assert not any(index.name == "ix_task_id" for index in Task.__table__.indexes)
+
+
+def test_task_creation_is_single_insert(task_creation_service, mock_session, query_counter):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.commit()
+    task_creation_service.status_cache.get_all(mock_session)
+    query_counter.clear()
+
+    task_creation_service(TaskCreationModelFactory())
+
+    assert len(query_counter) == 1
+    assert query_counter[0].startswith("INSERT INTO task")
+
+
+def test_task_creation_with_stale_cached_status(task_creation_service):
+    # Статус удален другим процессом, а в кэше еще остался: вставку отклоняет внешний ключ
+    task_creation_service.status_cache.set(1, "В работе")
+
+    with pytest.raises(StatusNotFoundException):
+        task_creation_service(TaskCreationModelFactory())
+    assert task_creation_service.status_cache.get_all(task_creation_service.session) == {}
+
+
+def test_bulk_creation_reports_missing_statuses(bulk_task_creation_service, mock_session):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.commit()
+    tasks = [TaskCreationModelFactory(), TaskWithNonExistingStatus(), TaskCreationModelFactory(name="Вторая")]
+
+    results = bulk_task_creation_service(tasks)
+
+    assert [result.created for result in results] == [True, False, True]
+    assert [result.index for result in results] == [0, 1, 2]
+    assert results[1].id is None
+    created_ids = {task.id.hex for task in mock_session.query(Task).all()}
+    assert created_ids == {results[0].id, results[2].id}
+
+
+def test_bulk_creation_inserts_in_chunks(bulk_task_creation_service, mock_session, query_counter):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.commit()
+    bulk_task_creation_service.chunk_size = 2
+    query_counter.clear()
+
+    bulk_task_creation_service([TaskCreationModelFactory(name=f"Задача {i}") for i in range(5)])
+
+    status_queries = [statement for statement in query_counter if "FROM status" in statement]
+    insert_queries = [statement for statement in query_counter if statement.startswith("INSERT INTO task")]
+    assert len(status_queries) == 1
+    assert len(insert_queries) == 3
+    assert mock_session.query(Task).count() == 5
+
+
+def test_bulk_creation_with_status_deleted_concurrently(bulk_task_creation_service, mock_session, mocker):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(StatusDbModelFactory(id=2, name="update"))
+    mock_session.commit()
+    # Статус 2 прошел проверку, но удален до INSERT
+    mocker.patch.object(bulk_task_creation_service, "_existing_status_ids", side_effect=[{1, 2}, {1}])
+    mock_session.query(Status).filter_by(id=2).delete()
+    mock_session.commit()
+
+    results = bulk_task_creation_service([TaskCreationModelFactory(), TaskCreationModelFactory(status=2)])
+
+    assert [result.created for result in results] == [True, False]
+    assert results[1].detail == "Не найдено статуса с таким id"
+    assert {task.id.hex for task in mock_session.query(Task).all()} == {results[0].id}
+
+
+def test_bulk_creation_fails_when_status_keeps_disappearing(bulk_task_creation_service, mock_session, mocker):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.commit()
+    mocker.patch.object(bulk_task_creation_service, "_existing_status_ids", return_value={1, 2})
+
+    with pytest.raises(StatusNotFoundException):
+        bulk_task_creation_service([TaskCreationModelFactory(), TaskCreationModelFactory(status=2)])
+    assert mock_session.query(Task).count() == 0
 
 
 def test_task_search_with_nonexisting_task(task_search_service):
@@ -68,6 +214,188 @@ def test_task_search_service_returns_correctly(task_search_service, mock_session
     tasks = task_search_service.get_all_tasks()
     assert len(tasks) == 1
 
+@pytest.mark.parametrize("tasks_count", [1, 10, 50])
+def test_task_search_service_uses_constant_number_of_queries(task_search_service, mock_session, query_counter, tasks_count):
+    status = StatusDbModelFactory()
+    mock_session.add(status)
+    for i in range(tasks_count):
+        mock_session.add(TaskDbModelFactory(id=uuid.uuid4(), name=f"test {i}"))
+    mock_session.commit()
+    query_counter.clear()
+
+    tasks = task_search_service.get_all_tasks()
+    assert len(tasks) == tasks_count
+    assert all(task.status == status.name for task in tasks)
+    assert len(query_counter) == 1
+
+def test_task_search_service_with_orphaned_task(task_search_service, mock_session, engine):
+    # Задача без статуса могла остаться с тех пор, когда внешний ключ не проверялся
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA foreign_keys=OFF")
+        conn.execute(insert(Task).values(id=uuid.uuid4(), name="test", text="test", status_id=2))
+        conn.commit()
+        conn.exec_driver_sql("PRAGMA foreign_keys=ON")
+
+    with pytest.raises(StatusNotFoundException):
+        task_search_service.get_all_tasks()
+
+def test_tasks_page_is_split_by_cursor(task_search_service, mock_session):
+    status = StatusDbModelFactory()
+    mock_session.add(status)
+    task_ids = sorted(uuid.uuid4() for _ in range(3))
+    for task_id in task_ids:
+        mock_session.add(TaskDbModelFactory(id=task_id))
+    mock_session.commit()
+
+    first_page = task_search_service.get_tasks_page(limit=2)
+    assert [task.id for task in first_page.items] == [task_id.hex for task_id in task_ids[:2]]
+    assert first_page.next_cursor is not None
+
+    second_page = task_search_service.get_tasks_page(limit=2, after=first_page.next_cursor)
+    assert [task.id for task in second_page.items] == [task_ids[2].hex]
+    assert second_page.next_cursor is None
+
+def test_tasks_page_seeks_by_cursor(task_search_service, mock_session, query_counter):
+    status = StatusDbModelFactory()
+    mock_session.add(status)
+    for _ in range(2):
+        mock_session.add(TaskDbModelFactory(id=uuid.uuid4()))
+    mock_session.commit()
+
+    first_page = task_search_service.get_tasks_page(limit=1)
+    query_counter.clear()
+
+    task_search_service.get_tasks_page(limit=1, after=first_page.next_cursor)
+    assert len(query_counter) == 1
+    assert "task.id > ?" in query_counter[0]
+
+def test_tasks_page_filtered_by_status(task_search_service, mock_session):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(StatusDbModelFactory(id=2, name="Готово"))
+    done_ids = sorted(uuid.uuid4() for _ in range(3))
+    for task_id in done_ids:
+        mock_session.add(TaskDbModelFactory(id=task_id, status_id=2))
+    mock_session.add(TaskDbModelFactory(id=uuid.uuid4(), status_id=1))
+    mock_session.commit()
+
+    first_page = task_search_service.get_tasks_page(limit=2, status_id=2)
+    second_page = task_search_service.get_tasks_page(limit=2, after=first_page.next_cursor, status_id=2)
+
+    found_ids = [task.id for task in first_page.items + second_page.items]
+    assert found_ids == [task_id.hex for task_id in done_ids]
+    assert all(task.status == "Готово" for task in first_page.items + second_page.items)
+    assert second_page.next_cursor is None
+
+def test_tasks_page_filter_uses_status_index(task_search_service, engine, create_tables):
+    statement = (
+        task_search_service.session.query(Task.id)
+        .filter(Task.status_id == 1, Task.id > uuid.uuid4())
+        .order_by(Task.id)
+        .limit(10)
+        .statement
+    )
+    compiled = statement.compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        plan = " ".join(str(row) for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled}"))
+
+    assert "ix_task_status_id_id" in plan
+
+def test_tasks_page_rows_match_models(task_search_service, mock_session):
+    mock_session.add(StatusDbModelFactory())
+    for _ in range(3):
+        mock_session.add(TaskDbModelFactory(id=uuid.uuid4()))
+    mock_session.commit()
+
+    page = task_search_service.get_tasks_page(limit=2)
+    assert task_search_service.get_tasks_page_rows(limit=2) == page.model_dump()
+
+def test_tasks_page_with_incorrect_cursor(task_search_service):
+    with pytest.raises(IncorrectCursorPassed):
+        task_search_service.get_tasks_page(limit=10, after="!!!")
+
+def test_search_ranks_by_relevance(task_search_service, mock_session):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(TaskDbModelFactory(id=uuid.uuid4(), name="Отчет", text="Собрать отчет"))
+    mock_session.add(TaskDbModelFactory(id=uuid.uuid4(), name="Молоко", text="Купить молоко, молоко закончилось"))
+    mock_session.add(TaskDbModelFactory(id=uuid.uuid4(), name="Магазин", text="Зайти в магазин за молоком"))
+    mock_session.commit()
+
+    page = task_search_service.search_tasks("молоко", limit=10)
+
+    # Последнее слово ищется и как префикс, поэтому находится и "молоком"
+    assert [task.name for task in page.items] == ["Молоко", "Магазин"]
+    assert [task.name for task in task_search_service.search_tasks("купить молоко", limit=10).items] == ["Молоко"]
+
+def test_search_is_split_by_cursor_and_filtered_by_status(task_search_service, mock_session):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(StatusDbModelFactory(id=2, name="Готово"))
+    for i in range(5):
+        mock_session.add(TaskDbModelFactory(id=uuid.uuid4(), name=f"Отчет {i}", status_id=2))
+    mock_session.add(TaskDbModelFactory(id=uuid.uuid4(), name="Отчет", status_id=1))
+    mock_session.commit()
+
+    found = []
+    cursor = None
+    while True:
+        page = task_search_service.search_tasks("отчет", limit=2, after=cursor, status_id=2)
+        found.extend(page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+
+    assert len({task.id for task in found}) == 5
+    assert all(task.status == "Готово" for task in found)
+    assert task_search_service.search_tasks_rows("отчет", limit=2) == task_search_service.search_tasks("отчет", limit=2).model_dump()
+
+def test_search_index_follows_task_changes(task_search_service, task_modification_service, task_delete_service, mock_session):
+    task = TaskDbModelFactory(id=uuid.uuid4(), name="Старое название")
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(task)
+    mock_session.commit()
+
+    task_modification_service(TaskUpdateModelFactory(id=task.id.hex, name="Новое название", text="текст"))
+    assert task_search_service.search_tasks("старое", limit=10).items == []
+    assert [item.id for item in task_search_service.search_tasks("новое", limit=10).items] == [task.id.hex]
+
+    task_delete_service(task.id)
+    assert task_search_service.search_tasks("новое", limit=10).items == []
+
+@pytest.mark.parametrize("query", ['NOT "OR*', "a AND b", "task_fts:x", "(x) ^y"])
+def test_search_escapes_query_syntax(task_search_service, mock_session, query):
+    mock_session.add(StatusDbModelFactory())
+    mock_session.commit()
+
+    assert task_search_service.search_tasks(query, limit=10).items == []
+
+def test_search_index_is_added_to_existing_sqlite_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.sqlite3'}")
+    with engine.begin() as conn:
+        Base.metadata.create_all(conn)
+        # База, созданная до появления поиска
+        conn.exec_driver_sql("DROP TABLE task_fts")
+        for trigger in ("task_fts_insert", "task_fts_delete", "task_fts_update"):
+            conn.exec_driver_sql(f"DROP TRIGGER {trigger}")
+        conn.execute(insert(Status).values(id=1, name="В работе"))
+        conn.execute(insert(Task).values(id=uuid.uuid4(), name="Квартальный отчет", text="текст", status_id=1))
+
+    for _ in range(2):
+        with engine.begin() as conn:
+            create_task_fts(conn)
+
+    with engine.begin() as conn:
+        conn.execute(insert(Task).values(id=uuid.uuid4(), name="Годовой отчет", text="текст", status_id=1))
+        found = conn.exec_driver_sql("SELECT rowid FROM task_fts WHERE task_fts MATCH 'отчет'").all()
+    engine.dispose()
+    assert len(found) == 2
+
+def test_search_without_words(task_search_service):
+    with pytest.raises(IncorrectSearchQueryPassed):
+        task_search_service.search_tasks("?! --", limit=10)
+
+def test_search_with_incorrect_cursor(task_search_service):
+    with pytest.raises(IncorrectCursorPassed):
+        task_search_service.search_tasks("отчет", limit=10, after=encode_cursor(uuid.uuid4()))
+
 def test_modification_service_with_nonexisting_task(task_modification_service):
     fake_update = TaskUpdateModelFactory()
 
@@ -93,6 +421,105 @@ def test_modification_service_with_correct_task(task_modification_service, mock_
     assert updated_task.text == "update"
     assert updated_task.status_id == 2
 
+def test_modification_service_is_single_update(task_modification_service, mock_session, query_counter):
+    mock_session.add(StatusDbModelFactory())
+    task = TaskDbModelFactory(id=uuid.uuid4())
+    mock_session.add(task)
+    mock_session.commit()
+    task_id = task.id
+    query_counter.clear()
+
+    task_modification_service(TaskUpdateModelFactory(id=str(task_id), name="Новое имя", text=None, status=None))
+
+    assert len(query_counter) == 1
+    assert query_counter[0].startswith("UPDATE task SET name=")
+    updated_task = mock_session.get_one(Task, task_id)
+    assert (updated_task.name, updated_task.text, updated_task.status_id) == ("Новое имя", "test", 1)
+
+def test_modification_service_with_nonexisting_status(task_modification_service, mock_session):
+    mock_session.add(StatusDbModelFactory())
+    task = TaskDbModelFactory(id=uuid.uuid4())
+    mock_session.add(task)
+    mock_session.commit()
+
+    with pytest.raises(StatusNotFoundException):
+        task_modification_service(TaskUpdateModelFactory(id=str(task.id), status=2))
+    assert mock_session.get_one(Task, task.id).name == "test"
+
+def test_bulk_modification_service(bulk_task_modification_service, mock_session, query_counter):
+    first_task = TaskDbModelFactory(id=uuid.uuid4())
+    second_task = TaskDbModelFactory(id=uuid.uuid4())
+    missing_id = str(uuid.uuid4())
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(StatusDbModelFactory(id=2, name="update"))
+    mock_session.add(first_task)
+    mock_session.add(second_task)
+    mock_session.commit()
+    updates = [
+        TaskUpdateModelFactory(id=str(first_task.id), status=2),
+        TaskUpdateModelFactory(id=str(second_task.id), name=None, text="только текст", status=None),
+        TaskUpdateModelFactory(id=missing_id),
+        TaskUpdateModelFactory(id="не uuid"),
+        TaskUpdateModelFactory(id=str(second_task.id), status=7),
+    ]
+    query_counter.clear()
+
+    result = bulk_task_modification_service(updates)
+    statements = list(query_counter)
+
+    assert result.updated == [str(first_task.id), str(second_task.id)]
+    assert result.missing == [missing_id]
+    assert result.invalid == ["не uuid"]
+    assert result.status_not_found == [str(second_task.id)]
+    # Проверка задач, проверка статусов и один UPDATE на пачку
+    assert len(statements) == 3
+    assert statements[-1].startswith("UPDATE task SET")
+
+    first = mock_session.get_one(Task, first_task.id)
+    second = mock_session.get_one(Task, second_task.id)
+    assert (first.name, first.text, first.status_id) == ("update", "update", 2)
+    assert (second.name, second.text, second.status_id) == ("test", "только текст", 1)
+
+def test_bulk_modification_with_status_deleted_concurrently(bulk_task_modification_service, mock_session, mocker):
+    first_task = TaskDbModelFactory(id=uuid.uuid4())
+    second_task = TaskDbModelFactory(id=uuid.uuid4())
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add(StatusDbModelFactory(id=2, name="update"))
+    mock_session.add_all([first_task, second_task])
+    mock_session.commit()
+    # Статус 2 прошел проверку, но удален до UPDATE
+    mocker.patch.object(bulk_task_modification_service, "_existing_status_ids", side_effect=[{2}, set()])
+    mock_session.query(Status).filter_by(id=2).delete()
+    mock_session.commit()
+
+    result = bulk_task_modification_service([
+        TaskUpdateModelFactory(id=str(first_task.id), status=2),
+        TaskUpdateModelFactory(id=str(second_task.id), name="новое", text=None, status=None),
+    ])
+
+    assert result.updated == [str(second_task.id)]
+    assert result.status_not_found == [str(first_task.id)]
+    assert mock_session.get_one(Task, second_task.id).name == "новое"
+    assert mock_session.get_one(Task, first_task.id).status_id == 1
+
+def test_bulk_delete_service(bulk_task_delete_service, mock_session, query_counter):
+    tasks = [TaskDbModelFactory(id=uuid.uuid4()) for _ in range(3)]
+    missing_id = str(uuid.uuid4())
+    mock_session.add(StatusDbModelFactory())
+    mock_session.add_all(tasks)
+    mock_session.commit()
+    task_ids = [str(task.id) for task in tasks[:2]]
+    query_counter.clear()
+
+    result = bulk_task_delete_service([*task_ids, missing_id, "не uuid"])
+    queries_count = len(query_counter)
+
+    assert sorted(result.deleted) == sorted(task_ids)
+    assert result.missing == [missing_id]
+    assert result.invalid == ["не uuid"]
+    assert queries_count == 2
+    assert mock_session.query(Task).count() == 1
+
 def test_delete_service_with_not_existing_task(task_delete_service):
     fake_uuid = uuid.uuid4()
     with pytest.raises(TaskNotFoundException):
@@ -107,4 +534,45 @@ def test_delete_service_with_correct_task(task_delete_service, mock_session):
 
     task_delete_service(task.id)
     with pytest.raises(NoResultFound):
-        mock_session.get_one(Task, task.id)
\ No newline at end of file
+        mock_session.get_one(Task, task.id)
+
+@pytest.mark.anyio
+async def test_async_creation_and_search_services(async_session, mock_session):
+    status = StatusDbModelFactory()
+    mock_session.add(status)
+    mock_session.commit()
+
+    await AsyncTaskCreationService(async_session)(TaskCreationModelFactory())
+
+    tasks = await AsyncTaskSearchService(async_session).get_all_tasks()
+    assert len(tasks) == 1
+    assert tasks[0].name == "Тестовая задача"
+    assert tasks[0].status == "В работе"
+
+@pytest.mark.anyio
+async def test_async_search_service_with_nonexisting_task(async_session):
+    with pytest.raises(TaskNotFoundException):
+        await AsyncTaskSearchService(async_session).find_task_by_id(uuid.uuid4())
+
+@pytest.mark.anyio
+async def test_async_delete_service_with_not_existing_task(async_session):
+    with pytest.raises(TaskNotFoundException):
+        await AsyncTaskDeleteService(async_session)(uuid.uuid4())
+
+@pytest.mark.anyio
+async def test_export_service_streams_in_batches(async_session_factory, mock_session):
+    mock_session.add(StatusDbModelFactory())
+    task_ids = sorted(uuid.uuid4() for _ in range(5))
+    for task_id in task_ids:
+        mock_session.add(TaskDbModelFactory(id=task_id))
+    mock_session.add(TaskDbModelFactory(id=uuid.UUID(int=2 ** 128 - 1), status_id=None))
+    mock_session.commit()
+
+    service = TaskExportService(async_session_factory, batch_size=2)
+    partitions = [partition async for partition in service.stream_rows()]
+
+    assert [len(partition) for partition in partitions] == [2, 2, 2]
+    rows = [row for partition in partitions for row in partition]
+    assert [row[0] for row in rows[:5]] == task_ids
+    assert rows[0][3] == "В работе"
+    assert rows[5][3] is None